@@ -0,0 +1,102 @@
+"""
+Measures the VCP transactions per poll of change detection.
+
+A simulated monitor has its controls changed at random, and is watched
+once by polling every code and once with the MCCS active control FIFO::
+
+    python benchmarks/change_detection.py --polls 1000 --change-rate 0.05
+
+The bus time is estimated from the Linux DDC/CI delays, every transaction
+is paced by the command rate and reads wait for the reply.
+"""
+
+from monitorcontrol import ChangeDetector, Monitor
+from monitorcontrol.vcp import VCP, VCPUnsupportedCodeError
+from monitorcontrol.vcp.vcp_linux import LinuxVCP
+from monitorcontrol.watch import DEFAULT_CODES
+from typing import Dict, List, Tuple
+import argparse
+import random
+
+
+class SimulatedVCP(VCP):
+    """Monitor with buttons, optionally reporting changes in the FIFO."""
+
+    def __init__(self, active_control: bool):
+        self.values: Dict[int, int] = {code.value: 1 for code in DEFAULT_CODES}
+        self.active_control = active_control
+        self.new_control_value = 1
+        self.fifo: List[int] = []
+        self.reads = 0
+        self.writes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def press(self, code: int):
+        self.values[code] += 1
+        if self.active_control:
+            self.fifo.append(code)
+            self.new_control_value = 2
+
+    def get_vcp_feature(self, code: int) -> Tuple[int, int]:
+        self.reads += 1
+        if code == 0x02 and self.active_control:
+            return self.new_control_value, 0xFF
+        elif code == 0x52 and self.active_control:
+            return (self.fifo.pop(0) if self.fifo else 0), 0xFF
+        elif code in self.values:
+            return self.values[code], 0xFFFF
+        raise VCPUnsupportedCodeError(f"unsupported code: {code}")
+
+    def set_vcp_feature(self, code: int, value: int):
+        self.writes += 1
+        if code == 0x02:
+            self.new_control_value = value
+
+    def get_vcp_capabilities(self) -> str:
+        raise NotImplementedError
+
+
+def measure(active_control: bool, polls: int, change_rate: float, seed: int):
+    rng = random.Random(seed)
+    vcp = SimulatedVCP(active_control)
+    with Monitor(vcp) as monitor:
+        detector = ChangeDetector(monitor)
+        detector.start()
+        vcp.reads = vcp.writes = 0
+        for _ in range(polls):
+            if rng.random() < change_rate:
+                vcp.press(rng.choice(list(vcp.values)))
+            detector.poll()
+    assert detector.transactions == vcp.reads + vcp.writes
+    per_poll = detector.transactions / detector.polls
+    seconds = (
+        vcp.reads * (LinuxVCP.CMD_RATE + LinuxVCP.GET_VCP_TIMEOUT)
+        + vcp.writes * LinuxVCP.CMD_RATE
+    ) / detector.polls
+    return per_poll, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--polls", type=int, default=1000, help="Number of polls.")
+    parser.add_argument(
+        "--change-rate", type=float, default=0.05, help="Changes per poll."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'transactions/poll':>18} {'bus time/poll':>14}")
+    for name, active_control in [("polling", False), ("active control", True)]:
+        per_poll, seconds = measure(
+            active_control, args.polls, args.change_rate, args.seed
+        )
+        print(f"{name:<16} {per_poll:>18.2f} {seconds * 1e3:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmarks the startup time of the command line interface.
+
+Each command is run in a fresh interpreter and the median wall time is
+reported, along with the self-reported import time of the package from
+``python -X importtime``::
+
+    python benchmarks/import_time.py --runs 20
+
+Run it with bytecode caching enabled, otherwise the compile time of the
+modules dominates the results.
+
+Baseline with Python 3.11 on Linux, 20 runs, where the wall times include
+the interpreter startup and vary by about 20 ms between runs:
+
+===================================  ========
+Command                              Time
+===================================  ========
+interpreter                           62.1 ms
+import monitorcontrol                119.7 ms
+import monitorcontrol.__main__       108.6 ms
+monitorcontrol --version             111.3 ms
+monitorcontrol --help                 82.8 ms
+importtime monitorcontrol             25.6 ms
+importtime monitorcontrol.__main__    31.5 ms
+===================================  ========
+
+Importing the watcher, remote, and fleet modules eagerly from the package
+raised the import time of the package to 37.2 ms, these are imported on
+first use.
+With ``--budget`` the script fails when the import time of the package
+exceeds the budget, about twice the baseline by default::
+
+    python benchmarks/import_time.py --runs 20 --budget 50
+"""
+
+from typing import List
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# default import time budget of the package in seconds, about twice the
+# baseline
+BUDGET = 0.05
+
+MAIN = "from monitorcontrol.__main__ import main; main(['{}'])"
+COMMANDS = {
+    "interpreter": ["-c", "pass"],
+    "import monitorcontrol": ["-c", "import monitorcontrol"],
+    "import monitorcontrol.__main__": ["-c", "import monitorcontrol.__main__"],
+    "monitorcontrol --version": ["-c", MAIN.format("--version")],
+    "monitorcontrol --help": ["-c", MAIN.format("--help")],
+}
+
+
+def wall_time(args: List[str], runs: int) -> float:
+    """Median wall time of running the interpreter with args, in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def import_time(module: str, runs: int) -> float:
+    """Median cumulative import time of a module, in seconds."""
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        # lines are "import time: self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            _, cumulative, name = line.split("|")
+            if name.strip() == module:
+                times.append(int(cumulative) / 1e6)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command.")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        nargs="?",
+        const=BUDGET * 1e3,
+        default=None,
+        help="Fail if importing the package takes longer, in milliseconds.",
+    )
+    args = parser.parse_args()
+
+    for name, command in COMMANDS.items():
+        print(f"{name:<36} {wall_time(command, args.runs) * 1e3:8.1f} ms")
+    for module in ["monitorcontrol", "monitorcontrol.__main__"]:
+        seconds = import_time(module, args.runs)
+        print(f"{'importtime ' + module:<36} {seconds * 1e3:8.1f} ms")
+        if module == "monitorcontrol" and args.budget is not None:
+            if seconds * 1e3 > args.budget:
+                sys.exit(f"import time exceeds the budget of {args.budget} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
 from . import vcp  # noqa: F401
 from .vcp import vcp_codes, VCPError, VCPIOError, VCPPermissionError  # noqa: F401
+from .vcp import (  # noqa: F401
+    Priority,
+    RetryPolicy,
+    VCPChecksumError,
+    VCPReplyError,
+    VCPTimeoutError,
+    VCPUnsupportedCodeError,
+)
 from .monitorcontrol import (  # noqa: F401
+    find_monitors,
     get_monitors,
     get_input_name,
     Monitor,
@@ -9,3 +18,31 @@ from .monitorcontrol import (  # noqa: F401
     InputSource,
     ColorPreset,
 )
+from .scene import Scene, apply_scene  # noqa: F401
+from typing import Any, List
+import importlib
+
+# names re-exported from the submodules that are imported on first use, to
+# keep sockets and JSON out of the import time of the package
+_LAZY = {
+    "ChangeDetector": "watch",
+    "ChangeEvent": "watch",
+    "Watcher": "watch",
+    "RemoteConnection": "remote",
+    "RemoteVCP": "remote",
+    "get_remote_monitors": "remote",
+    "Fleet": "fleet",
+    "FleetMonitor": "fleet",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,12 +1,22 @@
-from . import get_monitors, get_input_name, PowerMode, AudioMuteMode
-from typing import List, Optional
+from . import (
+    find_monitors,
+    get_monitors,
+    get_input_name,
+    PowerMode,
+    AudioMuteMode,
+    InputSource,
+)
+from .monitorcontrol import Monitor
+from .vcp import VCPError, vcp_codes
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import argparse
-import importlib.metadata
+import enum
+import json
 import logging
+import os
+import shlex
 import sys
 
-version = importlib.metadata.version("monitorcontrol")
-
 
 def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -20,6 +30,20 @@ def get_parser() -> argparse.ArgumentParser:
         default=0,
         help="Increase logging verbosity.",
     )
+    parser.add_argument(
+        "--bus-lock",
+        action="store_true",
+        help="Lock the I2C bus around every transaction on Linux, "
+        "to share it with other processes and DDC tools.",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=None,
+        metavar="ATTEMPTS",
+        help="Attempts of every transaction with transient errors on Linux, "
+        "including the first attempt. 1 disables retries. Default: 3.",
+    )
 
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
@@ -30,6 +54,14 @@ def get_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Get the luminance of the first monitor.",
     )
+    group.add_argument(
+        "--set-contrast", type=int, help="Set the contrast of all monitors."
+    )
+    group.add_argument(
+        "--get-contrast",
+        action="store_true",
+        help="Get the contrast of the first monitor.",
+    )
     group.add_argument("--set-volume", type=int, help="Set the volume of all monitors.")
     group.add_argument(
         "--get-volume",
@@ -74,17 +106,434 @@ def get_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Get the monitors.",
     )
+    group.add_argument(
+        "--dump",
+        action="store_true",
+        help="Dump the capabilities and current values of every monitor as JSON.",
+    )
+    group.add_argument(
+        "--watch",
+        action="store_true",
+        help="Print changes of the selected or all monitors as JSON lines "
+        "until interrupted.",
+    )
+    group.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a daemon that keeps the monitors open and serves the other "
+        "commands over a local socket.",
+    )
+    group.add_argument(
+        "--batch",
+        type=argparse.FileType("r"),
+        metavar="FILE",
+        help="Run the getter and setter commands in FILE, or stdin for '-', "
+        "one command per line in the same format as the command line. "
+        "Each monitor is opened once and monitors are controlled in parallel.",
+    )
+    group = parser.add_argument_group("Output")
+    group.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON.",
+    )
+    group = parser.add_argument_group("Watch")
+    group.add_argument(
+        "--watch-code",
+        action="append",
+        metavar="CODE",
+        help="VCP code to watch by name or number, can be repeated. "
+        "Default: luminance, contrast, input source, volume, audio mute mode, "
+        "and power mode.",
+    )
+    group = parser.add_argument_group("Daemon")
+    group.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Daemon socket path. "
+        "Default: $MONITORCONTROL_SOCKET or $XDG_RUNTIME_DIR/monitorcontrol.sock.",
+    )
+    group.add_argument(
+        "--listen",
+        type=str,
+        default=None,
+        metavar="HOST:PORT",
+        help="Serve the daemon over TCP on HOST:PORT instead of the local socket, "
+        "for monitorcontrol.remote clients. There is no authentication.",
+    )
+    group.add_argument(
+        "--http",
+        type=str,
+        default=None,
+        metavar="HOST:PORT",
+        help="Serve an HTTP/JSON API on HOST:PORT instead of the local socket, "
+        "for tools that cannot use Python. There is no authentication.",
+    )
+    group.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Do not use the daemon even if it is running.",
+    )
     group = parser.add_argument_group("Optional monitor select")
     group.add_argument(
         "--monitor",
-        type=int,
+        type=monitor_selector,
         default=None,
-        help="Select monitor for command. "
+        metavar="MONITOR",
+        help="Select monitor for command, by number or with a selector: "
+        "serial:SERIAL, model:MODEL, or connector:CONNECTOR such as DP-2. "
+        "Selectors open only the matching monitors on Linux. "
         "Default: getters use monitor 1. Setters use all monitors.",
     )
     return parser
 
 
+# fields of the --monitor selectors
+SELECTOR_FIELDS = ("serial", "model", "connector")
+
+# a monitor selector is a monitor number, or a field and a value
+MonitorSelector = Union[int, Tuple[str, str]]
+
+
+def monitor_selector(value: str) -> MonitorSelector:
+    """Parses the ``--monitor`` option, a number or a ``field:value`` pair."""
+    if value.isdigit():
+        return int(value)
+    field, sep, expected = value.partition(":")
+    if not sep or field not in SELECTOR_FIELDS or not expected:
+        raise argparse.ArgumentTypeError(
+            f"expected a number or one of {', '.join(SELECTOR_FIELDS)} "
+            f"followed by a colon and a value: {value}"
+        )
+    return field, expected
+
+
+def _select_monitors(selector: MonitorSelector) -> List[Monitor]:
+    """Gets the monitors selected by the ``--monitor`` option."""
+    if isinstance(selector, int):
+        return [get_monitors()[selector - 1]]
+    monitors = find_monitors(*selector)
+    if not monitors:
+        field, expected = selector
+        raise SystemExit(f"no monitor matches {field}:{expected}")
+    return monitors
+
+
+# getter and setter options, named after the Monitor methods they call
+GETTERS = [
+    "get_luminance",
+    "get_contrast",
+    "get_volume",
+    "get_power_mode",
+    "get_audio_mute_mode",
+    "get_input_source",
+]
+SETTERS = [
+    "set_luminance",
+    "set_contrast",
+    "set_volume",
+    "set_power_mode",
+    "set_audio_mute_mode",
+    "set_input_source",
+]
+
+# returned by _call_daemon when the daemon is not running
+_NO_DAEMON = object()
+
+# errors of batch commands returned as their results, other errors are
+# returned too but logged as internal errors with their traceback
+BATCH_ERRORS = (VCPError, OSError, KeyError, IndexError, TypeError, ValueError)
+
+
+def _format(method: str, value) -> str:
+    """
+    Formats a getter result as plain text.
+
+    Input sources are printed by value, as they always were, other
+    enumerations by name.
+    The daemon answers with the names, as does ``--json``.
+    """
+    if method == "get_input_source":
+        if isinstance(value, str):
+            value = InputSource[value]
+        return str(int(value))
+    if isinstance(value, enum.Enum):
+        return value.name
+    return str(value)
+
+
+def _print_json(value: Any):
+    """Prints a result as JSON, enumerations are printed by name."""
+    from .daemon import to_json
+
+    print(json.dumps(to_json(value)))
+
+
+def _gather(monitors: List[Monitor], func: Callable[[Monitor], Any]) -> List[Any]:
+    """
+    Calls a function with each monitor in its context, in parallel.
+
+    Raises:
+        Exception: The first exception raised by the function,
+            after every monitor has finished.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def call(monitor: Monitor) -> Any:
+        with monitor:
+            return func(monitor)
+
+    if not monitors:
+        return []
+    with ThreadPoolExecutor(max_workers=len(monitors)) as executor:
+        futures = [executor.submit(call, monitor) for monitor in monitors]
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
+
+
+def _read_inputs(monitor: Monitor) -> Tuple[dict, int]:
+    """Reads the capabilities and the current input source."""
+    return monitor.get_vcp_capabilities(), monitor.get_input_source()
+
+
+def _read_dump(monitor: Monitor) -> dict:
+    """Reads the capabilities and the value of every readable listed code."""
+    capabilities = monitor.get_vcp_capabilities()
+    codes = [
+        code
+        for code in map(vcp_codes.CODES.get, capabilities["vcp"])
+        if code is not None
+        and code.readable
+        and code.function is not vcp_codes.CodeFunction.t
+    ]
+    values = monitor.get_many(codes, ignore_unsupported=True)
+    return {"capabilities": capabilities, "values": values}
+
+
+def _input_source(value: int):
+    """Converts an input source to the enumeration, if it is known."""
+    try:
+        return InputSource(value)
+    except ValueError:
+        return value
+
+
+def _get_action(args: argparse.Namespace) -> Optional[Tuple[str, tuple]]:
+    """Gets the monitor method and arguments of a getter or setter command."""
+    for getter in GETTERS:
+        if getattr(args, getter):
+            return getter, ()
+    for setter in SETTERS:
+        value = getattr(args, setter)
+        if value is not None:
+            return setter, (value,)
+    return None
+
+
+def _parse_address(
+    parser: argparse.ArgumentParser, option: str, address: str
+) -> Tuple[str, int]:
+    """Parses a HOST:PORT address, IPv6 hosts may be in brackets."""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        parser.error(f"{option} must be HOST:PORT: {address}")
+    return host.strip("[]"), int(port)
+
+
+def _connect_daemon(args: argparse.Namespace):
+    """Connects to the daemon, returns None if it is not running."""
+    if args.no_daemon:
+        return None
+    from .daemon import DaemonClient, get_socket_path
+
+    path = args.socket or get_socket_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        return DaemonClient(path)
+    except OSError:
+        return None
+
+
+def _call_daemon(args: argparse.Namespace, method: str, monitor, *method_args):
+    """
+    Calls a monitor method through the daemon if it is running.
+
+    Returns:
+        The result, or ``_NO_DAEMON`` if the daemon is not running.
+    """
+    client = _connect_daemon(args)
+    if client is None:
+        return _NO_DAEMON
+    with client:
+        return client.call(monitor, method, *method_args)
+
+
+# a batch command is the monitor index, or None for every monitor,
+# the monitor method, and the method arguments
+BatchCommand = Tuple[Optional[int], str, tuple]
+
+
+def read_batch(parser: argparse.ArgumentParser, lines) -> List[BatchCommand]:
+    """
+    Parses batch commands, one set of command line options per line.
+
+    Empty lines and comments starting with ``#`` are ignored.
+
+    Args:
+        parser: Command line parser.
+        lines: Iterable of lines, such as a file.
+
+    Returns:
+        Batch commands.
+    """
+    commands = []
+    for line_number, line in enumerate(lines, 1):
+        argv = shlex.split(line, comments=True)
+        if not argv:
+            continue
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as e:
+            raise SystemExit(f"invalid batch command on line {line_number}") from e
+        action = _get_action(args)
+        if action is None:
+            parser.error(
+                f"batch command on line {line_number} is not a getter or setter"
+            )
+        method, method_args = action
+        if isinstance(args.monitor, tuple):
+            parser.error(
+                f"batch command on line {line_number} uses a monitor selector, "
+                "batch commands select monitors by number"
+            )
+        if args.monitor is not None:
+            monitor = args.monitor - 1
+        elif method in GETTERS:
+            monitor = 0
+        else:
+            monitor = None
+        commands.append((monitor, method, method_args))
+    return commands
+
+
+def run_batch(commands: List[BatchCommand], monitors: List[Monitor]) -> List[List[Any]]:
+    """
+    Runs batch commands, opening each monitor once.
+
+    The commands for each monitor run in order within one context,
+    and monitors run in parallel.
+
+    Args:
+        commands: Batch commands from :py:func:`read_batch`.
+        monitors: Monitors in a closed state.
+
+    Returns:
+        For each command, the result for each monitor it targets.
+        Exceptions are returned in place of results.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    results: List[List[Any]] = [[] for _ in commands]
+    per_monitor: Dict[int, List[int]] = {}
+    for command_index, (monitor, _, _) in enumerate(commands):
+        targets = range(len(monitors)) if monitor is None else [monitor]
+        for target in targets:
+            per_monitor.setdefault(target, []).append(command_index)
+
+    def run(target: int) -> List[Any]:
+        command_indices = per_monitor[target]
+        if not 0 <= target < len(monitors):
+            error = IndexError(f"no monitor {target + 1}")
+            return [error] * len(command_indices)
+        monitor_results = []
+        try:
+            with monitors[target] as monitor:
+                for command_index in command_indices:
+                    _, method, method_args = commands[command_index]
+                    try:
+                        result = getattr(monitor, method)(*method_args)
+                    except BATCH_ERRORS as e:
+                        result = e
+                    except Exception as e:
+                        logging.getLogger(__name__).exception(
+                            "internal error in %s", method
+                        )
+                        result = e
+                    monitor_results.append(result)
+        except BATCH_ERRORS as e:
+            # failed to open or close the monitor
+            monitor_results += [e] * (len(command_indices) - len(monitor_results))
+        except Exception as e:
+            logging.getLogger(__name__).exception(
+                "internal error with monitor %d", target + 1
+            )
+            monitor_results += [e] * (len(command_indices) - len(monitor_results))
+        return monitor_results
+
+    if per_monitor:
+        targets = sorted(per_monitor)
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            for target, monitor_results in zip(
+                targets, executor.map(run, targets), strict=True
+            ):
+                for command_index, result in zip(
+                    per_monitor[target], monitor_results, strict=True
+                ):
+                    results[command_index].append(result)
+    return results
+
+
+def _run_batch_daemon(client, commands: List[BatchCommand]) -> List[List[Any]]:
+    """Runs batch commands through the daemon, see :py:func:`run_batch`."""
+    from .daemon import DaemonError
+
+    responses = client.request(
+        {
+            "op": "batch",
+            "commands": [
+                {"op": "call", "monitor": m, "method": method, "args": list(a)}
+                for m, method, a in commands
+            ],
+        }
+    )
+    results = []
+    for (monitor, _, _), response in zip(commands, responses, strict=True):
+        if not response["ok"]:
+            results.append([DaemonError(response["error"], response.get("type"))])
+        elif monitor is None:
+            results.append(response["result"])
+        else:
+            results.append([response["result"]])
+    return results
+
+
+def _format_batch_result(method: str, results: List[Any], as_json: bool) -> str:
+    """Formats the results of one batch command as a line."""
+    for result in results:
+        if isinstance(result, Exception):
+            if as_json:
+                error = {
+                    "ok": False,
+                    "error": str(result),
+                    "type": type(result).__name__,
+                }
+                return json.dumps(error)
+            return f"error: {result}"
+    if as_json:
+        from .daemon import to_json
+
+        result = results[0] if method in GETTERS else None
+        return json.dumps({"ok": True, "result": to_json(result)})
+    if method in GETTERS:
+        return _format(method, results[0])
+    return "ok"
+
+
 def count_to_level(count: int) -> int:
     """Number of -v to a logging level."""
     if count == 1:
@@ -112,98 +561,114 @@ def main(argv: Optional[List[str]] = None):
     root_logger.setLevel(logging_level)
     root_logger.addHandler(handler)
 
-    monitor_index = 0
-    if args.monitor is not None:
-        monitor_index = args.monitor - 1
+    if args.bus_lock and sys.platform.startswith("linux"):
+        from .vcp.vcp_linux import LinuxVCP
 
-    if args.version:
-        print(version)
-        return
-    elif args.get_luminance:
-        monitor_obj = get_monitors()[monitor_index]
-        with monitor_obj:
-            luminance = monitor_obj.get_luminance()
-        print(str(luminance))
-        return
-    elif args.get_volume:
-        monitor_obj = get_monitors()[monitor_index]
-        with monitor_obj:
-            volume = monitor_obj.get_volume()
-        sys.stdout.write(str(volume) + "\n")
-        return
-    elif args.get_power_mode:
-        monitor_obj = get_monitors()[monitor_index]
-        with monitor_obj:
-            power = monitor_obj.get_power_mode()
-        print(str(power.name))
-        return
-    elif args.get_audio_mute_mode:
-        monitor_obj = get_monitors()[monitor_index]
-        with monitor_obj:
-            audio_mute = monitor_obj.get_audio_mute_mode()
-        sys.stdout.write(str(audio_mute.name) + "\n")
-        return
-    elif args.set_luminance is not None:
-        if args.monitor is None:
-            for monitor_obj in get_monitors():
-                with monitor_obj:
-                    monitor_obj.set_luminance(args.set_luminance)
-        else:
-            monitor_obj = get_monitors()[monitor_index]
-            with monitor_obj:
-                monitor_obj.set_luminance(args.set_luminance)
-        return
-    elif args.set_volume is not None:
-        if args.monitor is None:
-            for monitor_obj in get_monitors():
-                with monitor_obj:
-                    monitor_obj.set_volume(args.set_volume)
-        else:
-            monitor_obj = get_monitors()[monitor_index]
-            with monitor_obj:
-                monitor_obj.set_volume(args.set_volume)
-        return
-    elif args.set_power_mode is not None:
-        if args.monitor is None:
-            for monitor_obj in get_monitors():
-                with monitor_obj:
-                    monitor_obj.set_power_mode(args.set_power_mode)
+        LinuxVCP.BUS_LOCK = True
+
+    if args.retries is not None:
+        if args.retries < 1:
+            parser.error("--retries must be at least 1")
+        if sys.platform.startswith("linux"):
+            from .vcp.vcp_linux import LinuxVCP
+
+            LinuxVCP.RETRY_ATTEMPTS = args.retries
+
+    if args.daemon:
+        from .daemon import Daemon
+
+        if args.listen and args.http:
+            parser.error("--listen and --http cannot be used together")
+        if args.listen:
+            Daemon().serve_tcp(*_parse_address(parser, "--listen", args.listen))
+        elif args.http:
+            Daemon().serve_http(*_parse_address(parser, "--http", args.http))
         else:
-            monitor_obj = get_monitors()[monitor_index]
-            with monitor_obj:
-                monitor_obj.set_power_mode(args.set_power_mode)
+            Daemon().serve(args.socket)
         return
-    elif args.set_audio_mute_mode is not None:
-        if args.monitor is None:
-            for monitor_obj in get_monitors():
-                with monitor_obj:
-                    monitor_obj.set_audio_mute_mode(args.set_audio_mute_mode)
+
+    # selectors find the monitors without the daemon, which lists monitors
+    # by number
+    by_number = not isinstance(args.monitor, tuple)
+    monitor_index = 0
+    if by_number and args.monitor is not None:
+        monitor_index = args.monitor - 1
+
+    if args.batch is not None:
+        with args.batch:
+            commands = read_batch(parser, args.batch)
+        client = _connect_daemon(args)
+        if client is None:
+            results = run_batch(commands, get_monitors())
         else:
-            monitor_obj = get_monitors()[monitor_index]
-            with monitor_obj:
-                monitor_obj.set_audio_mute_mode(args.set_audio_mute_mode)
+            with client:
+                results = _run_batch_daemon(client, commands)
+        failed = False
+        for (_, method, _), command_results in zip(commands, results, strict=True):
+            failed |= any(isinstance(r, Exception) for r in command_results)
+            print(_format_batch_result(method, command_results, args.json))
+        if failed:
+            sys.exit(1)
         return
-    elif args.get_input_source:
-        monitor_obj = get_monitors()[monitor_index]
-        with monitor_obj:
-            input_source = monitor_obj.get_input_source()
-        print(str(input_source))
+
+    if args.version:
+        # looked up here to keep it out of the startup time of other commands
+        import importlib.metadata
+
+        print(importlib.metadata.version("monitorcontrol"))
         return
-    elif args.set_input_source is not None:
-        if args.monitor is None:
-            for monitor_obj in get_monitors():
+
+    action = _get_action(args)
+    if action is not None:
+        method, method_args = action
+        if method in GETTERS:
+            result = _NO_DAEMON
+            if by_number:
+                result = _call_daemon(args, method, monitor_index)
+            if result is _NO_DAEMON:
+                if args.monitor is None:
+                    monitor_obj = get_monitors()[monitor_index]
+                else:
+                    monitor_obj = _select_monitors(args.monitor)[0]
                 with monitor_obj:
-                    monitor_obj.set_input_source(args.set_input_source)
+                    result = getattr(monitor_obj, method)()
+            if args.json:
+                _print_json(result)
+            else:
+                print(_format(method, result))
         else:
-            monitor_obj = get_monitors()[monitor_index]
-            with monitor_obj:
-                monitor_obj.set_input_source(args.set_input_source)
+            target = None if args.monitor is None else monitor_index
+            result = _NO_DAEMON
+            if by_number:
+                result = _call_daemon(args, method, target, *method_args)
+            if result is _NO_DAEMON:
+                if args.monitor is None:
+                    monitors = get_monitors()
+                else:
+                    monitors = _select_monitors(args.monitor)
+                for monitor_obj in monitors:
+                    with monitor_obj:
+                        getattr(monitor_obj, method)(*method_args)
         return
-    elif args.get_monitors:
-        for monitor_index, monitor_obj in enumerate(get_monitors(), 0):
-            with monitor_obj:
-                monitors_dict = monitor_obj.get_vcp_capabilities()
-                current_input = monitor_obj.get_input_source()
+
+    if args.get_monitors:
+        monitors = _gather(get_monitors(), _read_inputs)
+        if args.json:
+            _print_json(
+                [
+                    {
+                        "monitor": monitor_index + 1,
+                        "model": capabilities["model"],
+                        "inputs": capabilities["inputs"],
+                        "input_source": _input_source(current_input),
+                    }
+                    for monitor_index, (capabilities, current_input) in enumerate(
+                        monitors
+                    )
+                ]
+            )
+            return
+        for monitor_index, (monitors_dict, current_input) in enumerate(monitors):
             model = monitors_dict["model"]
             inputs = monitors_dict["inputs"]
             print(f"Monitor {monitor_index + 1}: {model}")
@@ -217,5 +682,34 @@ def main(argv: Optional[List[str]] = None):
                 print(f" {current} {input_name}")
 
         return
+    elif args.dump:
+        dumps = _gather(get_monitors(), _read_dump)
+        for monitor_index, dump in enumerate(dumps):
+            dump["monitor"] = monitor_index + 1
+        _print_json(dumps)
+        return
+    elif args.watch:
+        from .watch import DEFAULT_CODES, Watcher
+
+        if by_number:
+            monitors = get_monitors()
+        else:
+            monitors = _select_monitors(args.monitor)
+        if args.monitor is None or not by_number:
+            selected = list(range(len(monitors)))
+        else:
+            selected = [monitor_index]
+        watcher = Watcher(
+            [monitors[index] for index in selected], args.watch_code or DEFAULT_CODES
+        )
+        try:
+            with watcher:
+                for event in watcher:
+                    line = event.to_dict()
+                    line = {"monitor": selected[line.pop("index")] + 1, **line}
+                    print(json.dumps(line), flush=True)
+        except KeyboardInterrupt:
+            pass
+        return
     else:
         raise AssertionError("Internal error, please report this bug")
@@ -0,0 +1,783 @@
+"""
+Long running daemon that owns the monitors and serves requests over a local
+Unix socket, or over TCP for remote hosts.
+
+The protocol is one JSON object per line in both directions.
+Every request has an ``"op"`` and gets exactly one response, in order.
+Clients may send several requests before reading the responses, the
+responses to every request received together are sent together::
+
+    -> {"op": "call", "monitor": 0, "method": "get_luminance"}
+    <- {"ok": true, "result": 50}
+    -> {"op": "set", "monitor": null, "values": {"image luminance": 80}}
+    <- {"ok": true, "result": [null, null]}
+    -> {"op": "get", "monitor": 7, "codes": [16]}
+    <- {"ok": false, "error": "no monitor with index 7", "type": "IndexError"}
+
+Operations:
+
+* ``list``: list the monitors.
+* ``call``: call a :py:class:`~monitorcontrol.monitorcontrol.Monitor` method
+  from :py:data:`CALLABLE_METHODS` with optional ``"args"``.
+* ``get``: get the ``"codes"`` of a monitor with
+  :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get_many`.
+* ``set``: set the ``"values"`` of a monitor with
+  :py:meth:`~monitorcontrol.monitorcontrol.Monitor.set`.
+* ``batch``: run a list of ``"commands"``, responding with a list of
+  responses.
+  With ``"parallel": true`` the commands for different monitors run in
+  parallel, the commands for one monitor still run in order.
+* ``scene``: apply a ``"scene"`` in the format of
+  :py:meth:`~monitorcontrol.scene.Scene.to_dict`.
+* ``vcp``: call a :py:class:`~monitorcontrol.vcp.vcp_abc.VCP` method of a
+  monitor from :py:data:`VCP_METHODS` with optional ``"args"``,
+  used by :py:class:`~monitorcontrol.remote.RemoteVCP`.
+
+Monitors are addressed by their index starting at zero, ``null`` addresses
+every monitor and responds with a list of results.
+
+Writes to one monitor are coalesced: values set while an earlier write to the
+monitor waits for its turn are merged into that write, so every code is
+written once with its latest value.
+
+:py:meth:`Daemon.serve_http` serves an HTTP/JSON API instead, with the same
+responses::
+
+    GET /monitors
+    <- {"ok": true, "result": [{"index": 0}, {"index": 1}]}
+    GET /monitors/0?codes=16,image_contrast&max_age=5
+    <- {"ok": true, "result": {"16": {"value": 50, "age": 1.2, "cached": true},
+                               "18": {"value": 40, "age": 0.0, "cached": false}}}
+    PUT /monitors/0 {"image luminance": 80, "18": 50}
+    <- {"ok": true, "result": null}
+
+``GET`` reads the ``codes`` of a monitor, given by name or number and
+separated by commas.
+With ``max_age`` values read or written at most that many seconds ago are
+answered from the cache of the daemon, without any VCP transaction.
+``PUT`` sets the values of a monitor.
+Errors are answered with a 4xx or 5xx status, see :py:data:`HTTP_STATUS`.
+Bodies longer than :py:data:`MAX_LINE` are answered with status 413 and the
+connection is closed.
+"""
+
+from . import vcp
+from .monitorcontrol import Monitor, get_monitors
+from .scene import Scene
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+import enum
+import errno
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+
+#: Monitor methods that can be called with the ``call`` operation.
+CALLABLE_METHODS = frozenset(
+    [
+        "get_luminance",
+        "set_luminance",
+        "get_volume",
+        "set_volume",
+        "get_color_preset",
+        "set_color_preset",
+        "get_contrast",
+        "set_contrast",
+        "get_power_mode",
+        "set_power_mode",
+        "get_audio_mute_mode",
+        "set_audio_mute_mode",
+        "get_input_source",
+        "set_input_source",
+        "get_vcp_capabilities",
+        "get_identity",
+        "get",
+        "set",
+        "get_many",
+        "set_many",
+        "save_settings",
+        "snapshot",
+        "restore",
+    ]
+)
+
+
+#: VCP methods that can be called with the ``vcp`` operation.
+VCP_METHODS = frozenset(
+    [
+        "get_vcp_feature",
+        "set_vcp_feature",
+        "get_vcp_features",
+        "get_vcp_capabilities",
+        "save_settings",
+    ]
+)
+
+
+#: Maximum length of a request line or of an HTTP request body in bytes,
+#: longer requests close the connection.
+MAX_LINE = 1 << 20
+
+#: Errors of a request answered with an error response.
+#: Other errors are answered too, but logged as internal errors with their
+#: traceback.
+REQUEST_ERRORS: Tuple[Type[Exception], ...] = (
+    vcp.VCPError,
+    OSError,
+    KeyError,
+    IndexError,
+    TypeError,
+    ValueError,
+)
+
+#: HTTP status of the errors of :py:meth:`Daemon.serve_http`, the first
+#: matching type is used, other errors have status 500.
+HTTP_STATUS: List[Tuple[Type[Exception], int]] = [
+    (IndexError, 404),
+    (vcp.VCPUnsupportedCodeError, 400),
+    (KeyError, 400),
+    (TypeError, 400),
+    (ValueError, 400),
+    (vcp.VCPTimeoutError, 504),
+    (vcp.VCPError, 503),
+]
+
+
+def _error_response(error: Exception) -> dict:
+    return {"ok": False, "error": str(error), "type": type(error).__name__}
+
+
+def get_socket_path() -> str:
+    """
+    Returns the path of the daemon socket.
+
+    This is ``$MONITORCONTROL_SOCKET`` if set,
+    otherwise ``monitorcontrol.sock`` in ``$XDG_RUNTIME_DIR``,
+    or in the temporary directory if there is no runtime directory.
+    """
+    path = os.environ.get("MONITORCONTROL_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "monitorcontrol.sock")
+    return os.path.join(tempfile.gettempdir(), f"monitorcontrol-{os.getuid()}.sock")
+
+
+def to_json(value: Any) -> Any:
+    """
+    Converts a result to JSON compatible types.
+
+    Enumerations are converted to their names and dictionary keys to strings.
+    """
+    if isinstance(value, enum.Enum):
+        return value.name
+    elif isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    return value
+
+
+class _PendingWrite:
+    """Values of a coalesced write, and the errors once done."""
+
+    __slots__ = ("values", "done", "errors")
+
+    def __init__(self):
+        self.values: Dict[int, int] = {}
+        self.done = threading.Event()
+        # error of every code that failed
+        self.errors: Dict[int, Exception] = {}
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    # restarting the daemon must not wait for old connections to time out
+    allow_reuse_address = True
+
+
+class Daemon:
+    """
+    Owns a set of monitors and serves requests for them.
+
+    Monitors are opened once and kept open until :py:meth:`close`.
+    Every monitor has its own lock, so requests for different monitors run
+    concurrently while requests for the same monitor are serialized.
+
+    Args:
+        monitors: Monitors in a closed state, discovered by default.
+    """
+
+    def __init__(self, monitors: Optional[List[Monitor]] = None):
+        self.logger = logging.getLogger(__name__)
+        if monitors is None:
+            monitors = get_monitors()
+        self.monitors = monitors
+        self._locks = [threading.Lock() for _ in monitors]
+        # write of every monitor that is waiting for its turn
+        self._pending: List[Optional[_PendingWrite]] = [None for _ in monitors]
+        self._pending_lock = threading.Lock()
+        self._opened: List[Monitor] = []
+        self._server: Optional[socketserver.BaseServer] = None
+        #: Bound address of :py:meth:`serve_tcp`, None until bound.
+        self.address: Optional[Tuple[str, int]] = None
+
+    def open(self):
+        """Opens every monitor."""
+        for monitor in self.monitors:
+            monitor.__enter__()
+            self._opened.append(monitor)
+
+    def close(self):
+        """Closes every monitor opened by :py:meth:`open`."""
+        while self._opened:
+            monitor = self._opened.pop()
+            try:
+                monitor.__exit__(None, None, None)
+            except (vcp.VCPError, OSError) as e:
+                self.logger.warning("failed to close monitor: %s", e)
+            except Exception:
+                # keep closing the other monitors
+                self.logger.exception("internal error closing a monitor")
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.close()
+        return False
+
+    def _indices(self, monitor: Optional[int]) -> List[int]:
+        if monitor is None:
+            return list(range(len(self.monitors)))
+        if not 0 <= monitor < len(self.monitors):
+            raise IndexError(f"no monitor with index {monitor}")
+        return [monitor]
+
+    def _on_monitors(self, monitor: Optional[int], func) -> Any:
+        results = []
+        for index in self._indices(monitor):
+            with self._locks[index]:
+                results.append(func(self.monitors[index]))
+        return results if monitor is None else results[0]
+
+    def _call(self, request: dict) -> Any:
+        method = request["method"]
+        if method not in CALLABLE_METHODS:
+            raise ValueError(f"method cannot be called: {method}")
+        args = request.get("args", [])
+        return self._on_monitors(
+            request.get("monitor", 0), lambda m: getattr(m, method)(*args)
+        )
+
+    def _vcp(self, request: dict) -> Any:
+        method = request["method"]
+        if method not in VCP_METHODS:
+            raise ValueError(f"method cannot be called: {method}")
+        args = request.get("args", [])
+
+        def call(monitor: Monitor) -> Any:
+            if method != "set_vcp_feature":
+                return getattr(monitor.vcp, method)(*args)
+            # the value is written past the cache of the monitor
+            try:
+                return monitor.vcp.set_vcp_feature(*args)
+            finally:
+                monitor.invalidate_cached(int(args[0]))
+
+        return self._on_monitors(request.get("monitor", 0), call)
+
+    def _set(self, request: dict) -> Any:
+        monitor = request.get("monitor", 0)
+        results = [self.write(i, request["values"]) for i in self._indices(monitor)]
+        return results if monitor is None else results[0]
+
+    def read(
+        self,
+        index: int,
+        codes: Iterable[Union[int, str, vcp.VCPCode]],
+        max_age: Optional[float] = None,
+    ) -> Dict[int, dict]:
+        """
+        Reads values of a monitor, from the cache when they are fresh.
+
+        Cached values are answered without waiting for the monitor.
+
+        Args:
+            index: Index of the monitor.
+            codes: VCP codes, in any form accepted by
+                :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get`.
+            max_age: Maximum age of cached values in seconds,
+                or None to read every value from the monitor.
+
+        Returns:
+            The ``"value"``, its ``"age"`` in seconds, and whether it was
+            ``"cached"``, indexed by code value.
+
+        Raises:
+            IndexError: There is no monitor with the index.
+            KeyError: Code is not in the registry.
+            VCPError: Failed to read a value.
+        """
+        (index,) = self._indices(index)
+        monitor = self.monitors[index]
+        values = {}
+        stale = []
+        for code in codes:
+            code = vcp.vcp_codes.get_vcp_code(code).value
+            cached = None if max_age is None else monitor.get_cached_with_age(code)
+            if cached is not None and cached[1] <= max_age:
+                values[code] = {"value": cached[0], "age": cached[1], "cached": True}
+            else:
+                stale.append(code)
+        if stale:
+            with self._locks[index]:
+                read = monitor.get_many(stale)
+            for code, value in read.items():
+                values[code] = {"value": value, "age": 0.0, "cached": False}
+        return values
+
+    def write(self, index: int, values: Dict[Union[int, str], int]):
+        """
+        Sets values of a monitor, coalesced with concurrent writes.
+
+        The values are validated first, then values set while an earlier
+        write to the monitor waits for its turn are merged into that write,
+        the latest value of every code wins.
+        Every code is written even if another code fails, and only the
+        errors of its own codes are raised to each caller.
+
+        Args:
+            index: Index of the monitor.
+            values: Feature values indexed by code, in any form accepted by
+                :py:meth:`~monitorcontrol.monitorcontrol.Monitor.set`.
+
+        Raises:
+            IndexError: There is no monitor with the index.
+            KeyError: Code is not in the registry.
+            TypeError: Code is read only.
+            ValueError: Value is greater than the maximum allowable.
+            VCPError: Failed to set a value.
+        """
+        (index,) = self._indices(index)
+        monitor = self.monitors[index]
+        resolved = {
+            monitor.validate(code, value).value: value for code, value in values.items()
+        }
+        with self._pending_lock:
+            pending = self._pending[index]
+            leader = pending is None
+            if leader:
+                pending = self._pending[index] = _PendingWrite()
+            pending.values.update(resolved)
+        if leader:
+            with self._locks[index]:
+                # later values start the next write
+                with self._pending_lock:
+                    self._pending[index] = None
+                written = set()
+                try:
+                    for code, value in pending.values.items():
+                        try:
+                            monitor.set(code, value)
+                        except (vcp.VCPError, TypeError, ValueError) as e:
+                            pending.errors[code] = e
+                        written.add(code)
+                finally:
+                    for code in pending.values.keys() - written:
+                        pending.errors[code] = vcp.VCPError("write was interrupted")
+                    pending.done.set()
+        else:
+            pending.done.wait()
+        for code in resolved:
+            if code in pending.errors:
+                raise pending.errors[code]
+
+    def _batch(self, request: dict) -> List[dict]:
+        commands = request["commands"]
+        if not request.get("parallel"):
+            return [self.handle(command) for command in commands]
+
+        # commands for one monitor keep their order
+        groups: Dict[str, List[int]] = {}
+        for index, command in enumerate(commands):
+            key = json.dumps(command.get("monitor", 0))
+            groups.setdefault(key, []).append(index)
+        responses: List[Optional[dict]] = [None] * len(commands)
+
+        def run(indices: List[int]):
+            for index in indices:
+                responses[index] = self.handle(commands[index])
+
+        if len(groups) <= 1:
+            run(list(range(len(commands))))
+        else:
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                list(executor.map(run, groups.values()))
+        return responses
+
+    def _scene(self, request: dict) -> Any:
+        scene = Scene.from_dict(request["scene"])
+        max_age = request.get("max_age")
+
+        def apply(index: int) -> Dict[int, int]:
+            with self._locks[index]:
+                return scene.apply(self.monitors[index], max_age)
+
+        if not self.monitors:
+            return []
+        with ThreadPoolExecutor(max_workers=len(self.monitors)) as executor:
+            return list(executor.map(apply, range(len(self.monitors))))
+
+    def handle(self, request: dict) -> dict:
+        """
+        Handles one request.
+
+        Args:
+            request: Decoded request.
+
+        Returns:
+            Response, errors are reported in the response.
+        """
+        op = None
+        try:
+            op = request["op"]
+            if op == "list":
+                result = [{"index": i} for i in range(len(self.monitors))]
+            elif op == "call":
+                result = self._call(request)
+            elif op == "get":
+                result = self._on_monitors(
+                    request.get("monitor", 0),
+                    lambda m: m.get_many(request["codes"]),
+                )
+            elif op == "set":
+                result = self._set(request)
+            elif op == "batch":
+                result = self._batch(request)
+            elif op == "scene":
+                result = self._scene(request)
+            elif op == "vcp":
+                result = self._vcp(request)
+            else:
+                raise ValueError(f"unknown operation: {op}")
+        except REQUEST_ERRORS as e:
+            self.logger.debug("request failed: %s", e)
+            return _error_response(e)
+        except Exception as e:
+            self.logger.exception("internal error in %s request", op)
+            return _error_response(e)
+        return {"ok": True, "result": to_json(result)}
+
+    def _handler(self) -> Type[socketserver.BaseRequestHandler]:
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def setup(self):
+                if self.request.family != socket.AF_UNIX:
+                    # responses are batched, send them without delay
+                    self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def respond(self, line: bytes) -> bytes:
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": str(e), "type": "ValueError"}
+                else:
+                    response = daemon.handle(request)
+                return json.dumps(response).encode() + b"\n"
+
+            def handle(self):
+                pending = b""
+                while True:
+                    data = self.request.recv(65536)
+                    if not data:
+                        return
+                    *lines, pending = (pending + data).split(b"\n")
+                    responses = [self.respond(ln) for ln in lines if ln.strip()]
+                    if responses:
+                        self.request.sendall(b"".join(responses))
+                    if len(pending) > MAX_LINE:
+                        daemon.logger.warning(
+                            "closing connection, request exceeds %d bytes", MAX_LINE
+                        )
+                        return
+
+        return Handler
+
+    def _serve(self, server: socketserver.BaseServer):
+        with self, server:
+            server.daemon_threads = True
+            self._server = server
+            try:
+                server.serve_forever()
+            finally:
+                self._server = None
+
+    def serve(self, path: Optional[str] = None):
+        """
+        Opens the monitors and serves requests on a Unix socket until
+        :py:meth:`shutdown` is called.
+
+        The socket is only accessible by the user.
+        A stale socket left by a daemon that exited is replaced.
+
+        Args:
+            path: Socket path, :py:func:`get_socket_path` by default.
+
+        Raises:
+            OSError: Another daemon is serving on the path, or the path is
+                not a socket.
+        """
+        if path is None:
+            path = get_socket_path()
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise OSError(errno.EEXIST, "not a socket", path)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(path)
+                except ConnectionRefusedError:
+                    os.unlink(path)
+                else:
+                    raise OSError(errno.EADDRINUSE, "daemon already running", path)
+        # the socket is created with the permissions left by the umask
+        umask = os.umask(0o177)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(path, self._handler())
+        finally:
+            os.umask(umask)
+        try:
+            self.logger.info("serving on %s", path)
+            self._serve(server)
+        finally:
+            os.unlink(path)
+
+    def serve_tcp(self, host: str, port: int):
+        """
+        Opens the monitors and serves requests over TCP until
+        :py:meth:`shutdown` is called.
+
+        There is no authentication, anyone who can connect can control the
+        monitors.
+        Listen on a trusted network only.
+
+        Args:
+            host: Address to listen on.
+            port: Port to listen on, 0 for any free port.
+        """
+        server = _TCPServer((host, port), self._handler())
+        self.address = server.server_address
+        self.logger.info("serving on %s", server.server_address)
+        self._serve(server)
+
+    def _http(
+        self, method: str, path: List[str], query: Dict[str, List[str]], body: Any
+    ) -> Any:
+        if path == ["monitors"] and method == "GET":
+            return [{"index": i} for i in range(len(self.monitors))]
+        if len(path) != 2 or path[0] != "monitors" or not path[1].isdigit():
+            raise IndexError(f"not found: /{'/'.join(path)}")
+        index = int(path[1])
+        monitor = self.monitors[self._indices(index)[0]]
+        with monitor.prioritize(vcp.Priority.INTERACTIVE):
+            if method == "GET":
+                codes = [c for v in query.get("codes", []) for c in v.split(",") if c]
+                if not codes:
+                    raise ValueError("no codes to get")
+                max_age = query.get("max_age")
+                return self.read(
+                    index, codes, None if max_age is None else float(max_age[-1])
+                )
+            if not isinstance(body, dict):
+                raise TypeError("values must be a JSON object")
+            return self.write(index, body)
+
+    def _http_handler(self) -> Type[socketserver.BaseRequestHandler]:
+        from http.server import BaseHTTPRequestHandler
+        from urllib.parse import parse_qs, urlsplit
+
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep connections open between requests
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # the headers and the body are written separately
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, fmt: str, *args):
+                daemon.logger.debug("http: %s", fmt % args)
+
+            def send_json(self, status: int, response: dict, close: bool = False):
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if close:
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def respond(self, method: str):
+                url = urlsplit(self.path)
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_LINE:
+                    # the body is not read, so the connection cannot be reused
+                    if length < 0:
+                        error = ValueError("invalid Content-Length")
+                        self.send_json(400, _error_response(error), close=True)
+                    else:
+                        error = ValueError(f"body longer than {MAX_LINE} bytes")
+                        self.send_json(413, _error_response(error), close=True)
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length)) if length else None
+                    result = daemon._http(
+                        method,
+                        url.path.strip("/").split("/"),
+                        parse_qs(url.query),
+                        body,
+                    )
+                except REQUEST_ERRORS as e:
+                    daemon.logger.debug("request failed: %s", e)
+                    status = next((s for t, s in HTTP_STATUS if isinstance(e, t)), 500)
+                    self.send_json(status, _error_response(e))
+                except Exception as e:
+                    daemon.logger.exception("internal error in %s %s", method, url.path)
+                    self.send_json(500, _error_response(e))
+                else:
+                    self.send_json(200, {"ok": True, "result": to_json(result)})
+
+            def do_GET(self):  # noqa: N802
+                self.respond("GET")
+
+            def do_PUT(self):  # noqa: N802
+                self.respond("PUT")
+
+        return Handler
+
+    def serve_http(self, host: str, port: int):
+        """
+        Opens the monitors and serves the HTTP/JSON API until
+        :py:meth:`shutdown` is called.
+
+        There is no authentication, anyone who can connect can control the
+        monitors.
+        Listen on localhost or a trusted network only.
+
+        Args:
+            host: Address to listen on.
+            port: Port to listen on, 0 for any free port.
+        """
+        server = _TCPServer((host, port), self._http_handler())
+        self.address = server.server_address
+        self.logger.info("serving HTTP on %s", server.server_address)
+        self._serve(server)
+
+    def shutdown(self):
+        """Stops :py:meth:`serve` from another thread."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class DaemonClient:
+    """
+    Client for a running :py:class:`Daemon`.
+
+    Args:
+        path: Socket path, :py:func:`get_socket_path` by default.
+        timeout: Socket timeout in seconds.
+
+    Raises:
+        OSError: The daemon is not running.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = 10.0):
+        if path is None:
+            path = get_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self._file = self.sock.makefile("rb")
+
+    def close(self):
+        """Closes the connection."""
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.close()
+        return False
+
+    def request(self, request: dict) -> Any:
+        """
+        Sends a request and waits for the response.
+
+        Args:
+            request: Request, see the module documentation.
+
+        Returns:
+            Result of the request.
+
+        Raises:
+            DaemonError: The request failed.
+            OSError: Lost the connection to the daemon.
+        """
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("daemon closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise DaemonError(response["error"], response.get("type"))
+        return response["result"]
+
+    def call(self, monitor: Optional[int], method: str, *args) -> Any:
+        """Calls a monitor method, see :py:data:`CALLABLE_METHODS`."""
+        return self.request(
+            {"op": "call", "monitor": monitor, "method": method, "args": list(args)}
+        )
+
+
+class DaemonError(Exception):
+    """
+    Raised by :py:class:`DaemonClient` when the daemon reports an error.
+
+    Args:
+        message: Error message.
+        error_type: Name of the exception type raised in the daemon.
+    """
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        super().__init__(message)
+        self.error_type = error_type
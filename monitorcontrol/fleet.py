@@ -0,0 +1,362 @@
+"""
+Coordination of the monitors of many hosts, each running a daemon started
+with ``monitorcontrol --daemon --listen HOST:PORT``.
+
+One coordinator process keeps an inventory of every monitor of the fleet and
+dispatches commands to them.
+Hosts are reached in parallel, with at most one request in flight per host.
+Every host gets one pipelined round trip per refresh or dispatch, where the
+daemon runs the commands of different monitors in parallel and the commands
+of one monitor in order, so every bus carries one transaction at a time.
+"""
+
+from . import vcp
+from .remote import RemoteConnection, _error
+from .scene import Match, matches
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+import threading
+import time
+
+#: Identity fields read from every new monitor, see
+#: :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get_identity`.
+#: The model is taken from the capabilities, which are read once.
+IDENTITY_FIELDS = ("manufacturer", "product_code", "serial", "name", "connector")
+
+#: EDID identity fields checked on every refresh, a monitor whose fields
+#: changed is identified again as a new monitor.
+KEY_FIELDS = ("manufacturer", "product_code", "serial")
+
+#: VCP codes read by :py:meth:`Fleet.refresh` by default.
+DEFAULT_CODES = ("image luminance", "image contrast", "display power mode")
+
+
+class FleetMonitor:
+    """
+    Inventory entry of one monitor of a fleet.
+
+    Args:
+        host: Address of the daemon, such as ``"signage-1.local:8584"``.
+        index: Index of the monitor in the daemon.
+    """
+
+    __slots__ = ("host", "index", "identity", "capabilities", "values", "updated")
+
+    def __init__(self, host: str, index: int):
+        self.host = host
+        self.index = index
+        #: Identity fields of the monitor and ``"host"``.
+        self.identity: Dict[str, str] = {"host": host}
+        #: Parsed capabilities, as returned by the daemon.
+        self.capabilities: Optional[dict] = None
+        #: Last known values indexed by VCP code value.
+        self.values: Dict[int, int] = {}
+        #: :py:func:`time.time` of the last successful read, None if never.
+        self.updated: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"FleetMonitor({self.host!r}, {self.index})"
+
+    @property
+    def key(self) -> str:
+        """Key of the monitor in the fleet, such as ``"signage-1.local:8584/0"``."""
+        return f"{self.host}/{self.index}"
+
+
+def _result(response: dict) -> Union[Any, Exception]:
+    return response["result"] if response["ok"] else _error(response)
+
+
+class Fleet:
+    """
+    Inventory of the monitors of many hosts and dispatch of commands to them.
+
+    The inventory is updated incrementally by :py:meth:`refresh`.
+    The identity and capabilities of a monitor are read once, when it first
+    appears, later refreshes read the values and check the EDID identity.
+    Monitors without an EDID cannot be checked.
+
+    Args:
+        hosts: Host name or address and TCP port of every daemon.
+        codes: VCP codes read from every monitor, in any form accepted by
+            :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get`.
+            Codes a monitor does not support are left out of its values.
+        max_hosts: Maximum number of hosts reached in parallel.
+        timeout: Socket timeout of each connection in seconds.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol.fleet import Fleet
+
+            hosts = [("signage-1.local", 8584), ("signage-2.local", 8584)]
+            with Fleet(hosts) as fleet:
+                fleet.refresh()
+                fleet.dispatch(
+                    [({"model": "VG271U"}, {"op": "set", "values": {0x10: 80}})]
+                )
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[Tuple[str, int]],
+        codes: Iterable[Union[int, str, vcp.VCPCode]] = DEFAULT_CODES,
+        max_hosts: int = 64,
+        timeout: Optional[float] = 10.0,
+    ):
+        self.codes = [vcp.vcp_codes.get_vcp_code(code).value for code in codes]
+        self.max_hosts = max_hosts
+        #: Connection of every host indexed by address.
+        self.connections: Dict[str, RemoteConnection] = {
+            f"{host}:{port}": RemoteConnection(host, port, timeout)
+            for host, port in hosts
+        }
+        #: Monitors indexed by host address and index.
+        self.inventory: Dict[Tuple[str, int], FleetMonitor] = {}
+        #: Error of every host that failed the last refresh or dispatch.
+        self.errors: Dict[str, Exception] = {}
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Closes the connection to every host."""
+        for connection in self.connections.values():
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.close()
+        return False
+
+    def select(self, match: Match) -> List[FleetMonitor]:
+        """
+        Selects monitors of the inventory.
+
+        Args:
+            match: Identity fields that must all be equal, ignoring case,
+                as in :py:class:`~monitorcontrol.scene.Scene` rules.
+                ``"host"`` matches the address of the daemon.
+
+        Returns:
+            Matching monitors, ordered by host and index.
+        """
+        with self._lock:
+            monitors = [self.inventory[key] for key in sorted(self.inventory)]
+        return [monitor for monitor in monitors if matches(match, monitor.identity)]
+
+    def _map_hosts(
+        self, func: Callable[[str], Any], hosts: Iterable[str]
+    ) -> Dict[str, Union[Any, Exception]]:
+        """Calls a function for every host in parallel."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        hosts = list(hosts)
+        if not hosts:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_hosts, len(hosts))) as pool:
+            futures = {host: pool.submit(func, host) for host in hosts}
+        results = {}
+        for host, future in futures.items():
+            error = future.exception()
+            results[host] = future.result() if error is None else error
+        with self._lock:
+            for host, result in results.items():
+                if isinstance(result, Exception):
+                    self.errors[host] = result
+                else:
+                    self.errors.pop(host, None)
+        return results
+
+    def _get_values(self, index: int) -> dict:
+        return {
+            "op": "call",
+            "monitor": index,
+            "method": "get_many",
+            "args": [self.codes, True],
+        }
+
+    def _get_identity(self, index: int, fields: Sequence[str]) -> dict:
+        return {
+            "op": "call",
+            "monitor": index,
+            "method": "get_identity",
+            "args": [list(fields)],
+        }
+
+    def _refresh_host(self, host: str) -> List[FleetMonitor]:
+        connection = self.connections[host]
+        with self._lock:
+            known = sorted(index for h, index in self.inventory if h == host)
+        commands = []
+        for index in known:
+            commands += [
+                self._get_identity(index, KEY_FIELDS),
+                self._get_values(index),
+            ]
+        listing, batch = connection.pipeline(
+            [
+                {"op": "list"},
+                {"op": "batch", "parallel": True, "commands": commands},
+            ]
+        )
+        for result in (listing, batch):
+            if isinstance(result, Exception):
+                raise result
+        indices = [item["index"] for item in listing]
+        now = time.time()
+
+        # a restarted daemon may list other monitors at known indices
+        changed = []
+        known_values = {}
+        for i, index in enumerate(known):
+            identity, values = (_result(r) for r in batch[2 * i : 2 * i + 2])
+            with self._lock:
+                monitor = self.inventory.get((host, index))
+            if monitor is None or index not in indices:
+                continue
+            if isinstance(identity, Exception) or any(
+                identity.get(field) != monitor.identity.get(field)
+                for field in KEY_FIELDS
+            ):
+                continue
+            known_values[index] = values
+
+        new = [index for index in indices if index not in known_values]
+        if new:
+            commands = []
+            for index in new:
+                commands += [
+                    self._get_identity(index, IDENTITY_FIELDS),
+                    {"op": "call", "monitor": index, "method": "get_vcp_capabilities"},
+                    self._get_values(index),
+                ]
+            responses = connection.request(
+                {"op": "batch", "parallel": True, "commands": commands}
+            )
+        with self._lock:
+            for index in known:
+                if index not in known_values:
+                    self.inventory.pop((host, index), None)
+            for index, values in known_values.items():
+                monitor = self.inventory[host, index]
+                if isinstance(values, Exception):
+                    continue
+                values = {int(code): value for code, value in values.items()}
+                if values != monitor.values:
+                    monitor.values = values
+                    changed.append(monitor)
+                monitor.updated = now
+            for i, index in enumerate(new):
+                identity, capabilities, values = (
+                    _result(response) for response in responses[3 * i : 3 * i + 3]
+                )
+                if isinstance(identity, Exception):
+                    continue
+                monitor = FleetMonitor(host, index)
+                monitor.identity.update(identity)
+                if not isinstance(capabilities, Exception):
+                    monitor.capabilities = capabilities
+                    monitor.identity["model"] = capabilities["model"]
+                if not isinstance(values, Exception):
+                    monitor.values = {int(c): v for c, v in values.items()}
+                    monitor.updated = now
+                self.inventory[host, index] = monitor
+                changed.append(monitor)
+        return changed
+
+    def refresh(self, hosts: Optional[Iterable[str]] = None) -> List[FleetMonitor]:
+        """
+        Updates the inventory.
+
+        Known monitors cost one round trip per host, which reads their
+        values and checks their EDID identity, cached by the daemon.
+        Monitors that appeared since the last refresh, or whose identity
+        changed at a known index, such as after a restart of the daemon,
+        are identified with a second round trip.
+        Monitors that disappeared are removed.
+        Hosts that cannot be reached keep their monitors in the inventory and
+        are reported in :py:attr:`errors`.
+
+        Args:
+            hosts: Addresses of the hosts to refresh, every host by default.
+
+        Returns:
+            Monitors that are new or whose values changed.
+        """
+        if hosts is None:
+            hosts = self.connections
+        changed = []
+        for result in self._map_hosts(self._refresh_host, hosts).values():
+            if not isinstance(result, Exception):
+                changed += result
+        return changed
+
+    def dispatch(
+        self, commands: Sequence[Tuple[Match, dict]]
+    ) -> List[Dict[str, Union[Any, Exception]]]:
+        """
+        Runs commands on the matching monitors of the inventory.
+
+        The commands for every host are sent in one round trip.
+        The values written by successful ``set`` commands are stored in the
+        inventory.
+
+        Args:
+            commands: Match of the monitors and the request for each of them,
+                a request in the format of :py:mod:`monitorcontrol.daemon`
+                without ``"monitor"``, such as
+                ``{"op": "set", "values": {"image luminance": 80}}``.
+                Matches are as in :py:meth:`select`.
+
+        Returns:
+            Result of every command indexed by monitor key, or the exception
+            it raised.
+        """
+        per_host: Dict[str, List[Tuple[int, FleetMonitor, dict]]] = {}
+        for position, (match, request) in enumerate(commands):
+            for monitor in self.select(match):
+                request = dict(request, monitor=monitor.index)
+                per_host.setdefault(monitor.host, []).append(
+                    (position, monitor, request)
+                )
+
+        def send(host: str) -> List[Union[Any, Exception]]:
+            batch = {
+                "op": "batch",
+                "parallel": True,
+                "commands": [request for _, _, request in per_host[host]],
+            }
+            return [_result(r) for r in self.connections[host].request(batch)]
+
+        results: List[Dict[str, Union[Any, Exception]]] = [{} for _ in commands]
+        for host, host_results in self._map_hosts(send, per_host).items():
+            for i, (position, monitor, request) in enumerate(per_host[host]):
+                if isinstance(host_results, Exception):
+                    result = host_results
+                else:
+                    result = host_results[i]
+                results[position][monitor.key] = result
+                if request["op"] == "set" and not isinstance(result, Exception):
+                    with self._lock:
+                        for code, value in request["values"].items():
+                            code = vcp.vcp_codes.get_vcp_code(code).value
+                            if code in self.codes:
+                                monitor.values[code] = value
+        return results
@@ -1,8 +1,11 @@
 from . import vcp, vcp_codes
 from types import TracebackType
-from typing import List, Optional, Type, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+import contextlib
 import enum
 import sys
+import threading
+import time
 
 
 @enum.unique
@@ -83,6 +86,15 @@ class Monitor:
     All class methods must be called from within a context manager unless
     otherwise stated.
 
+    A monitor can be shared by threads.
+    The context manager is reference counted, the VCP is opened by the
+    first thread entering it and closed by the last thread leaving it.
+    Transactions of every monitor object on one bus are serialized on
+    Linux, while monitors on different buses run in parallel.
+    Cached data, such as the capabilities and the maximum values, is read
+    without locking, cache entries are replaced and never modified.
+    Timeouts and priorities apply to the calling thread only.
+
     Args:
         vcp: Virtual control panel for the monitor.
     """
@@ -90,11 +102,23 @@ class Monitor:
     def __init__(self, vcp: vcp.VCP):
         self.vcp = vcp
         self.code_maximum = {}
+        #: Parsed capabilities, cached by :py:meth:`get_vcp_capabilities`.
+        self.capabilities: Optional[dict] = None
+        #: Parsed EDID, cached by :py:meth:`get_edid`.
+        self.edid: Optional[vcp.EDID] = None
+        # last known feature values and the time.monotonic() they were seen
+        self._value_cache: Dict[int, Tuple[int, float]] = {}
         self._in_ctx = False
+        # number of entered contexts, guarded by the lock
+        self._depth = 0
+        self._lock = threading.Lock()
 
     def __enter__(self):
-        self.vcp.__enter__()
-        self._in_ctx = True
+        with self._lock:
+            if self._depth == 0:
+                self.vcp.__enter__()
+                self._in_ctx = True
+            self._depth += 1
         return self
 
     def __exit__(
@@ -103,12 +127,65 @@ class Monitor:
         exception_value: Optional[BaseException],
         exception_traceback: Optional[TracebackType],
     ) -> Optional[bool]:
-        try:
-            return self.vcp.__exit__(
-                exception_type, exception_value, exception_traceback
-            )
-        finally:
-            self._in_ctx = False
+        with self._lock:
+            self._depth -= 1
+            if self._depth > 0:
+                return False
+            try:
+                return self.vcp.__exit__(
+                    exception_type, exception_value, exception_traceback
+                )
+            finally:
+                self._in_ctx = False
+
+    @contextlib.contextmanager
+    def timeout(self, seconds: float) -> Iterator[None]:
+        """
+        Limits the time spent on VCP transactions within the context.
+
+        Transactions that cannot complete before the deadline raise
+        :py:class:`~monitorcontrol.vcp.VCPTimeoutError`
+        instead of blocking.
+
+        Args:
+            seconds: Time limit in seconds.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor, monitor.timeout(0.2):
+                        print(monitor.get_luminance())
+        """
+        with self.vcp.timeout(seconds):
+            yield
+
+    @contextlib.contextmanager
+    def prioritize(self, priority: vcp.Priority) -> Iterator[None]:
+        """
+        Sets the priority of VCP transactions within the context.
+
+        On Linux the transactions of every monitor object on one bus are
+        scheduled by priority, with a preemption point after every
+        transaction, such as one fragment of the capabilities string or one
+        code of :py:meth:`get_many`.
+
+        Args:
+            priority: Priority class.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors, Priority
+
+                for monitor in get_monitors():
+                    with monitor, monitor.prioritize(Priority.INTERACTIVE):
+                        monitor.set_luminance(80)
+        """
+        with self.vcp.prioritize(priority):
+            yield
 
     def _get_code_maximum(self, code: vcp.VCPCode) -> int:
         """
@@ -128,12 +205,28 @@ class Monitor:
         if not code.readable:
             raise TypeError(f"code is not readable: {code.name}")
 
-        if code.value in self.code_maximum:
-            return self.code_maximum[code.value]
-        else:
+        maximum = self.code_maximum.get(code.value)
+        if maximum is None:
             _, maximum = self.vcp.get_vcp_feature(code.value)
             self.code_maximum[code.value] = maximum
-            return maximum
+        return maximum
+
+    def _check_value(self, code: vcp.VCPCode, value: int):
+        """
+        Checks that a value can be written to a code.
+
+        Raises:
+            TypeError: Code is read only.
+            ValueError: Value is greater than the maximum allowable.
+            VCPError: Failed to get the maximum value.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        if not code.writeable:
+            raise TypeError(f"cannot write read-only code: {code.name}")
+        elif code.readable and code.continuous:
+            maximum = self._get_code_maximum(code)
+            if value > maximum:
+                raise ValueError(f"value of {value} exceeds code maximum of {maximum}")
 
     def _set_vcp_feature(self, code: vcp.VCPCode, value: int):
         """
@@ -148,15 +241,9 @@ class Monitor:
             ValueError: Value is greater than the maximum allowable.
             VCPError: Failed to get VCP feature.
         """
-        assert self._in_ctx, "This function must be run within the context manager"
-        if code.type == "ro":
-            raise TypeError(f"cannot write read-only code: {code.name}")
-        elif code.type == "rw" and code.function == "c":
-            maximum = self._get_code_maximum(code)
-            if value > maximum:
-                raise ValueError(f"value of {value} exceeds code maximum of {maximum}")
-
+        self._check_value(code, value)
         self.vcp.set_vcp_feature(code.value, value)
+        self._value_cache[code.value] = (value, time.monotonic())
 
     def _get_vcp_feature(self, code: vcp.VCPCode) -> int:
         """
@@ -173,12 +260,73 @@ class Monitor:
             VCPError: Failed to get VCP feature.
         """
         assert self._in_ctx, "This function must be run within the context manager"
-        if code.type == "wo":
+        if not code.readable:
             raise TypeError(f"cannot read write-only code: {code.name}")
 
         current, maximum = self.vcp.get_vcp_feature(code.value)
+        self._value_cache[code.value] = (current, time.monotonic())
         return current
 
+    def get_cached(
+        self, code: Union[int, str, vcp.VCPCode], max_age: Optional[float] = None
+    ) -> Optional[int]:
+        """
+        Gets the last value read from or written to a code, without any
+        VCP transactions.
+
+        This may be called outside of the context manager.
+
+        Args:
+            code: VCP code, in any form accepted by :py:meth:`get`.
+            max_age:
+                Maximum age of the value in seconds, or None for any age.
+
+        Returns:
+            Last known feature value, or None if there is no value that is
+            recent enough.
+        """
+        cached = self.get_cached_with_age(code)
+        if cached is None:
+            return None
+        value, age = cached
+        if max_age is not None and age > max_age:
+            return None
+        return value
+
+    def get_cached_with_age(
+        self, code: Union[int, str, vcp.VCPCode]
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Gets the last value read from or written to a code and its age,
+        without any VCP transactions.
+
+        This may be called outside of the context manager.
+
+        Args:
+            code: VCP code, in any form accepted by :py:meth:`get`.
+
+        Returns:
+            Last known feature value and its age in seconds, or None if no
+            value is known.
+        """
+        cached = self._value_cache.get(vcp_codes.get_vcp_code(code).value)
+        if cached is None:
+            return None
+        value, timestamp = cached
+        return value, time.monotonic() - timestamp
+
+    def invalidate_cached(self, code: int):
+        """
+        Forgets the cached value of a code, after it was written directly
+        through the VCP of the monitor.
+
+        This may be called outside of the context manager.
+
+        Args:
+            code: VCP code value, which need not be in the registry.
+        """
+        self._value_cache.pop(code, None)
+
     def get_vcp_capabilities(self) -> dict:
         """
         Gets the capabilities of the monitor
@@ -208,8 +356,537 @@ class Monitor:
         cap_str = self.vcp.get_vcp_capabilities()
 
         res = _parse_capabilities(cap_str)
+        self.capabilities = res
         return res
 
+    def get_edid(self) -> vcp.EDID:
+        """
+        Gets the identity of the monitor from its EDID.
+
+        The identity is stable across reboots and bus renumbering, use
+        :py:attr:`~monitorcontrol.vcp.vcp_edid.EDID.key` to key caches and
+        configuration.
+        The EDID is read once without the capabilities download, and cached.
+
+        This may be called outside of the context manager.
+
+        Returns:
+            Parsed EDID.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    print(monitor.get_edid().key)
+
+        Raises:
+            NotImplementedError: EDIDs are not supported on this platform.
+            VCPError: Failed to read the EDID.
+        """
+        if self.edid is None:
+            data = self.vcp.read_edid()
+            try:
+                self.edid = vcp.parse_edid(data)
+            except ValueError as e:
+                raise vcp.VCPReplyError(str(e)) from e
+        return self.edid
+
+    def get_identity(self, fields: Iterable[str]) -> Dict[str, str]:
+        """
+        Gets identity fields of the monitor, used to match scenes and
+        command line selectors.
+
+        The EDID is only read when an EDID field is requested, and the
+        capabilities only when the model is requested, which must be done
+        from within the context manager.
+        Fields that cannot be read are left out.
+
+        Args:
+            fields:
+                Fields to get, ``"model"`` from the capabilities,
+                ``"manufacturer"``, ``"product_code"``, ``"serial"``, and
+                ``"name"`` from the EDID (see
+                :py:attr:`~monitorcontrol.vcp.vcp_edid.EDID.identity`),
+                and ``"connector"``, the DRM connector name on Linux.
+
+        Returns:
+            Identity fields indexed by name.
+
+        Raises:
+            VCPError: Failed to get the capabilities.
+        """
+        fields = set(fields)
+        identity = {}
+        if fields & vcp.vcp_edid.EDID_FIELDS:
+            try:
+                identity.update(self.get_edid().identity)
+            except (NotImplementedError, vcp.VCPError):
+                pass
+        if "connector" in fields:
+            connector = getattr(self.vcp, "connector", None)
+            if connector is not None:
+                identity["connector"] = connector
+        if "model" in fields:
+            if self.capabilities is None:
+                self.get_vcp_capabilities()
+            identity["model"] = self.capabilities["model"]
+        return identity
+
+    def _check_supported(self, code: vcp.VCPCode):
+        """
+        Checks a code against the cached capabilities, if any.
+
+        Raises:
+            VCPUnsupportedCodeError: Code is not in the capabilities.
+        """
+        if self.capabilities is None:
+            return
+        supported = self.capabilities["vcp"]
+        if supported and code.value not in supported:
+            raise vcp.VCPUnsupportedCodeError(
+                f"code is not supported by the monitor: {code.name}"
+            )
+
+    def get(self, code: Union[int, str, vcp.VCPCode]) -> int:
+        """
+        Gets the value of any VCP code.
+
+        The code is validated against the VCP code registry, and against
+        the monitor capabilities if they have been read with
+        :py:meth:`get_vcp_capabilities`.
+
+        Args:
+            code:
+                A VCP code definition,
+                an integer code value,
+                or a code name such as ``"image sharpness"``.
+
+        Returns:
+            Current feature value.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        print(monitor.get("image sharpness"))
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is write only.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to get VCP feature.
+        """
+        code = vcp_codes.get_vcp_code(code)
+        self._check_supported(code)
+        return self._get_vcp_feature(code)
+
+    def set(self, code: Union[int, str, vcp.VCPCode], value: int):
+        """
+        Sets the value of any VCP code.
+
+        The code is validated against the VCP code registry, and against
+        the monitor capabilities if they have been read with
+        :py:meth:`get_vcp_capabilities`.
+
+        Args:
+            code:
+                A VCP code definition,
+                an integer code value,
+                or a code name such as ``"image sharpness"``.
+            value: New feature value.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        monitor.set(0x87, 50)
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is read only.
+            ValueError: Value is greater than the maximum allowable.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to set VCP feature.
+        """
+        code = vcp_codes.get_vcp_code(code)
+        self._check_supported(code)
+        self._set_vcp_feature(code, value)
+
+    def validate(self, code: Union[int, str, vcp.VCPCode], value: int) -> vcp.VCPCode:
+        """
+        Checks that :py:meth:`set` would accept a value, without writing it.
+
+        The maximum value of a continuous code is read from the monitor the
+        first time, and cached.
+
+        Args:
+            code: VCP code, in any form accepted by :py:meth:`set`.
+            value: New feature value.
+
+        Returns:
+            VCP code definition.
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is read only.
+            ValueError: Value is greater than the maximum allowable.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to get the maximum value.
+        """
+        code = vcp_codes.get_vcp_code(code)
+        self._check_supported(code)
+        self._check_value(code, value)
+        return code
+
+    def get_many(
+        self,
+        codes: Iterable[Union[int, str, vcp.VCPCode]],
+        ignore_unsupported: bool = False,
+    ) -> Dict[int, int]:
+        """
+        Gets the values of several VCP codes in one pass.
+
+        All codes are validated before the first transaction, and read
+        with :py:meth:`~monitorcontrol.vcp.vcp_abc.VCP.get_vcp_features`
+        so that remote monitors are read in one round trip.
+
+        Args:
+            codes: VCP codes, in any form accepted by :py:meth:`get`.
+            ignore_unsupported:
+                Leave out codes that are not supported by the monitor
+                instead of raising an error.
+
+        Returns:
+            Dictionary of current feature values indexed by code value.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        print(monitor.get_many([0x16, 0x18, 0x1A]))
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is write only.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to get VCP feature.
+        """
+        resolved = []
+        for code in codes:
+            code = vcp_codes.get_vcp_code(code)
+            if not code.readable:
+                raise TypeError(f"cannot read write-only code: {code.name}")
+            try:
+                self._check_supported(code)
+            except vcp.VCPUnsupportedCodeError:
+                if not ignore_unsupported:
+                    raise
+            else:
+                resolved.append(code)
+
+        assert self._in_ctx, "This function must be run within the context manager"
+        features = self.vcp.get_vcp_features(
+            [code.value for code in resolved], ignore_unsupported
+        )
+        now = time.monotonic()
+        values = {}
+        for code, (current, _) in features.items():
+            self._value_cache[code] = (current, now)
+            values[code] = current
+        return values
+
+    def set_many(
+        self, values: Dict[Union[int, str, vcp.VCPCode], int], save: bool = False
+    ):
+        """
+        Sets the values of several VCP codes in one pass, optionally saving
+        the settings once after the last write.
+
+        All codes and values are validated before the first write.
+
+        Args:
+            values:
+                Feature values indexed by code,
+                in any form accepted by :py:meth:`get`.
+            save:
+                Store the new values in the non-volatile memory of the
+                monitor with :py:meth:`save_settings`.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        monitor.set_many({0x10: 50, 0x12: 75}, save=True)
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is read only.
+            ValueError: Value is greater than the maximum allowable.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to set VCP feature or to save the settings.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        writes = [(self.validate(code, value), value) for code, value in values.items()]
+
+        for code, value in writes:
+            self._set_vcp_feature(code, value)
+        if save:
+            self.save_settings()
+
+    def save_settings(self):
+        """
+        Stores the current settings in the non-volatile memory of the
+        monitor.
+
+        Saving wears the monitor memory, save once after a group of changes
+        with :py:meth:`set_many` instead of after every change.
+
+        Raises:
+            NotImplementedError: Saving is not supported on this platform.
+            VCPError: Failed to save the settings.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        self.vcp.save_settings()
+
+    def get_timing_report(self) -> vcp.TimingReport:
+        """
+        Gets the timing of the display signal, such as the refresh rate.
+
+        Returns:
+            Timing report.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        print(monitor.get_timing_report().vertical_frequency)
+
+        Raises:
+            NotImplementedError: Timing reports are not supported on this
+                platform.
+            VCPError: Failed to get the timing report.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        return self.vcp.get_timing_report()
+
+    def _table_code(self, code: Union[int, str, vcp.VCPCode]) -> vcp.VCPCode:
+        code = vcp_codes.get_vcp_code(code)
+        if code.function is not vcp_codes.CodeFunction.t:
+            raise TypeError(f"code is not a table: {code.name}")
+        self._check_supported(code)
+        return code
+
+    def read_table(self, code: Union[int, str, vcp.VCPCode]) -> bytes:
+        """
+        Reads a table VCP code, such as a lookup table.
+
+        Args:
+            code: Table VCP code, in any form accepted by :py:meth:`get`.
+
+        Returns:
+            Table data.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        print(monitor.read_table("display identification operation"))
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is not a table or is write only.
+            NotImplementedError: Tables are not supported on this platform.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to read the table.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        code = self._table_code(code)
+        if not code.readable:
+            raise TypeError(f"cannot read write-only code: {code.name}")
+        return self.vcp.read_table(code.value)
+
+    def write_table(self, code: Union[int, str, vcp.VCPCode], data, offset: int = 0):
+        """
+        Writes a table VCP code, such as a lookup table.
+
+        Args:
+            code: Table VCP code, in any form accepted by :py:meth:`get`.
+            data: Table data, any bytes-like object.
+            offset: Offset of the data in the table.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                with open("lut.bin", "rb") as f:
+                    lut = f.read()
+
+                for monitor in get_monitors():
+                    with monitor:
+                        monitor.write_table("block lut operation", lut)
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is not a table or is read only.
+            NotImplementedError: Tables are not supported on this platform.
+            VCPUnsupportedCodeError: Code is not supported by the monitor.
+            VCPError: Failed to write the table.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        code = self._table_code(code)
+        if not code.writeable:
+            raise TypeError(f"cannot write read-only code: {code.name}")
+        self.vcp.write_table(code.value, data, offset)
+
+    def snapshot(
+        self, codes: Optional[Iterable[Union[int, str, vcp.VCPCode]]] = None
+    ) -> Dict[int, int]:
+        """
+        Reads the current state of the monitor for a later :py:meth:`restore`.
+
+        Args:
+            codes:
+                VCP codes to read, in any form accepted by :py:meth:`get`.
+                By default every readable and writeable code listed in the
+                ``vcp`` section of the capabilities is read, skipping codes
+                the monitor reports as unsupported and codes that would
+                trigger an action when restored.
+                Manufacturer specific codes are only read when listed.
+
+        Returns:
+            Dictionary of feature values indexed by code value.
+            Integer keys become strings when serialized to JSON,
+            :py:meth:`restore` accepts both.
+
+        Example:
+            Basic Usage::
+
+                import json
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        print(json.dumps(monitor.snapshot()))
+
+        Raises:
+            VCPError: Failed to get the capabilities or a VCP feature.
+        """
+        if codes is not None:
+            values = self.get_many(codes)
+        else:
+            if self.capabilities is None:
+                self.get_vcp_capabilities()
+            restorable = [
+                code
+                for code in map(vcp_codes.CODES.get, self.capabilities["vcp"])
+                if code is not None and _is_restorable(code)
+            ]
+            values = self.get_many(restorable, ignore_unsupported=True)
+
+        return {value: _normalize(value, current) for value, current in values.items()}
+
+    def plan(
+        self, state: Dict[Union[int, str], int], max_age: Optional[float] = None
+    ) -> List[Tuple[vcp.VCPCode, int]]:
+        """
+        Plans the writes needed to reach a desired state.
+
+        Only values that differ from the current state are written.
+        The monitor is turned on first (or off last), then the input source
+        and the color preset are selected before other picture settings.
+
+        Args:
+            state:
+                Desired feature values indexed by code,
+                in any form accepted by :py:meth:`get`.
+            max_age:
+                Use values cached by earlier reads and writes that are
+                at most this many seconds old instead of reading them,
+                or None to always read the current values.
+
+        Returns:
+            Codes and values to write, in write order.
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is write only.
+            VCPError: Failed to get a VCP feature.
+        """
+        desired = {
+            vcp_codes.get_vcp_code(code).value: value for code, value in state.items()
+        }
+        current = {}
+        stale = []
+        for code in desired:
+            cached = None if max_age is None else self.get_cached(code, max_age)
+            if cached is None:
+                stale.append(code)
+            else:
+                current[code] = cached
+        if stale:
+            current.update(self.get_many(stale))
+        current = {code: _normalize(code, value) for code, value in current.items()}
+        return _plan_writes(desired, current)
+
+    def restore(
+        self, snapshot: Dict[Union[int, str], int], max_age: Optional[float] = None
+    ) -> Dict[int, int]:
+        """
+        Restores a state from :py:meth:`snapshot`.
+
+        Only the values that differ from the current state are written,
+        in the order described in :py:meth:`plan`.
+
+        Args:
+            snapshot: Dictionary of feature values indexed by code.
+            max_age: Maximum age of cached values, see :py:meth:`plan`.
+
+        Returns:
+            Dictionary of the written feature values indexed by code value.
+
+        Example:
+            Basic Usage::
+
+                from monitorcontrol import get_monitors
+
+                for monitor in get_monitors():
+                    with monitor:
+                        state = monitor.snapshot()
+                        monitor.set_luminance(0)
+                        monitor.restore(state)
+
+        Raises:
+            KeyError: Code is not in the registry.
+            TypeError: Code is read only.
+            ValueError: Value is greater than the maximum allowable.
+            VCPError: Failed to get or set a VCP feature.
+        """
+        writes = self.plan(snapshot, max_age)
+        for code, value in writes:
+            self._set_vcp_feature(code, value)
+        return {code.value: value for code, value in writes}
+
     def get_luminance(self) -> int:
         """
         Gets the monitors back-light luminance.
@@ -570,6 +1247,90 @@ class Monitor:
         self._set_vcp_feature(vcp_codes.input_select, mode_value)
 
 
+# writeable codes that trigger an action or reset a status when written
+_NOT_RESTORABLE = frozenset(
+    [
+        vcp_codes.new_control_value.value,
+        vcp_codes.soft_controls.value,
+        vcp_codes.image_auto_setup.value,
+        vcp_codes.image_auto_color_setup.value,
+        vcp_codes.window_select.value,
+        vcp_codes.packet_count.value,
+        vcp_codes.header_error_count.value,
+        vcp_codes.body_crc_error_count.value,
+        vcp_codes.client_id.value,
+        vcp_codes.link_control.value,
+    ]
+)
+
+
+def _is_restorable(code: vcp.VCPCode) -> bool:
+    """
+    Returns true if a code holds state that can be read and written back.
+
+    Manufacturer specific codes are never restored since their meaning is
+    unknown, some of them trigger actions such as factory resets.
+    """
+    return (
+        code.value < 0xE0
+        and code.readable
+        and code.writeable
+        and code.function is not vcp_codes.CodeFunction.t
+        and code.value not in _NOT_RESTORABLE
+    )
+
+
+def _normalize(code: int, value: int) -> int:
+    """
+    Normalizes a read value so that it can be compared and written back.
+
+    Some monitors duplicate the input source to the reserved high byte,
+    see https://github.com/newAM/monitorcontrol/issues/59
+    """
+    if code == vcp_codes.input_select.value:
+        return value & 0xFF
+    return value
+
+
+def _write_priority(code: int, value: int) -> int:
+    """
+    Returns the order of a write, lower values are written first.
+
+    Monitors must be on before anything else is changed, and can only be
+    turned off after everything else has been changed.
+    The input source is selected before picture settings because some
+    monitors keep picture settings per input, and the color preset is
+    selected before other picture settings because presets overwrite them.
+    """
+    if code == vcp_codes.display_power_mode.value:
+        return 0 if value == PowerMode.on else 4
+    elif code == vcp_codes.input_select.value:
+        return 1
+    elif code == vcp_codes.image_color_preset.value:
+        return 2
+    return 3
+
+
+def _plan_writes(
+    desired: Dict[int, int], current: Dict[int, int]
+) -> List[Tuple[vcp.VCPCode, int]]:
+    """
+    Plans the writes needed to get from the current to the desired state.
+
+    Args:
+        desired: Desired feature values indexed by code value.
+        current: Current feature values indexed by code value.
+
+    Returns:
+        Codes and values to write, in write order.
+    """
+    writes = [
+        (code, value) for code, value in desired.items() if current.get(code) != value
+    ]
+    writes.sort(key=lambda write: _write_priority(*write))
+    return [(vcp_codes.get_vcp_code(code), value) for code, value in writes]
+
+
 def get_input_name(input_code: int) -> str:
     """
     Returns the input name for a given input code.
@@ -587,13 +1348,19 @@ def get_input_name(input_code: int) -> str:
     return input_name
 
 
-def get_vcps() -> List[vcp.VCP]:
+def get_vcps(retry_policy: Optional[vcp.RetryPolicy] = None) -> List[vcp.VCP]:
     """
     Discovers virtual control panels.
 
     This function should not be used directly in most cases, use
     :py:func:`get_monitors` get monitors with VCPs.
 
+    Args:
+        retry_policy:
+            Retry policy shared by the VCPs on Linux, None for a new policy
+            with ``LinuxVCP.RETRY_ATTEMPTS`` attempts.
+            Ignored on Windows.
+
     Returns:
         List of VCPs in a closed state.
 
@@ -601,16 +1368,21 @@ def get_vcps() -> List[vcp.VCP]:
         NotImplementedError: not implemented for your operating system
         VCPError: failed to list VCPs
     """
-    if sys.platform == "win32" or sys.platform.startswith("linux"):
+    if sys.platform == "win32":
         return vcp.get_vcps()
+    elif sys.platform.startswith("linux"):
+        return vcp.get_vcps(retry_policy)
     else:
         raise NotImplementedError(f"not implemented for {sys.platform}")
 
 
-def get_monitors() -> List[Monitor]:
+def get_monitors(retry_policy: Optional[vcp.RetryPolicy] = None) -> List[Monitor]:
     """
     Creates a list of all monitors.
 
+    Args:
+        retry_policy: Retry policy of the monitors, as in :py:func:`get_vcps`.
+
     Returns:
         List of monitors in a closed state.
 
@@ -631,7 +1403,63 @@ def get_monitors() -> List[Monitor]:
                 with monitor:
                     monitor.set_luminance(100)
     """
-    return [Monitor(v) for v in vcp.get_vcps()]
+    return [Monitor(v) for v in get_vcps(retry_policy)]
+
+
+def find_monitors(
+    field: str, value: str, retry_policy: Optional[vcp.RetryPolicy] = None
+) -> List[Monitor]:
+    """
+    Finds monitors by identity.
+
+    On Linux the monitors are found from the DRM connectors and the EDIDs
+    cached by the kernel, only the matching buses are opened.
+    Otherwise, or when no DRM connector owns an I2C bus, every monitor is
+    opened and matched with :py:meth:`Monitor.get_identity`, which can only
+    match the model on Windows.
+
+    Args:
+        field:
+            ``"serial"`` or ``"name"`` from the EDID, ``"model"`` from the
+            EDID name or the capabilities, or ``"connector"``, the DRM
+            connector name with or without the card prefix, such as
+            ``"DP-2"``.
+        value: Expected value, compared ignoring case.
+        retry_policy: Retry policy of the monitors, as in :py:func:`get_vcps`.
+
+    Returns:
+        Matching monitors in a closed state.
+
+    Raises:
+        ValueError: Unknown field.
+        VCPError: Failed to list VCPs.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol import find_monitors
+
+            for monitor in find_monitors("serial", "T5SAA0012345"):
+                with monitor:
+                    monitor.set_luminance(100)
+    """
+    find_vcps = getattr(vcp, "find_vcps", None)
+    if find_vcps is not None:
+        vcps = find_vcps(field, value, retry_policy)
+        if vcps is not None:
+            return [Monitor(v) for v in vcps]
+
+    if field != "connector" and field not in vcp.vcp_edid.EDID_FIELDS | {"model"}:
+        raise ValueError(f"unknown monitor field: {field}")
+    value = value.strip().lower()
+    monitors = []
+    for monitor in get_monitors(retry_policy):
+        with monitor:
+            identity = monitor.get_identity([field])
+        actual = identity.get(field)
+        if actual is not None and actual.strip().lower() == value:
+            monitors.append(monitor)
+    return monitors
 
 
 def _extract_a_cap(caps_str: str, key: str) -> str:
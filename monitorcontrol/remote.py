@@ -0,0 +1,347 @@
+"""
+Access to the monitors of other hosts, served by a daemon started with
+``monitorcontrol --daemon --listen HOST:PORT``.
+
+One :py:class:`RemoteConnection` per host is shared by the
+:py:class:`RemoteVCP` of every monitor on that host.
+"""
+
+from . import vcp
+from .monitorcontrol import Monitor
+from types import TracebackType
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+import json
+import socket
+import threading
+
+# exceptions raised again on the client by the name reported by the daemon
+_ERROR_TYPES: Dict[str, Type[Exception]] = {
+    error.__name__: error
+    for error in (
+        vcp.VCPError,
+        vcp.VCPIOError,
+        vcp.VCPChecksumError,
+        vcp.VCPReplyError,
+        vcp.VCPUnsupportedCodeError,
+        vcp.VCPTimeoutError,
+        vcp.VCPPermissionError,
+        IndexError,
+        KeyError,
+        TypeError,
+        ValueError,
+        NotImplementedError,
+    )
+}
+
+
+def _error(response: dict) -> Exception:
+    """Converts an error response to the exception raised by the daemon."""
+    error_type = _ERROR_TYPES.get(response.get("type"), vcp.VCPIOError)
+    return error_type(response["error"])
+
+
+def _close(connection: Tuple[socket.socket, BinaryIO]):
+    sock, file = connection
+    file.close()
+    sock.close()
+
+
+class RemoteConnection:
+    """
+    Long-lived connections to the daemon of another host.
+
+    Requests are pipelined: :py:meth:`pipeline` sends every request before
+    reading the responses, which the daemon sends back together.
+    The connection is safe to share between threads.
+    Every socket carries one pipeline at a time, so threads that send
+    requests at the same time use up to ``max_sockets`` sockets, which the
+    daemon serves in parallel, and idle sockets are kept open for reuse.
+    A broken socket is closed and a new one is opened by the next request.
+
+    Args:
+        host: Host name or address of the daemon.
+        port: TCP port of the daemon.
+        timeout: Socket timeout in seconds.
+        max_sockets: Maximum number of sockets open at the same time.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol.remote import RemoteConnection, get_remote_monitors
+
+            with RemoteConnection("signage-1.local", 8584) as connection:
+                for monitor in get_remote_monitors(connection):
+                    with monitor:
+                        monitor.set_luminance(80)
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = 10.0,
+        max_sockets: int = 8,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_sockets)
+        # guards the idle sockets and the generation
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[socket.socket, BinaryIO]] = []
+        # sockets opened before the last close are not reused
+        self._generation = 0
+
+    def _connect(self, timeout: Optional[float]) -> Tuple[socket.socket, BinaryIO]:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout)
+        except OSError as e:
+            raise vcp.VCPIOError(f"unable to connect to {self.host}:{self.port}") from e
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, sock.makefile("rb")
+
+    def close(self):
+        """Closes the idle sockets, sockets in use are closed once idle."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for connection in idle:
+            _close(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.close()
+        return False
+
+    def pipeline(
+        self, requests: Sequence[dict], timeout: Optional[float] = None
+    ) -> List[Union[Any, Exception]]:
+        """
+        Sends several requests in one write and reads their responses.
+
+        Args:
+            requests: Requests in the format of :py:mod:`monitorcontrol.daemon`.
+            timeout:
+                Socket timeout of this call in seconds, used when it is
+                shorter than the timeout of the connection.
+
+        Returns:
+            Result of each request, or the exception it raised in the daemon.
+
+        Raises:
+            VCPIOError: Lost the connection to the daemon.
+            VCPTimeoutError: The timeout of this call was exceeded.
+        """
+        data = b"".join(json.dumps(request).encode() + b"\n" for request in requests)
+        limited = timeout is not None and (
+            self.timeout is None or timeout < self.timeout
+        )
+        if not limited:
+            timeout = self.timeout
+        if not self._slots.acquire(timeout=-1 if timeout is None else timeout):
+            raise vcp.VCPTimeoutError("VCP deadline exceeded")
+        try:
+            with self._lock:
+                generation = self._generation
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = self._connect(timeout)
+            sock, file = connection
+            try:
+                sock.settimeout(timeout)
+                sock.sendall(data)
+                lines = [file.readline() for _ in requests]
+                sock.settimeout(self.timeout)
+            except OSError as e:
+                # a late response would be read by the next request
+                _close(connection)
+                if limited and isinstance(e, TimeoutError):
+                    raise vcp.VCPTimeoutError("VCP deadline exceeded") from e
+                raise vcp.VCPIOError("lost the connection to the daemon") from e
+            if not all(lines):
+                _close(connection)
+                raise vcp.VCPIOError("daemon closed the connection")
+            with self._lock:
+                reuse = generation == self._generation
+                if reuse:
+                    self._idle.append(connection)
+            if not reuse:
+                _close(connection)
+        finally:
+            self._slots.release()
+        results = []
+        for line in lines:
+            response = json.loads(line)
+            results.append(response["result"] if response["ok"] else _error(response))
+        return results
+
+    def request(self, request: dict, timeout: Optional[float] = None) -> Any:
+        """
+        Sends a request and waits for the response.
+
+        Args:
+            request: Request in the format of :py:mod:`monitorcontrol.daemon`.
+            timeout: Socket timeout of this call, as in :py:meth:`pipeline`.
+
+        Returns:
+            Result of the request.
+
+        Raises:
+            VCPError: The request failed in the daemon.
+                VCP errors and builtin errors such as ``ValueError`` are
+                raised again with the type raised in the daemon.
+        """
+        (result,) = self.pipeline([request], timeout)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class RemoteVCP(vcp.VCP):
+    """
+    Virtual control panel of a monitor on another host.
+
+    The daemon keeps the monitor open, so entering the context does not
+    cost a round trip.
+    :py:meth:`get_vcp_features` reads several codes in one round trip.
+
+    Args:
+        connection: Connection to the daemon of the host.
+        index: Index of the monitor on the host.
+    """
+
+    def __init__(self, connection: RemoteConnection, index: int):
+        self.connection = connection
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f"RemoteVCP({self.connection.host}:{self.connection.port}, {self.index})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        return False
+
+    def _call(self, method: str, *args) -> Any:
+        return self.connection.request(
+            {"op": "vcp", "monitor": self.index, "method": method, "args": list(args)},
+            self.time_remaining(),
+        )
+
+    def set_vcp_feature(self, code: int, value: int):
+        """
+        Sets the value of a feature on the virtual control panel.
+
+        Args:
+            code: Feature code.
+            value: Feature value.
+
+        Raises:
+            VCPError: Failed to set VCP feature.
+        """
+        self._call("set_vcp_feature", code, value)
+
+    def get_vcp_feature(self, code: int) -> Tuple[int, int]:
+        """
+        Gets the value of a feature from the virtual control panel.
+
+        Args:
+            code: Feature code.
+
+        Returns:
+            Current feature value, maximum feature value.
+
+        Raises:
+            VCPError: Failed to get VCP feature.
+        """
+        current, maximum = self._call("get_vcp_feature", code)
+        return current, maximum
+
+    def get_vcp_features(
+        self, codes: Iterable[int], ignore_unsupported: bool = False
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Gets the values of several features in one round trip.
+
+        Args:
+            codes: Feature codes.
+            ignore_unsupported:
+                Leave out codes that the monitor reports as unsupported
+                instead of raising an error.
+
+        Returns:
+            Current feature value and maximum feature value indexed by code.
+
+        Raises:
+            VCPError: Failed to get a VCP feature.
+        """
+        values = self._call("get_vcp_features", list(codes), ignore_unsupported)
+        return {
+            int(code): (current, maximum) for code, (current, maximum) in values.items()
+        }
+
+    def get_vcp_capabilities(self) -> str:
+        """
+        Gets capabilities string from the virtual control panel.
+
+        Returns:
+            Capabilities string, such as
+            "(prot(monitor)type(LCD)model(ACER VG271U)cmds(01 02 03 07 0C)".
+
+        Raises:
+            VCPError: Failed to get the capabilities.
+        """
+        return self._call("get_vcp_capabilities")
+
+    def save_settings(self):
+        """
+        Stores the current settings in the non-volatile memory of the
+        monitor.
+
+        Raises:
+            VCPError: Failed to save the settings.
+        """
+        self._call("save_settings")
+
+
+def get_remote_monitors(connection: RemoteConnection) -> List[Monitor]:
+    """
+    Lists the monitors served by the daemon of another host.
+
+    Args:
+        connection: Connection to the daemon of the host.
+
+    Returns:
+        Monitors in a closed state.
+
+    Raises:
+        VCPIOError: Failed to reach the daemon.
+    """
+    return [
+        Monitor(RemoteVCP(connection, item["index"]))
+        for item in connection.request({"op": "list"})
+    ]
@@ -0,0 +1,216 @@
+from .monitorcontrol import Monitor
+from .vcp import vcp_codes
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+Match = Dict[str, str]
+State = Dict[Union[int, str], int]
+
+
+class Scene:
+    """
+    A named set of desired monitor states, such as a "day" or "night"
+    profile.
+
+    Each rule pairs a match with a state.
+    A monitor receives the merged states of every rule that matches it,
+    with later rules taking precedence over earlier rules.
+
+    Args:
+        name: Scene name.
+        rules:
+            Sequence of match and state pairs.
+            The match is a dictionary of identity fields that must all be
+            equal (ignoring case), an empty match matches every monitor.
+            Supported identity fields are listed in
+            :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get_identity`,
+            fields that cannot be read never match.
+            The state is a dictionary of feature values indexed by code,
+            in any form accepted by :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get`.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol import get_monitors, Scene, apply_scene
+
+            night = Scene(
+                "night",
+                [
+                    ({}, {"image luminance": 20}),
+                    ({"model": "ACER VG271U"}, {"image contrast": 40}),
+                    ({"serial": "T5SAA0012345"}, {"image luminance": 30}),
+                ],
+            )
+            apply_scene(night, get_monitors())
+    """
+
+    def __init__(self, name: str, rules: Sequence[Tuple[Match, State]]):
+        self.name = name
+        self.rules = list(rules)
+
+    def __repr__(self) -> str:
+        return f"Scene({self.name!r}, {self.rules!r})"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Scene":
+        """
+        Creates a scene from a dictionary, such as one loaded from JSON.
+
+        Args:
+            data: Dictionary in the format of :py:meth:`to_dict`.
+        """
+        return cls(
+            data.get("name", ""),
+            [
+                (rule.get("match", {}), rule.get("state", {}))
+                for rule in data.get("monitors", [])
+            ],
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Converts the scene to a dictionary that can be serialized to JSON::
+
+            {
+                "name": "night",
+                "monitors": [
+                    {"match": {}, "state": {"image luminance": 20}},
+                    {"match": {"model": "ACER VG271U"}, "state": {"18": 40}},
+                ],
+            }
+        """
+        return {
+            "name": self.name,
+            "monitors": [
+                {"match": dict(match), "state": dict(state)}
+                for match, state in self.rules
+            ],
+        }
+
+    @property
+    def match_fields(self) -> List[str]:
+        """Identity fields used by the rules of this scene."""
+        return sorted({field for match, _ in self.rules for field in match})
+
+    def state_for(self, identity: Dict[str, str]) -> Dict[int, int]:
+        """
+        Merges the states of every rule matching a monitor identity.
+
+        Codes are merged by value, so a later rule takes precedence whichever
+        form of the code either rule uses.
+
+        Args:
+            identity: Identity fields of the monitor.
+
+        Returns:
+            Desired feature values indexed by code value.
+
+        Raises:
+            KeyError: A matching rule has an unknown code.
+        """
+        state = {}
+        for match, rule_state in self.rules:
+            if matches(match, identity):
+                state.update(
+                    (vcp_codes.get_vcp_code(code).value, value)
+                    for code, value in rule_state.items()
+                )
+        return state
+
+    def apply(
+        self, monitor: Monitor, max_age: Optional[float] = None, dry_run: bool = False
+    ) -> Dict[int, int]:
+        """
+        Applies the scene to one monitor, writing only the values that change.
+
+        This must be called from within the monitor context manager.
+
+        Args:
+            monitor: Monitor to update.
+            max_age: Maximum age of cached values, see :py:func:`apply_scene`.
+            dry_run: Plan the writes without writing anything.
+
+        Returns:
+            Dictionary of the written feature values indexed by code value.
+        """
+        state = self.state_for(monitor.get_identity(self.match_fields))
+        if not state:
+            return {}
+        if dry_run:
+            return {code.value: value for code, value in monitor.plan(state, max_age)}
+        return monitor.restore(state, max_age)
+
+
+def _apply(
+    scene: Scene, monitor: Monitor, max_age: Optional[float], dry_run: bool
+) -> Dict[int, int]:
+    with monitor:
+        return scene.apply(monitor, max_age, dry_run)
+
+
+def _field_matches(identity: Dict[str, str], field: str, expected) -> bool:
+    actual = identity.get(field)
+    if actual is None:
+        return False
+    return str(actual).strip().lower() == str(expected).strip().lower()
+
+
+def matches(match: Match, identity: Dict[str, str]) -> bool:
+    """
+    Checks an identity against a match.
+
+    Args:
+        match: Identity fields that must all be equal, ignoring case.
+        identity: Identity fields of a monitor.
+
+    Returns:
+        True if every field of the match is equal, an empty match matches
+        every identity.
+    """
+    return all(_field_matches(identity, k, v) for k, v in match.items())
+
+
+def apply_scene(
+    scene: Scene,
+    monitors: Sequence[Monitor],
+    max_age: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> List[Dict[int, int]]:
+    """
+    Applies a scene to monitors, writing only the values that change.
+
+    Every monitor has its own bus, so monitors are updated in parallel.
+    The writes for each monitor are ordered as described in
+    :py:meth:`~monitorcontrol.monitorcontrol.Monitor.plan`.
+
+    Args:
+        scene: Scene to apply.
+        monitors: Monitors in a closed state.
+        max_age:
+            Use cached values that are at most this many seconds old
+            instead of reading them, or None to always read.
+        max_workers: Maximum number of monitors updated at once.
+        dry_run: Plan the writes without writing anything.
+
+    Returns:
+        Dictionary of the written feature values for each monitor,
+        indexed by code value.
+
+    Raises:
+        VCPError: Failed to update a monitor.
+            Every other monitor is still updated.
+    """
+    if not monitors:
+        return []
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(monitors)) as executor:
+        futures = [
+            executor.submit(_apply, scene, monitor, max_age, dry_run)
+            for monitor in monitors
+        ]
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
@@ -1,13 +1,21 @@
 import sys
 from .vcp_codes import VCPCode  # noqa: F401
 from .vcp_abc import (  # noqa: F401
+    Priority,
+    TimingReport,
     VCP,
+    VCPChecksumError,
     VCPError,
     VCPIOError,
     VCPPermissionError,
+    VCPReplyError,
+    VCPTimeoutError,
+    VCPUnsupportedCodeError,
 )
+from .vcp_retry import RetryPolicy  # noqa: F401
+from .vcp_edid import EDID, parse_edid  # noqa: F401
 
 if sys.platform == "win32":
     from .vcp_windows import get_vcps  # noqa: F401
 elif sys.platform.startswith("linux"):
-    from .vcp_linux import get_vcps  # noqa: F401
+    from .vcp_linux import find_vcps, get_vcps  # noqa: F401
@@ -1,6 +1,10 @@
-import abc
 from types import TracebackType
-from typing import Optional, Tuple, Type
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Type
+import abc
+import contextlib
+import enum
+import threading
+import time
 
 
 class VCPError(Exception):
@@ -15,13 +19,216 @@ class VCPIOError(VCPError):
     pass
 
 
+class VCPChecksumError(VCPIOError):
+    """Raised when the checksum of a reply does not match."""
+
+    pass
+
+
+class VCPReplyError(VCPIOError):
+    """Raised on replies with an unexpected reply code, opcode, or length."""
+
+    pass
+
+
+class VCPUnsupportedCodeError(VCPIOError):
+    """Raised when the monitor reports that a VCP code is unsupported."""
+
+    pass
+
+
+class VCPTimeoutError(VCPIOError):
+    """Raised when a VCP transaction does not complete before the deadline."""
+
+    pass
+
+
 class VCPPermissionError(VCPError):
     """Raised on VCP permission errors."""
 
     pass
 
 
+class TimingReport:
+    """
+    Display timing reported by a monitor.
+
+    Args:
+        status: Timing status byte.
+        horizontal_frequency: Horizontal frequency in Hz.
+        vertical_frequency: Vertical frequency in Hz.
+    """
+
+    __slots__ = ("status", "horizontal_frequency", "vertical_frequency")
+
+    def __init__(
+        self, status: int, horizontal_frequency: float, vertical_frequency: float
+    ):
+        self.status = status
+        self.horizontal_frequency = horizontal_frequency
+        self.vertical_frequency = vertical_frequency
+
+    def __repr__(self) -> str:
+        return (
+            f"TimingReport(status=0x{self.status:02X}, "
+            f"horizontal_frequency={self.horizontal_frequency}, "
+            f"vertical_frequency={self.vertical_frequency})"
+        )
+
+    @property
+    def out_of_range(self) -> bool:
+        """True if the sync frequency is out of the monitor range."""
+        return bool(self.status & 0x80)
+
+    @property
+    def unstable(self) -> bool:
+        """True if the sync counts are unstable."""
+        return bool(self.status & 0x40)
+
+    @property
+    def horizontal_sync_positive(self) -> bool:
+        """True if the horizontal sync polarity is positive."""
+        return bool(self.status & 0x02)
+
+    @property
+    def vertical_sync_positive(self) -> bool:
+        """True if the vertical sync polarity is positive."""
+        return bool(self.status & 0x01)
+
+
+@enum.unique
+class Priority(enum.IntEnum):
+    """
+    Priority classes of the transactions on a bus, lower values go first.
+    """
+
+    #: Commands a user is waiting for, such as hotkeys and sliders.
+    INTERACTIVE = 0
+    #: Default priority.
+    NORMAL = 1
+    #: Polling and inventory scrapes.
+    BACKGROUND = 2
+
+
+class _ThreadContext(threading.local):
+    """Transaction limits of one thread."""
+
+    deadline: Optional[float] = None
+    priority: Priority = Priority.NORMAL
+
+
 class VCP(abc.ABC):
+    """
+    Virtual control panel of a monitor.
+
+    The deadline and the priority are kept per thread, so threads sharing
+    a VCP do not see each other's :py:meth:`timeout` and
+    :py:meth:`prioritize` contexts.
+    """
+
+    @property
+    def _context(self) -> _ThreadContext:
+        try:
+            return self.__dict__["_thread_context"]
+        except KeyError:
+            # setdefault is atomic, racing threads get the same context
+            return self.__dict__.setdefault("_thread_context", _ThreadContext())
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """
+        Absolute :py:func:`time.monotonic` deadline for transactions of the
+        calling thread, or None for no deadline.
+        """
+        return self._context.deadline
+
+    @deadline.setter
+    def deadline(self, deadline: Optional[float]):
+        self._context.deadline = deadline
+
+    @property
+    def priority(self) -> Priority:
+        """
+        Priority of transactions of the calling thread on a bus shared with
+        other VCPs.
+        """
+        return self._context.priority
+
+    @priority.setter
+    def priority(self, priority: Priority):
+        self._context.priority = priority
+
+    @contextlib.contextmanager
+    def timeout(self, seconds: float) -> Iterator[None]:
+        """
+        Limits the time spent on transactions within the context.
+
+        Nested limits never extend the deadline of an outer limit.
+        Waits for the bus end by the deadline.
+        Blocking I/O is bounded only where the backend can bound it, on
+        Linux by lowering the timeout of the I2C adapter, which some adapter
+        drivers ignore.
+        Reads from the ``ddcci`` driver and the Windows API calls are not
+        bounded.
+
+        Args:
+            seconds: Time limit in seconds.
+
+        Example:
+            Basic Usage::
+
+                with vcp.timeout(0.2):
+                    vcp.get_vcp_feature(0x10)
+
+        Raises:
+            VCPTimeoutError: Raised by transactions exceeding the deadline.
+        """
+        previous = self.deadline
+        deadline = time.monotonic() + seconds
+        if previous is not None:
+            deadline = min(deadline, previous)
+        self.deadline = deadline
+        try:
+            yield
+        finally:
+            self.deadline = previous
+
+    @contextlib.contextmanager
+    def prioritize(self, priority: Priority) -> Iterator[None]:
+        """
+        Sets the priority of transactions within the context.
+
+        Args:
+            priority: Priority class.
+
+        Example:
+            Basic Usage::
+
+                with vcp.prioritize(Priority.INTERACTIVE):
+                    vcp.set_vcp_feature(0x10, 80)
+        """
+        previous = self.priority
+        self.priority = priority
+        try:
+            yield
+        finally:
+            self.priority = previous
+
+    def time_remaining(self) -> Optional[float]:
+        """
+        Returns the time remaining until the deadline in seconds,
+        or None if there is no deadline.
+
+        Raises:
+            VCPTimeoutError: The deadline has passed.
+        """
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise VCPTimeoutError("VCP deadline exceeded")
+        return remaining
+
     @abc.abstractmethod
     def __enter__(self):
         pass
@@ -64,3 +271,106 @@ class VCP(abc.ABC):
             VCPError: Failed to get VCP feature.
         """
         pass
+
+    def get_vcp_features(
+        self, codes: Iterable[int], ignore_unsupported: bool = False
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Gets the values of several features from the virtual control panel.
+
+        Implementations can override this to batch the transactions,
+        by default every code is read with ``get_vcp_feature``.
+
+        Args:
+            codes: Feature codes.
+            ignore_unsupported:
+                Leave out codes that the monitor reports as unsupported
+                instead of raising an error.
+
+        Returns:
+            Current feature value and maximum feature value indexed by code.
+
+        Raises:
+            VCPError: Failed to get a VCP feature.
+        """
+        values = {}
+        for code in codes:
+            try:
+                values[code] = self.get_vcp_feature(code)
+            except VCPUnsupportedCodeError:
+                if not ignore_unsupported:
+                    raise
+        return values
+
+    def read_table(self, code: int) -> bytes:
+        """
+        Reads a table feature from the virtual control panel.
+
+        Args:
+            code: Feature code.
+
+        Returns:
+            Table data.
+
+        Raises:
+            NotImplementedError: Tables are not supported by this VCP.
+            VCPError: Failed to read the table.
+        """
+        raise NotImplementedError(f"tables are not supported by {type(self).__name__}")
+
+    def write_table(self, code: int, data, offset: int = 0):
+        """
+        Writes a table feature to the virtual control panel.
+
+        Args:
+            code: Feature code.
+            data: Table data, any bytes-like object.
+            offset: Offset of the data in the table.
+
+        Raises:
+            NotImplementedError: Tables are not supported by this VCP.
+            VCPError: Failed to write the table.
+        """
+        raise NotImplementedError(f"tables are not supported by {type(self).__name__}")
+
+    def read_edid(self) -> bytes:
+        """
+        Reads the EDID of the monitor, which identifies it independent of
+        the bus it is attached to.
+
+        Returns:
+            EDID, at least the 128 byte base block.
+
+        Raises:
+            NotImplementedError: EDIDs are not supported by this VCP.
+            VCPError: Failed to read the EDID.
+        """
+        raise NotImplementedError(f"EDIDs are not supported by {type(self).__name__}")
+
+    def save_settings(self):
+        """
+        Stores the current settings in the non-volatile memory of the
+        monitor.
+
+        Raises:
+            NotImplementedError: Saving is not supported by this VCP.
+            VCPError: Failed to save the settings.
+        """
+        raise NotImplementedError(
+            f"saving settings is not supported by {type(self).__name__}"
+        )
+
+    def get_timing_report(self) -> TimingReport:
+        """
+        Gets the timing of the display signal.
+
+        Returns:
+            Timing report.
+
+        Raises:
+            NotImplementedError: Timing reports are not supported by this VCP.
+            VCPError: Failed to get the timing report.
+        """
+        raise NotImplementedError(
+            f"timing reports are not supported by {type(self).__name__}"
+        )
@@ -1,8 +1,39 @@
+from typing import Dict, Optional, Tuple, Union
+import enum
+
+
+@enum.unique
+class CodeType(str, enum.Enum):
+    """VCP code access types."""
+
+    #: Read and write.
+    rw = "rw"
+    #: Read only.
+    ro = "ro"
+    #: Write only.
+    wo = "wo"
+
+
+@enum.unique
+class CodeFunction(str, enum.Enum):
+    """VCP code functions."""
+
+    #: Continuous value.
+    c = "c"
+    #: Non-continuous value.
+    nc = "nc"
+    #: Table.
+    t = "t"
+
+
 class VCPCode:
     """
-    Virtual Control Panel code.  Simple container for the control
+    Virtual Control Panel code.  Immutable container for the control
     codes defined by the VESA Monitor Control Command Set (MCCS).
 
+    Access flags are computed once on creation.
+    The type and function compare equal to their string values.
+
     Args:
         name: VCP code name.
         value: VCP code value.
@@ -10,57 +41,143 @@ class VCPCode:
         function: VCP code function.
 
     Raises:
-        KeyError: VCP code not found.
+        ValueError: Invalid VCP code type or function.
     """
 
-    def __init__(self, name: str, value: int, code_type: str, function: str):
-        self.name = name
-        self.value = value
-        self.type = code_type
-        self.function = function
+    __slots__ = (
+        "name",
+        "value",
+        "type",
+        "function",
+        "readable",
+        "writeable",
+        "continuous",
+    )
+
+    name: str
+    value: int
+    type: CodeType
+    function: CodeFunction
+    #: True if the code can be read.
+    readable: bool
+    #: True if the code can be written.
+    writeable: bool
+    #: True if the code has a continuous value with a maximum.
+    continuous: bool
+
+    def __init__(
+        self,
+        name: str,
+        value: int,
+        code_type: Union[str, CodeType],
+        function: Union[str, CodeFunction],
+    ):
+        code_type = CodeType(code_type)
+        function = CodeFunction(function)
+        init = super().__setattr__
+        init("name", name)
+        init("value", value)
+        init("type", code_type)
+        init("function", function)
+        init("readable", code_type is not CodeType.wo)
+        init("writeable", code_type is not CodeType.ro)
+        init("continuous", function is CodeFunction.c)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"VCPCode is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"VCPCode is immutable, cannot delete {name}")
+
+    def __reduce__(self):
+        return (VCPCode, (self.name, self.value, self.type.value, self.function.value))
 
     def __str__(self) -> str:
         return self.name
 
     def __repr__(self) -> str:
-        return f"{self.name} {self.value=} {self.type=} {self.function=}"
-
-    @property
-    def readable(self) -> bool:
-        """Returns true if the code can be read."""
-        if self.type == "wo":
-            return False
-        else:
-            return True
-
-    @property
-    def writeable(self) -> bool:
-        """Returns true if the code can be written."""
-        if self.type == "ro":
-            return False
-        else:
-            return True
-
-
-# incomplete list of VCP codes from the MCCS specification
+        return f"{self.name} {self.value=} {self.type.value=} {self.function.value=}"
+
+
+# VCP codes from the MCCS 2.2a and 3.0 specifications
 # please add new codes to the VCP_CODES list in test_vcp_codes.py
+degauss = VCPCode(
+    name="degauss",
+    value=0x01,
+    code_type="wo",
+    function="nc",
+)
+new_control_value = VCPCode(
+    name="new control value",
+    value=0x02,
+    code_type="rw",
+    function="nc",
+)
+soft_controls = VCPCode(
+    name="soft controls",
+    value=0x03,
+    code_type="rw",
+    function="nc",
+)
 image_factory_default = VCPCode(
     name="restore factory default image",
     value=0x04,
     code_type="wo",
     function="nc",
 )
+restore_factory_luminance_contrast = VCPCode(
+    name="restore factory luminance contrast defaults",
+    value=0x05,
+    code_type="wo",
+    function="nc",
+)
+restore_factory_geometry = VCPCode(
+    name="restore factory geometry defaults",
+    value=0x06,
+    code_type="wo",
+    function="nc",
+)
+restore_factory_color = VCPCode(
+    name="restore factory color defaults",
+    value=0x08,
+    code_type="wo",
+    function="nc",
+)
+restore_factory_tv = VCPCode(
+    name="restore factory tv defaults",
+    value=0x0A,
+    code_type="wo",
+    function="nc",
+)
+image_color_temperature_increment = VCPCode(
+    name="image color temperature increment",
+    value=0x0B,
+    code_type="ro",
+    function="nc",
+)
+image_color_temperature_request = VCPCode(
+    name="image color temperature request",
+    value=0x0C,
+    code_type="rw",
+    function="c",
+)
+image_clock = VCPCode(
+    name="image clock",
+    value=0x0E,
+    code_type="rw",
+    function="c",
+)
 image_luminance = VCPCode(
     name="image luminance",
     value=0x10,
     code_type="rw",
     function="c",
 )
-sound_volume = VCPCode(
-    name="sound volume",
-    value=0x62,
+image_flesh_tone_enhancement = VCPCode(
+    name="image flesh tone enhancement",
+    value=0x11,
     code_type="rw",
-    function="c",
+    function="nc",
 )
 image_contrast = VCPCode(
     name="image contrast",
@@ -68,33 +185,777 @@ image_contrast = VCPCode(
     code_type="rw",
     function="c",
 )
+image_backlight = VCPCode(
+    name="image backlight",
+    value=0x13,
+    code_type="rw",
+    function="c",
+)
 image_color_preset = VCPCode(
     name="image color preset",
     value=0x14,
     code_type="rw",
     function="nc",
 )
+image_red_gain = VCPCode(
+    name="image red gain",
+    value=0x16,
+    code_type="rw",
+    function="c",
+)
+image_color_vision_compensation = VCPCode(
+    name="image color vision compensation",
+    value=0x17,
+    code_type="rw",
+    function="c",
+)
+image_green_gain = VCPCode(
+    name="image green gain",
+    value=0x18,
+    code_type="rw",
+    function="c",
+)
+image_blue_gain = VCPCode(
+    name="image blue gain",
+    value=0x1A,
+    code_type="rw",
+    function="c",
+)
+image_focus = VCPCode(
+    name="image focus",
+    value=0x1C,
+    code_type="rw",
+    function="c",
+)
+image_auto_setup = VCPCode(
+    name="image auto setup",
+    value=0x1E,
+    code_type="rw",
+    function="nc",
+)
+image_auto_color_setup = VCPCode(
+    name="image auto color setup",
+    value=0x1F,
+    code_type="rw",
+    function="nc",
+)
+geometry_horizontal_position = VCPCode(
+    name="geometry horizontal position",
+    value=0x20,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_size = VCPCode(
+    name="geometry horizontal size",
+    value=0x22,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_pincushion = VCPCode(
+    name="geometry horizontal pincushion",
+    value=0x24,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_pincushion_balance = VCPCode(
+    name="geometry horizontal pincushion balance",
+    value=0x26,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_convergence_rb = VCPCode(
+    name="geometry horizontal convergence rb",
+    value=0x28,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_convergence_mg = VCPCode(
+    name="geometry horizontal convergence mg",
+    value=0x29,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_linearity = VCPCode(
+    name="geometry horizontal linearity",
+    value=0x2A,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_linearity_balance = VCPCode(
+    name="geometry horizontal linearity balance",
+    value=0x2C,
+    code_type="rw",
+    function="c",
+)
+image_gray_scale_expansion = VCPCode(
+    name="image gray scale expansion",
+    value=0x2E,
+    code_type="rw",
+    function="nc",
+)
+geometry_vertical_position = VCPCode(
+    name="geometry vertical position",
+    value=0x30,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_size = VCPCode(
+    name="geometry vertical size",
+    value=0x32,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_pincushion = VCPCode(
+    name="geometry vertical pincushion",
+    value=0x34,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_pincushion_balance = VCPCode(
+    name="geometry vertical pincushion balance",
+    value=0x36,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_convergence_rb = VCPCode(
+    name="geometry vertical convergence rb",
+    value=0x38,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_convergence_mg = VCPCode(
+    name="geometry vertical convergence mg",
+    value=0x39,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_linearity = VCPCode(
+    name="geometry vertical linearity",
+    value=0x3A,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_linearity_balance = VCPCode(
+    name="geometry vertical linearity balance",
+    value=0x3C,
+    code_type="rw",
+    function="c",
+)
+image_clock_phase = VCPCode(
+    name="image clock phase",
+    value=0x3E,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_parallelogram = VCPCode(
+    name="geometry horizontal parallelogram",
+    value=0x40,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_parallelogram = VCPCode(
+    name="geometry vertical parallelogram",
+    value=0x41,
+    code_type="rw",
+    function="c",
+)
+geometry_horizontal_keystone = VCPCode(
+    name="geometry horizontal keystone",
+    value=0x42,
+    code_type="rw",
+    function="c",
+)
+geometry_vertical_keystone = VCPCode(
+    name="geometry vertical keystone",
+    value=0x43,
+    code_type="rw",
+    function="c",
+)
+geometry_rotation = VCPCode(
+    name="geometry rotation",
+    value=0x44,
+    code_type="rw",
+    function="c",
+)
+geometry_top_corner_flare = VCPCode(
+    name="geometry top corner flare",
+    value=0x46,
+    code_type="rw",
+    function="c",
+)
+geometry_top_corner_hook = VCPCode(
+    name="geometry top corner hook",
+    value=0x48,
+    code_type="rw",
+    function="c",
+)
+geometry_bottom_corner_flare = VCPCode(
+    name="geometry bottom corner flare",
+    value=0x4A,
+    code_type="rw",
+    function="c",
+)
+geometry_bottom_corner_hook = VCPCode(
+    name="geometry bottom corner hook",
+    value=0x4C,
+    code_type="rw",
+    function="c",
+)
 active_control = VCPCode(
     name="active control",
     value=0x52,
     code_type="ro",
     function="nc",
 )
+performance_preservation = VCPCode(
+    name="performance preservation",
+    value=0x54,
+    code_type="rw",
+    function="nc",
+)
+image_horizontal_moire = VCPCode(
+    name="image horizontal moire",
+    value=0x56,
+    code_type="rw",
+    function="c",
+)
+image_vertical_moire = VCPCode(
+    name="image vertical moire",
+    value=0x58,
+    code_type="rw",
+    function="c",
+)
+image_saturation_red = VCPCode(
+    name="image saturation red",
+    value=0x59,
+    code_type="rw",
+    function="c",
+)
+image_saturation_yellow = VCPCode(
+    name="image saturation yellow",
+    value=0x5A,
+    code_type="rw",
+    function="c",
+)
+image_saturation_green = VCPCode(
+    name="image saturation green",
+    value=0x5B,
+    code_type="rw",
+    function="c",
+)
+image_saturation_cyan = VCPCode(
+    name="image saturation cyan",
+    value=0x5C,
+    code_type="rw",
+    function="c",
+)
+image_saturation_blue = VCPCode(
+    name="image saturation blue",
+    value=0x5D,
+    code_type="rw",
+    function="c",
+)
+image_saturation_magenta = VCPCode(
+    name="image saturation magenta",
+    value=0x5E,
+    code_type="rw",
+    function="c",
+)
 input_select = VCPCode(
     name="input select",
     value=0x60,
     code_type="rw",
     function="nc",
 )
+sound_volume = VCPCode(
+    name="sound volume",
+    value=0x62,
+    code_type="rw",
+    function="c",
+)
+sound_speaker_select = VCPCode(
+    name="sound speaker select",
+    value=0x63,
+    code_type="rw",
+    function="nc",
+)
+sound_microphone_volume = VCPCode(
+    name="sound microphone volume",
+    value=0x64,
+    code_type="rw",
+    function="c",
+)
+ambient_light_sensor = VCPCode(
+    name="ambient light sensor",
+    value=0x66,
+    code_type="rw",
+    function="nc",
+)
+image_backlight_white = VCPCode(
+    name="image backlight white",
+    value=0x6B,
+    code_type="rw",
+    function="c",
+)
+image_red_black_level = VCPCode(
+    name="image red black level",
+    value=0x6C,
+    code_type="rw",
+    function="c",
+)
+image_backlight_red = VCPCode(
+    name="image backlight red",
+    value=0x6D,
+    code_type="rw",
+    function="c",
+)
+image_green_black_level = VCPCode(
+    name="image green black level",
+    value=0x6E,
+    code_type="rw",
+    function="c",
+)
+image_backlight_green = VCPCode(
+    name="image backlight green",
+    value=0x6F,
+    code_type="rw",
+    function="c",
+)
+image_blue_black_level = VCPCode(
+    name="image blue black level",
+    value=0x70,
+    code_type="rw",
+    function="c",
+)
+image_backlight_blue = VCPCode(
+    name="image backlight blue",
+    value=0x71,
+    code_type="rw",
+    function="c",
+)
+image_gamma = VCPCode(
+    name="image gamma",
+    value=0x72,
+    code_type="rw",
+    function="nc",
+)
+lut_size = VCPCode(
+    name="lut size",
+    value=0x73,
+    code_type="ro",
+    function="t",
+)
+single_point_lut_operation = VCPCode(
+    name="single point lut operation",
+    value=0x74,
+    code_type="rw",
+    function="t",
+)
+block_lut_operation = VCPCode(
+    name="block lut operation",
+    value=0x75,
+    code_type="rw",
+    function="t",
+)
+remote_procedure_call = VCPCode(
+    name="remote procedure call",
+    value=0x76,
+    code_type="wo",
+    function="t",
+)
+display_identification_operation = VCPCode(
+    name="display identification operation",
+    value=0x78,
+    code_type="ro",
+    function="t",
+)
+image_adjust_focal_plane = VCPCode(
+    name="image adjust focal plane",
+    value=0x7A,
+    code_type="rw",
+    function="c",
+)
+image_adjust_zoom = VCPCode(
+    name="image adjust zoom",
+    value=0x7C,
+    code_type="rw",
+    function="c",
+)
+geometry_trapezoid = VCPCode(
+    name="geometry trapezoid",
+    value=0x7E,
+    code_type="rw",
+    function="c",
+)
+geometry_keystone = VCPCode(
+    name="geometry keystone",
+    value=0x80,
+    code_type="rw",
+    function="c",
+)
+image_horizontal_mirror = VCPCode(
+    name="image horizontal mirror",
+    value=0x82,
+    code_type="rw",
+    function="nc",
+)
+image_vertical_mirror = VCPCode(
+    name="image vertical mirror",
+    value=0x84,
+    code_type="rw",
+    function="nc",
+)
+display_scaling = VCPCode(
+    name="display scaling",
+    value=0x86,
+    code_type="rw",
+    function="nc",
+)
+image_sharpness = VCPCode(
+    name="image sharpness",
+    value=0x87,
+    code_type="rw",
+    function="c",
+)
+image_velocity_scan_modulation = VCPCode(
+    name="image velocity scan modulation",
+    value=0x88,
+    code_type="rw",
+    function="c",
+)
+image_saturation = VCPCode(
+    name="image saturation",
+    value=0x8A,
+    code_type="rw",
+    function="c",
+)
+tv_channel = VCPCode(
+    name="tv channel",
+    value=0x8B,
+    code_type="wo",
+    function="nc",
+)
+image_tv_sharpness = VCPCode(
+    name="image tv sharpness",
+    value=0x8C,
+    code_type="rw",
+    function="c",
+)
+display_audio_mute_mode = VCPCode(
+    name="display audio mute mode",
+    value=0x8D,
+    code_type="rw",
+    function="nc",
+)
+image_tv_contrast = VCPCode(
+    name="image tv contrast",
+    value=0x8E,
+    code_type="rw",
+    function="c",
+)
+sound_treble = VCPCode(
+    name="sound treble",
+    value=0x8F,
+    code_type="rw",
+    function="c",
+)
+image_hue = VCPCode(
+    name="image hue",
+    value=0x90,
+    code_type="rw",
+    function="c",
+)
+sound_bass = VCPCode(
+    name="sound bass",
+    value=0x91,
+    code_type="rw",
+    function="c",
+)
+image_tv_black_level = VCPCode(
+    name="image tv black level",
+    value=0x92,
+    code_type="rw",
+    function="c",
+)
+sound_balance = VCPCode(
+    name="sound balance",
+    value=0x93,
+    code_type="rw",
+    function="c",
+)
+sound_processor_mode = VCPCode(
+    name="sound processor mode",
+    value=0x94,
+    code_type="rw",
+    function="nc",
+)
+window_top_left_x = VCPCode(
+    name="window top left x",
+    value=0x95,
+    code_type="rw",
+    function="c",
+)
+window_top_left_y = VCPCode(
+    name="window top left y",
+    value=0x96,
+    code_type="rw",
+    function="c",
+)
+window_bottom_right_x = VCPCode(
+    name="window bottom right x",
+    value=0x97,
+    code_type="rw",
+    function="c",
+)
+window_bottom_right_y = VCPCode(
+    name="window bottom right y",
+    value=0x98,
+    code_type="rw",
+    function="c",
+)
+window_control = VCPCode(
+    name="window control",
+    value=0x99,
+    code_type="rw",
+    function="nc",
+)
+window_background = VCPCode(
+    name="window background",
+    value=0x9A,
+    code_type="rw",
+    function="c",
+)
+image_hue_red = VCPCode(
+    name="image hue red",
+    value=0x9B,
+    code_type="rw",
+    function="c",
+)
+image_hue_yellow = VCPCode(
+    name="image hue yellow",
+    value=0x9C,
+    code_type="rw",
+    function="c",
+)
+image_hue_green = VCPCode(
+    name="image hue green",
+    value=0x9D,
+    code_type="rw",
+    function="c",
+)
+image_hue_cyan = VCPCode(
+    name="image hue cyan",
+    value=0x9E,
+    code_type="rw",
+    function="c",
+)
+image_hue_blue = VCPCode(
+    name="image hue blue",
+    value=0x9F,
+    code_type="rw",
+    function="c",
+)
+image_hue_magenta = VCPCode(
+    name="image hue magenta",
+    value=0xA0,
+    code_type="rw",
+    function="c",
+)
+image_auto_setup_enable = VCPCode(
+    name="image auto setup enable",
+    value=0xA2,
+    code_type="wo",
+    function="nc",
+)
+window_mask_control = VCPCode(
+    name="window mask control",
+    value=0xA4,
+    code_type="rw",
+    function="t",
+)
+window_select = VCPCode(
+    name="window select",
+    value=0xA5,
+    code_type="rw",
+    function="nc",
+)
 image_orientation = VCPCode(
     name="image orientation",
     value=0xAA,
     code_type="ro",
     function="nc",
 )
-display_application = VCPCode(
-    name="display application",
-    value=0xDC,
+display_horizontal_frequency = VCPCode(
+    name="display horizontal frequency",
+    value=0xAC,
+    code_type="ro",
+    function="c",
+)
+display_vertical_frequency = VCPCode(
+    name="display vertical frequency",
+    value=0xAE,
+    code_type="ro",
+    function="c",
+)
+settings = VCPCode(
+    name="settings",
+    value=0xB0,
+    code_type="wo",
+    function="nc",
+)
+display_subpixel_layout = VCPCode(
+    name="display subpixel layout",
+    value=0xB2,
+    code_type="ro",
+    function="nc",
+)
+display_source_timing_mode = VCPCode(
+    name="display source timing mode",
+    value=0xB4,
+    code_type="rw",
+    function="t",
+)
+display_technology_type = VCPCode(
+    name="display technology type",
+    value=0xB6,
+    code_type="ro",
+    function="nc",
+)
+display_status = VCPCode(
+    name="display status",
+    value=0xB7,
+    code_type="ro",
+    function="nc",
+)
+packet_count = VCPCode(
+    name="packet count",
+    value=0xB8,
+    code_type="rw",
+    function="c",
+)
+display_x_origin = VCPCode(
+    name="display x origin",
+    value=0xB9,
+    code_type="rw",
+    function="c",
+)
+display_y_origin = VCPCode(
+    name="display y origin",
+    value=0xBA,
+    code_type="rw",
+    function="c",
+)
+header_error_count = VCPCode(
+    name="header error count",
+    value=0xBB,
+    code_type="rw",
+    function="c",
+)
+body_crc_error_count = VCPCode(
+    name="body crc error count",
+    value=0xBC,
+    code_type="rw",
+    function="c",
+)
+client_id = VCPCode(
+    name="client id",
+    value=0xBD,
+    code_type="rw",
+    function="c",
+)
+link_control = VCPCode(
+    name="link control",
+    value=0xBE,
+    code_type="rw",
+    function="nc",
+)
+display_usage_time = VCPCode(
+    name="display usage time",
+    value=0xC0,
+    code_type="ro",
+    function="c",
+)
+display_descriptor_length = VCPCode(
+    name="display descriptor length",
+    value=0xC2,
+    code_type="ro",
+    function="c",
+)
+display_descriptor = VCPCode(
+    name="display descriptor",
+    value=0xC3,
+    code_type="rw",
+    function="t",
+)
+display_descriptor_enable = VCPCode(
+    name="display descriptor enable",
+    value=0xC4,
+    code_type="rw",
+    function="nc",
+)
+application_enable_key = VCPCode(
+    name="application enable key",
+    value=0xC6,
+    code_type="ro",
+    function="nc",
+)
+display_controller_type = VCPCode(
+    name="display controller type",
+    value=0xC8,
+    code_type="rw",
+    function="nc",
+)
+display_firmware_level = VCPCode(
+    name="display firmware level",
+    value=0xC9,
+    code_type="ro",
+    function="c",
+)
+display_osd = VCPCode(
+    name="display osd",
+    value=0xCA,
+    code_type="rw",
+    function="nc",
+)
+display_osd_language = VCPCode(
+    name="display osd language",
+    value=0xCC,
+    code_type="rw",
+    function="nc",
+)
+display_status_indicators = VCPCode(
+    name="display status indicators",
+    value=0xCD,
+    code_type="rw",
+    function="nc",
+)
+auxiliary_display_size = VCPCode(
+    name="auxiliary display size",
+    value=0xCE,
+    code_type="ro",
+    function="c",
+)
+auxiliary_display_data = VCPCode(
+    name="auxiliary display data",
+    value=0xCF,
+    code_type="wo",
+    function="t",
+)
+output_select = VCPCode(
+    name="output select",
+    value=0xD0,
+    code_type="rw",
+    function="nc",
+)
+asset_tag = VCPCode(
+    name="asset tag",
+    value=0xD2,
+    code_type="rw",
+    function="t",
+)
+display_stereo_video_mode = VCPCode(
+    name="display stereo video mode",
+    value=0xD4,
     code_type="rw",
     function="nc",
 )
@@ -104,9 +965,103 @@ display_power_mode = VCPCode(
     code_type="rw",
     function="nc",
 )
-display_audio_mute_mode = VCPCode(
-    name="display audio mute mode",
-    value=0x8D,
+auxiliary_power_output = VCPCode(
+    name="auxiliary power output",
+    value=0xD7,
     code_type="rw",
     function="nc",
 )
+display_scan_mode = VCPCode(
+    name="display scan mode",
+    value=0xDA,
+    code_type="rw",
+    function="nc",
+)
+display_image_mode = VCPCode(
+    name="display image mode",
+    value=0xDB,
+    code_type="rw",
+    function="nc",
+)
+display_application = VCPCode(
+    name="display application",
+    value=0xDC,
+    code_type="rw",
+    function="nc",
+)
+scratch_pad = VCPCode(
+    name="scratch pad",
+    value=0xDE,
+    code_type="rw",
+    function="nc",
+)
+vcp_version = VCPCode(
+    name="vcp version",
+    value=0xDF,
+    code_type="ro",
+    function="nc",
+)
+
+#: All known VCP codes indexed by value, including the manufacturer
+#: specific range 0xE0 to 0xFF.
+CODES: Dict[int, VCPCode] = {
+    code.value: code
+    for code in sorted(
+        (code for code in globals().values() if isinstance(code, VCPCode)),
+        key=lambda code: code.value,
+    )
+}
+for _value in range(0xE0, 0x100):
+    CODES[_value] = VCPCode(
+        name=f"manufacturer specific {_value:#04x}",
+        value=_value,
+        code_type="rw",
+        function="nc",
+    )
+del _value
+
+# every code value indexes a single interned definition
+_CODES_BY_VALUE: Tuple[Optional[VCPCode], ...] = tuple(
+    CODES.get(value) for value in range(0x100)
+)
+_CODES_BY_NAME: Dict[str, VCPCode] = {code.name: code for code in CODES.values()}
+
+
+def get_vcp_code(code: Union[int, str, VCPCode]) -> VCPCode:
+    """
+    Looks up a VCP code in the registry.
+
+    Args:
+        code:
+            A VCP code definition,
+            an integer code value,
+            a string code value such as ``"0x10"``,
+            or a code name such as ``"image luminance"`` or
+            ``"image_luminance"``.
+
+    Returns:
+        VCP code definition.
+
+    Raises:
+        KeyError: VCP code not found.
+        TypeError: Unsupported code type.
+    """
+    if isinstance(code, VCPCode):
+        return code
+    elif isinstance(code, int):
+        return _get_by_value(code)
+    elif isinstance(code, str):
+        try:
+            value = int(code, 0)
+        except ValueError:
+            return _CODES_BY_NAME[code.replace("_", " ").lower()]
+        return _get_by_value(value)
+    else:
+        raise TypeError("unsupported code type: " + repr(type(code)))
+
+
+def _get_by_value(value: int) -> VCPCode:
+    vcp_code = _CODES_BY_VALUE[value] if 0 <= value <= 0xFF else None
+    if vcp_code is None:
+        raise KeyError(value)
+    return vcp_code
@@ -0,0 +1,364 @@
+from . import vcp_edid, vcp_frames
+from .vcp_abc import (
+    TimingReport,
+    VCP,
+    VCPIOError,
+    VCPPermissionError,
+    VCPReplyError,
+    VCPUnsupportedCodeError,
+)
+from .vcp_scheduler import get_scheduler
+from types import TracebackType
+from typing import Optional, Set, Tuple, Type
+import logging
+import os
+import struct
+
+SET_VCP_PAYLOAD_STRUCT = struct.Struct(">BBH")
+
+
+def _vcp_codes(capabilities: str) -> Set[int]:
+    """Codes listed at the top level of the vcp field of a capabilities string."""
+    start = capabilities.find("vcp(")
+    if start < 0:
+        return set()
+    codes = set()
+    depth = 0
+    token = ""
+    for char in capabilities[start + len("vcp(") :]:
+        if depth == 0 and char in " ()":
+            if token:
+                try:
+                    codes.add(int(token, 16))
+                except ValueError:
+                    pass
+                token = ""
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and char != " ":
+            token += char
+    return codes
+
+
+class DDCCIVCP(VCP):
+    """
+    Access to a monitor's virtual control panel through the ``ddcci``
+    kernel driver.
+
+    The driver owns the DDC/CI address of the bus, paces the messages, and
+    caches the brightness, so raw I2C access with
+    ``monitorcontrol.vcp.vcp_linux.LinuxVCP`` conflicts with it.
+
+    The brightness of the ``ddcci-backlight`` sysfs interface at
+    ``/sys/class/backlight/ddcci<bus>`` is a file read when the driver has
+    the value cached.
+    The driver maps it to the backlight control code when the monitor
+    reports it in its capabilities, and to the luminance otherwise, see
+    :py:attr:`backlight_code`.
+    Other codes are sent through the raw character device of the driver at
+    ``/dev/bus/ddcci/<bus>/display``, where every write sends the payload
+    of one DDC/CI message and every read receives the payload of one reply.
+    The capabilities are read from the string cached by the driver.
+
+    References:
+        https://gitlab.com/ddcci-driver-linux/ddcci-driver-linux
+    """
+
+    # root directories, changed to test against a fake sysfs tree
+    SYSFS_ROOT: str = "/sys"
+    DEV_ROOT: str = "/dev"
+
+    LUMINANCE_CODE = 0x10
+    BACKLIGHT_CODE = 0x13  # preferred by the ddcci-backlight driver
+
+    def __init__(self, bus_number: int):
+        """
+        Args:
+            bus_number: I2C bus number.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.bus_number = bus_number
+        self.fd: Optional[int] = None
+        self.device_path = os.path.join(
+            self.SYSFS_ROOT, "bus", "ddcci", "devices", f"ddcci{bus_number}"
+        )
+        self.backlight_path = os.path.join(
+            self.SYSFS_ROOT, "class", "backlight", f"ddcci{bus_number}"
+        )
+        self.fp = os.path.join(
+            self.DEV_ROOT, "bus", "ddcci", str(bus_number), "display"
+        )
+        # maximum brightness and code of the backlight, read once
+        self._max_brightness: Optional[int] = None
+        self._backlight_code: Optional[int] = None
+        # turns of the character device shared with other VCPs of the process
+        self.scheduler = get_scheduler(self.fp)
+
+    @classmethod
+    def is_available(cls, bus_number: int) -> bool:
+        """Returns true if the ddcci driver is bound to a monitor on the bus."""
+        return os.path.isdir(
+            os.path.join(
+                cls.SYSFS_ROOT, "bus", "ddcci", "devices", f"ddcci{bus_number}"
+            )
+        )
+
+    @property
+    def has_backlight(self) -> bool:
+        """True if luminance is exposed by the ``ddcci-backlight`` driver."""
+        return os.path.isdir(self.backlight_path)
+
+    @property
+    def backlight_code(self) -> Optional[int]:
+        """
+        VCP code of the ``ddcci-backlight`` brightness, or None without a
+        backlight.
+
+        This is the backlight control code 0x13 if the capabilities cached
+        by the driver list it, as the driver prefers it, and the luminance
+        code 0x10 otherwise.
+        Other codes, including the luminance when the brightness is the
+        backlight control, are sent through the character device.
+        """
+        if not self.has_backlight:
+            return None
+        if self._backlight_code is None:
+            try:
+                codes = _vcp_codes(self.get_vcp_capabilities())
+            except VCPIOError:
+                codes = set()
+            if self.BACKLIGHT_CODE in codes:
+                self._backlight_code = self.BACKLIGHT_CODE
+            else:
+                self._backlight_code = self.LUMINANCE_CODE
+        return self._backlight_code
+
+    def __enter__(self):
+        try:
+            self.fd = os.open(self.fp, os.O_RDWR)
+        except FileNotFoundError as e:
+            # the character device is optional with a backlight
+            if not self.has_backlight:
+                raise VCPIOError(f"unable to open VCP at {self.fp}") from e
+        except PermissionError as e:
+            raise VCPPermissionError(f"permission error for {self.fp}") from e
+        except OSError as e:
+            raise VCPIOError(f"unable to open VCP at {self.fp}") from e
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError as e:
+                raise VCPIOError("unable to close descriptor") from e
+            finally:
+                self.fd = None
+        return False
+
+    def set_vcp_feature(self, code: int, value: int):
+        """
+        Sets the value of a feature on the virtual control panel.
+
+        Args:
+            code: Feature code.
+            value: Feature value.
+
+        Raises:
+            VCPIOError: Failed to set VCP feature.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        self.time_remaining()
+        if code == self.backlight_code:
+            self._write_attribute("brightness", value)
+            return
+        with self.scheduler.turn(self.priority, self.deadline):
+            self.write_bytes(
+                SET_VCP_PAYLOAD_STRUCT.pack(vcp_frames.SET_VCP_CMD, code, value)
+            )
+
+    def get_vcp_feature(self, code: int) -> Tuple[int, int]:
+        """
+        Gets the value of a feature from the virtual control panel.
+
+        Args:
+            code: Feature code.
+
+        Returns:
+            Current feature value, maximum feature value.
+
+        Raises:
+            VCPIOError: Failed to get VCP feature.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        self.time_remaining()
+        if code == self.backlight_code:
+            if self._max_brightness is None:
+                self._max_brightness = self._read_attribute("max_brightness")
+            return self._read_attribute("brightness"), self._max_brightness
+
+        # the reply must be read before another thread sends a message
+        with self.scheduler.turn(self.priority, self.deadline):
+            self.write_bytes(bytes([vcp_frames.GET_VCP_CMD, code]))
+            reply = self.read_bytes(vcp_frames.MAX_PAYLOAD_LENGTH)
+        if len(reply) != vcp_frames.GET_VCP_REPLY_LENGTH:
+            raise VCPReplyError(f"received unexpected response length: {len(reply)}")
+
+        (
+            reply_code,
+            result_code,
+            vcp_opcode,
+            _,
+            feature_max,
+            feature_current,
+        ) = vcp_frames.GET_VCP_REPLY_STRUCT.unpack(reply)
+
+        if reply_code != vcp_frames.GET_VCP_REPLY:
+            raise VCPReplyError(f"received unexpected response code: {reply_code}")
+        if vcp_opcode != code:
+            raise VCPReplyError(f"received unexpected opcode: {vcp_opcode}")
+        if result_code == 1:
+            raise VCPUnsupportedCodeError("Unsupported VCP code")
+        elif result_code > 0:
+            raise VCPIOError(f"received result with unknown code: {result_code}")
+
+        return feature_current, feature_max
+
+    def get_vcp_capabilities(self) -> str:
+        """
+        Gets the capabilities string cached by the driver.
+
+        Returns:
+            One long capabilities string in the format:
+            "(prot(monitor)type(LCD)model(ACER VG271U)cmds(01 02 03 07 0C)"
+
+        Raises:
+            VCPIOError: Failed to read the capabilities.
+        """
+        path = os.path.join(self.device_path, "capabilities")
+        try:
+            with open(path, "r", encoding="ascii", errors="replace") as f:
+                return f.read().strip()
+        except OSError as e:
+            raise VCPIOError(f"unable to read {path}") from e
+
+    @property
+    def connector(self) -> Optional[str]:
+        """
+        Name of the DRM connector of the bus, such as ``"card0-DP-1"``,
+        or None if no connector owns the bus.
+        """
+        path = vcp_edid.find_connector(self.bus_number, self.SYSFS_ROOT)
+        return None if path is None else os.path.basename(path)
+
+    def read_edid(self) -> bytes:
+        """
+        Reads the EDID of the monitor from the DRM connector, or from the
+        bus if there is no connector.
+
+        Returns:
+            EDID, at least the 128 byte base block.
+
+        Raises:
+            VCPIOError: Failed to read the EDID.
+        """
+        return vcp_edid.read_edid(self.bus_number, self.SYSFS_ROOT)
+
+    def save_settings(self):
+        """
+        Stores the current settings in the non-volatile memory of the
+        monitor.
+
+        Raises:
+            VCPIOError: Failed to save the settings.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        self.time_remaining()
+        with self.scheduler.turn(self.priority, self.deadline):
+            self.write_bytes(bytes([vcp_frames.SAVE_SETTINGS_CMD]))
+
+    def get_timing_report(self) -> TimingReport:
+        """
+        Gets the timing of the display signal.
+
+        Returns:
+            Timing report.
+
+        Raises:
+            VCPIOError: Failed to get the timing report.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        self.time_remaining()
+        with self.scheduler.turn(self.priority, self.deadline):
+            self.write_bytes(bytes([vcp_frames.TIMING_REQUEST_CMD]))
+            reply = self.read_bytes(vcp_frames.MAX_PAYLOAD_LENGTH)
+        if len(reply) != vcp_frames.TIMING_REPLY_LENGTH:
+            raise VCPReplyError(f"received unexpected response length: {len(reply)}")
+        reply_code, status, horizontal, vertical = (
+            vcp_frames.TIMING_REPLY_STRUCT.unpack(reply)
+        )
+        if reply_code != vcp_frames.TIMING_REPLY:
+            raise VCPReplyError(f"received unexpected response code: {reply_code}")
+        return TimingReport(status, horizontal * 10, vertical / 100)
+
+    def _read_attribute(self, name: str) -> int:
+        path = os.path.join(self.backlight_path, name)
+        try:
+            with open(path, "rb") as f:
+                return int(f.read())
+        except (OSError, ValueError) as e:
+            raise VCPIOError(f"unable to read {path}") from e
+
+    def _write_attribute(self, name: str, value: int):
+        path = os.path.join(self.backlight_path, name)
+        self.logger.debug("%s <- %d", path, value)
+        try:
+            with open(path, "wb") as f:
+                f.write(str(value).encode())
+        except OSError as e:
+            raise VCPIOError(f"unable to write {path}") from e
+
+    def read_bytes(self, num_bytes: int) -> bytes:
+        """
+        Reads the payload of one reply from the driver.
+
+        Args:
+            num_bytes: maximum number of bytes to read
+
+        Raises:
+            VCPIOError: unable to read data
+        """
+        if self.fd is None:
+            raise VCPIOError(f"no ddcci character device at {self.fp}")
+        try:
+            return os.read(self.fd, num_bytes)
+        except OSError as e:
+            raise VCPIOError("unable to read from ddcci device") from e
+
+    def write_bytes(self, data: bytes):
+        """
+        Sends the payload of one message through the driver.
+
+        Args:
+            data: message payload
+
+        Raises:
+            VCPIOError: unable to write data
+        """
+        if self.fd is None:
+            raise VCPIOError(f"no ddcci character device at {self.fp}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s=%s", "data", " ".join([f"{x:02X}" for x in data]))
+        try:
+            os.write(self.fd, data)
+        except OSError as e:
+            raise VCPIOError("unable to write to ddcci device") from e
@@ -0,0 +1,291 @@
+"""
+EDID parsing and reading on Linux.
+
+The EDID identifies a monitor by manufacturer, product code, and serial
+number, independent of the bus it is attached to.
+It is read from the ``edid`` file of the DRM connector that owns the I2C bus,
+or from the EDID EEPROM at I2C address 0x50 when there is no connector.
+Neither needs the slow capabilities download.
+"""
+
+from .vcp_abc import VCPIOError, VCPPermissionError, VCPReplyError
+from typing import Dict, List, Optional, Tuple
+import os
+import struct
+import sys
+
+# hide the Linux code from Windows CI coverage
+if sys.platform.startswith("linux"):
+    import fcntl
+
+EDID_HEADER = b"\x00\xff\xff\xff\xff\xff\xff\x00"
+EDID_BLOCK_SIZE = 128
+EDID_ADDR = 0x50  # EDID EEPROM address on the I2C bus
+I2C_SLAVE = 0x0703  # I2C bus slave address
+
+# header, manufacturer, product code, serial number, week, year, version
+IDENTITY_STRUCT = struct.Struct("<8s2sHIBBBB")
+DESCRIPTOR_OFFSETS = (54, 72, 90, 108)
+DESCRIPTOR_SERIAL = 0xFF
+DESCRIPTOR_NAME = 0xFC
+
+# fields of EDID.identity
+EDID_FIELDS = frozenset(["manufacturer", "product_code", "serial", "name"])
+
+
+class EDID:
+    """
+    Identity of a monitor parsed from its EDID.
+
+    Args:
+        manufacturer: Three letter PNP manufacturer ID, such as ``"ACR"``.
+        product_code: Manufacturer product code.
+        serial_number: Numeric serial number, zero if not set.
+        serial: Serial number descriptor, empty if not set.
+        name: Monitor name descriptor, empty if not set.
+        week: Week of manufacture, zero if not set.
+        year: Year of manufacture.
+        version: EDID version and revision, such as ``"1.4"``.
+    """
+
+    __slots__ = (
+        "manufacturer",
+        "product_code",
+        "serial_number",
+        "serial",
+        "name",
+        "week",
+        "year",
+        "version",
+    )
+
+    def __init__(
+        self,
+        manufacturer: str,
+        product_code: int,
+        serial_number: int = 0,
+        serial: str = "",
+        name: str = "",
+        week: int = 0,
+        year: int = 0,
+        version: str = "1.4",
+    ):
+        self.manufacturer = manufacturer
+        self.product_code = product_code
+        self.serial_number = serial_number
+        self.serial = serial
+        self.name = name
+        self.week = week
+        self.year = year
+        self.version = version
+
+    def __repr__(self) -> str:
+        return (
+            f"EDID({self.manufacturer!r}, 0x{self.product_code:04X}, "
+            f"serial={self.identity['serial']!r}, name={self.name!r})"
+        )
+
+    @property
+    def identity(self) -> Dict[str, str]:
+        """
+        Identity fields that can be matched by scenes and selectors.
+
+        The serial is the serial number descriptor, or the numeric serial
+        number if there is no descriptor.
+        """
+        serial = self.serial
+        if not serial and self.serial_number:
+            serial = str(self.serial_number)
+        return {
+            "manufacturer": self.manufacturer,
+            "product_code": f"{self.product_code:04X}",
+            "serial": serial,
+            "name": self.name,
+        }
+
+    @property
+    def key(self) -> str:
+        """
+        Stable key for caches and configuration, such as
+        ``"ACR-0412-T5SAA0012345"``.
+        """
+        identity = self.identity
+        return "-".join(
+            [identity["manufacturer"], identity["product_code"], identity["serial"]]
+        )
+
+
+def _descriptor_text(data: bytes) -> str:
+    return data.split(b"\n", 1)[0].decode("cp437").strip()
+
+
+def parse_edid(data: bytes) -> EDID:
+    """
+    Parses the identity from the base block of an EDID.
+
+    Args:
+        data: EDID, at least the 128 byte base block.
+            Extension blocks are ignored.
+
+    Returns:
+        Parsed identity.
+
+    Raises:
+        ValueError: The data is not a valid EDID base block.
+    """
+    if len(data) < EDID_BLOCK_SIZE:
+        raise ValueError(f"EDID is too short: {len(data)} bytes")
+    block = memoryview(data)[:EDID_BLOCK_SIZE]
+    (
+        header,
+        manufacturer,
+        product_code,
+        serial_number,
+        week,
+        year,
+        version,
+        revision,
+    ) = IDENTITY_STRUCT.unpack_from(block)
+    if header != EDID_HEADER:
+        raise ValueError("invalid EDID header")
+    if sum(block) & 0xFF:
+        raise ValueError("invalid EDID checksum")
+
+    # three 5 bit letters, 1 is "A"
+    packed = int.from_bytes(manufacturer, "big")
+    letters = "".join(
+        chr(ord("A") - 1 + ((packed >> shift) & 0x1F)) for shift in (10, 5, 0)
+    )
+
+    text = {}
+    for offset in DESCRIPTOR_OFFSETS:
+        # display descriptors start with a zero pixel clock
+        if block[offset] == 0 and block[offset + 1] == 0:
+            tag = block[offset + 3]
+            if tag in (DESCRIPTOR_SERIAL, DESCRIPTOR_NAME):
+                text[tag] = _descriptor_text(bytes(block[offset + 5 : offset + 18]))
+
+    return EDID(
+        manufacturer=letters,
+        product_code=product_code,
+        serial_number=serial_number,
+        serial=text.get(DESCRIPTOR_SERIAL, ""),
+        name=text.get(DESCRIPTOR_NAME, ""),
+        week=week,
+        year=year + 1990,
+        version=f"{version}.{revision}",
+    )
+
+
+def list_connectors(sysfs_root: str = "/sys") -> List[Tuple[str, int]]:
+    """
+    Lists the DRM connectors that own an I2C bus.
+
+    This only reads sysfs, no bus is opened.
+
+    Args:
+        sysfs_root: Root of the sysfs tree.
+
+    Returns:
+        Path of each connector in sysfs, such as
+        ``"/sys/class/drm/card0-DP-1"``, and the number of its I2C bus.
+    """
+    drm = os.path.join(sysfs_root, "class", "drm")
+    try:
+        names = sorted(os.listdir(drm))
+    except OSError:
+        return []
+    connectors = []
+    for name in names:
+        ddc = os.path.join(drm, name, "ddc")
+        if not os.path.exists(ddc):
+            continue
+        adapter = os.path.basename(os.path.realpath(ddc))
+        prefix, _, number = adapter.partition("-")
+        if prefix == "i2c" and number.isdigit():
+            connectors.append((os.path.join(drm, name), int(number)))
+    return connectors
+
+
+def find_connector(bus_number: int, sysfs_root: str = "/sys") -> Optional[str]:
+    """
+    Finds the DRM connector that owns an I2C bus.
+
+    Args:
+        bus_number: I2C bus number.
+        sysfs_root: Root of the sysfs tree.
+
+    Returns:
+        Path of the connector in sysfs, such as
+        ``"/sys/class/drm/card0-DP-1"``, or None if no connector owns the bus.
+    """
+    for connector, connector_bus in list_connectors(sysfs_root):
+        if connector_bus == int(bus_number):
+            return connector
+    return None
+
+
+def read_connector_edid(connector: str) -> bytes:
+    """
+    Reads the EDID cached by the kernel for a DRM connector.
+
+    Args:
+        connector: Path of the connector in sysfs.
+
+    Returns:
+        EDID, empty if nothing is connected or the kernel has no EDID.
+    """
+    try:
+        with open(os.path.join(connector, "edid"), "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def read_edid(bus_number: int, sysfs_root: str = "/sys") -> bytes:
+    """
+    Reads the EDID of the monitor on an I2C bus.
+
+    The ``edid`` file of the DRM connector is read first, it is cached by
+    the kernel.
+    The EDID EEPROM at I2C address 0x50 is read when there is no connector
+    or the connector has no EDID.
+
+    Args:
+        bus_number: I2C bus number.
+        sysfs_root: Root of the sysfs tree.
+
+    Returns:
+        EDID, with a valid base block.
+
+    Raises:
+        VCPIOError: Failed to read the EDID.
+        VCPPermissionError: No permission to read the I2C bus.
+        VCPReplyError: The EDID read from the bus is invalid.
+    """
+    connector = find_connector(bus_number, sysfs_root)
+    if connector is not None:
+        data = read_connector_edid(connector)
+        if data:
+            return data
+
+    path = f"/dev/i2c-{bus_number}"
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except PermissionError as e:
+        raise VCPPermissionError(f"permission error for {path}") from e
+    except OSError as e:
+        raise VCPIOError(f"unable to open {path}") from e
+    try:
+        fcntl.ioctl(fd, I2C_SLAVE, EDID_ADDR)
+        os.write(fd, b"\x00")
+        data = os.read(fd, EDID_BLOCK_SIZE)
+    except OSError as e:
+        raise VCPIOError(f"unable to read EDID from {path}") from e
+    finally:
+        os.close(fd)
+    try:
+        parse_edid(data)
+    except ValueError as e:
+        raise VCPReplyError(str(e)) from e
+    return data
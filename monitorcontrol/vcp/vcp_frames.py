@@ -0,0 +1,228 @@
+"""
+DDC/CI frame encoding and decoding.
+
+Request frames are built from precomputed templates and partial checksums so
+that no intermediate objects are created per transaction.
+Replies are read into a reusable buffer and decoded in place.
+"""
+
+from functools import reduce
+from operator import xor
+from typing import Tuple
+import struct
+
+PROTOCOL_FLAG = 0x80  # protocol flag is bit 7 of the length byte
+DDCCI_ADDR = 0x37  # DDC-CI command address on the I2C bus
+HOST_ADDRESS = 0x51  # virtual I2C slave address of the host
+
+GET_VCP_CMD = 0x01  # get VCP feature command
+GET_VCP_REPLY = 0x02  # get VCP feature reply code
+SET_VCP_CMD = 0x03  # set VCP feature command
+GET_VCP_CAPS_CMD = 0xF3  # Capabilities Request command
+GET_VCP_CAPS_REPLY = 0xE3  # Capabilities Request reply
+TABLE_READ_CMD = 0xE2  # Table Read command
+TABLE_READ_REPLY = 0xE4  # Table Read reply
+TABLE_WRITE_CMD = 0xE7  # Table Write command
+SAVE_SETTINGS_CMD = 0x0C  # Save Current Settings command
+TIMING_REQUEST_CMD = 0x07  # Timing Request command
+TIMING_REPLY = 0x4E  # Timing Reply code
+
+HEADER_LENGTH = 2  # source address and length byte
+MAX_PAYLOAD_LENGTH = 35  # largest payload length a reply may announce
+GET_VCP_REPLY_LENGTH = 8  # payload length of a get VCP feature reply
+TABLE_FRAGMENT_SIZE = 32  # largest table data fragment in one frame
+TIMING_REPLY_LENGTH = 6  # payload length of a timing reply
+
+# reply buffer: header, the largest payload, and the checksum
+REPLY_BUFFER_SIZE = HEADER_LENGTH + MAX_PAYLOAD_LENGTH + 1
+
+HEADER_STRUCT = struct.Struct("=BB")
+GET_VCP_REPLY_STRUCT = struct.Struct(">BBBBHH")
+CAPS_REPLY_STRUCT = struct.Struct(">BH")
+SET_VCP_STRUCT = struct.Struct(">BBBBHB")
+CAPS_REQUEST_STRUCT = struct.Struct(">BBBHB")
+TABLE_READ_REQUEST_STRUCT = struct.Struct(">BBBBHB")
+TABLE_WRITE_HEADER_STRUCT = struct.Struct(">BBBBH")
+TIMING_REPLY_STRUCT = struct.Struct(">BBHH")
+
+
+def checksum(data) -> int:
+    """
+    Computes the XOR checksum of a bytes-like object.
+
+    Args:
+        data: Bytes to checksum.
+
+    Returns:
+        Checksum for the data.
+    """
+    return reduce(xor, data, 0)
+
+
+def _build_get_vcp_request(code: int) -> bytes:
+    data = bytes([HOST_ADDRESS, 2 | PROTOCOL_FLAG, GET_VCP_CMD, code])
+    return data + bytes([checksum(data) ^ (DDCCI_ADDR << 1)])
+
+
+# get VCP feature requests are fully determined by the code
+GET_VCP_REQUESTS: Tuple[bytes, ...] = tuple(
+    _build_get_vcp_request(code) for code in range(256)
+)
+
+
+def _build_command_request(cmd: int) -> bytes:
+    data = bytes([HOST_ADDRESS, 1 | PROTOCOL_FLAG, cmd])
+    return data + bytes([checksum(data) ^ (DDCCI_ADDR << 1)])
+
+
+# commands without arguments are fully determined by the command
+SAVE_SETTINGS_REQUEST = _build_command_request(SAVE_SETTINGS_CMD)
+TIMING_REQUEST = _build_command_request(TIMING_REQUEST_CMD)
+
+# checksum of every set VCP feature request byte except the value
+SET_VCP_PARTIAL_CHECKSUMS: Tuple[int, ...] = tuple(
+    checksum(((DDCCI_ADDR << 1), HOST_ADDRESS, 4 | PROTOCOL_FLAG, SET_VCP_CMD, code))
+    for code in range(256)
+)
+
+# the capabilities request checksum has never included the destination
+# address, this is kept for compatibility with the monitors in the field
+CAPS_PARTIAL_CHECKSUM = checksum((HOST_ADDRESS, 3 | PROTOCOL_FLAG, GET_VCP_CAPS_CMD))
+
+
+class FrameCodec:
+    """
+    Preallocated request and reply buffers for one DDC/CI bus.
+
+    Buffers are reused between transactions, the views returned by this
+    class are only valid until the next transaction.
+    """
+
+    def __init__(self):
+        self._set_vcp = bytearray(SET_VCP_STRUCT.size)
+        self._caps = bytearray(CAPS_REQUEST_STRUCT.size)
+        self._table_read = bytearray(TABLE_READ_REQUEST_STRUCT.size)
+        self._table_write = bytearray(
+            TABLE_WRITE_HEADER_STRUCT.size + TABLE_FRAGMENT_SIZE + 1
+        )
+        self._table_write_view = memoryview(self._table_write)
+        self.reply = bytearray(REPLY_BUFFER_SIZE)
+        self.reply_view = memoryview(self.reply)
+        self.header_view = self.reply_view[:HEADER_LENGTH]
+
+    @staticmethod
+    def get_vcp_request(code: int) -> bytes:
+        """Returns the get VCP feature request frame for a code."""
+        return GET_VCP_REQUESTS[code]
+
+    def set_vcp_request(self, code: int, value: int) -> bytearray:
+        """Returns the set VCP feature request frame for a code and value."""
+        chk = SET_VCP_PARTIAL_CHECKSUMS[code] ^ (value >> 8) ^ (value & 0xFF)
+        SET_VCP_STRUCT.pack_into(
+            self._set_vcp,
+            0,
+            HOST_ADDRESS,
+            4 | PROTOCOL_FLAG,
+            SET_VCP_CMD,
+            code,
+            value,
+            chk,
+        )
+        return self._set_vcp
+
+    def caps_request(self, offset: int) -> bytearray:
+        """Returns the capabilities request frame for an offset."""
+        chk = CAPS_PARTIAL_CHECKSUM ^ (offset >> 8) ^ (offset & 0xFF)
+        CAPS_REQUEST_STRUCT.pack_into(
+            self._caps,
+            0,
+            HOST_ADDRESS,
+            3 | PROTOCOL_FLAG,
+            GET_VCP_CAPS_CMD,
+            offset,
+            chk,
+        )
+        return self._caps
+
+    def table_read_request(self, code: int, offset: int) -> bytearray:
+        """Returns the table read request frame for a code and offset."""
+        data = self._table_read
+        TABLE_READ_REQUEST_STRUCT.pack_into(
+            data, 0, HOST_ADDRESS, 4 | PROTOCOL_FLAG, TABLE_READ_CMD, code, offset, 0
+        )
+        data[-1] = checksum(data) ^ (DDCCI_ADDR << 1)
+        return data
+
+    def table_write_request(self, code: int, offset: int, fragment) -> memoryview:
+        """
+        Returns the table write request frame for a code, offset, and data
+        fragment of at most :py:data:`TABLE_FRAGMENT_SIZE` bytes.
+        """
+        header_size = TABLE_WRITE_HEADER_STRUCT.size
+        end = header_size + len(fragment)
+        TABLE_WRITE_HEADER_STRUCT.pack_into(
+            self._table_write,
+            0,
+            HOST_ADDRESS,
+            (4 + len(fragment)) | PROTOCOL_FLAG,
+            TABLE_WRITE_CMD,
+            code,
+            offset,
+        )
+        view = self._table_write_view
+        view[header_size:end] = fragment
+        view[end] = checksum(view[:end]) ^ (DDCCI_ADDR << 1)
+        return view[: end + 1]
+
+    def payload_length(self) -> int:
+        """Returns the payload length announced by the reply header."""
+        _, length = HEADER_STRUCT.unpack_from(self.reply)
+        return length & ~PROTOCOL_FLAG
+
+    def payload_view(self, length: int) -> memoryview:
+        """Returns the view that receives a payload and its checksum."""
+        return self.reply_view[HEADER_LENGTH : HEADER_LENGTH + length + 1]
+
+    def checksum_xor(self, length: int) -> int:
+        """
+        Compares the received checksum against the calculated checksum.
+
+        Returns:
+            Zero if the checksum matches.
+        """
+        end = HEADER_LENGTH + length
+        return self.reply[end] ^ checksum(self.reply_view[:end])
+
+    def decode_get_vcp_reply(self) -> Tuple[int, int, int, int, int, int]:
+        """
+        Decodes a get VCP feature reply.
+
+        Returns:
+            Reply code, result code, VCP opcode, VCP type code,
+            maximum feature value, current feature value.
+        """
+        return GET_VCP_REPLY_STRUCT.unpack_from(self.reply, HEADER_LENGTH)
+
+    def decode_caps_reply(self, length: int) -> Tuple[int, int, memoryview]:
+        """
+        Decodes a capabilities reply.
+
+        Returns:
+            Reply code, offset, capabilities fragment.
+        """
+        reply_code, offset = CAPS_REPLY_STRUCT.unpack_from(self.reply, HEADER_LENGTH)
+        start = HEADER_LENGTH + CAPS_REPLY_STRUCT.size
+        return reply_code, offset, self.reply_view[start : HEADER_LENGTH + length]
+
+    def decode_timing_reply(self) -> Tuple[int, int, int, int]:
+        """
+        Decodes a timing reply.
+
+        Returns:
+            Reply code, timing status, horizontal frequency in units of
+            10 Hz, vertical frequency in units of 0.01 Hz.
+        """
+        return TIMING_REPLY_STRUCT.unpack_from(self.reply, HEADER_LENGTH)
+
+    # table read replies have the same layout as capabilities replies
+    decode_table_reply = decode_caps_reply
@@ -1,7 +1,23 @@
-from .vcp_abc import VCP, VCPIOError, VCPPermissionError
+from . import vcp_edid, vcp_frames
+from .vcp_abc import (
+    TimingReport,
+    VCP,
+    VCPChecksumError,
+    VCPIOError,
+    VCPPermissionError,
+    VCPReplyError,
+    VCPTimeoutError,
+    VCPUnsupportedCodeError,
+)
+from .vcp_ddcci import DDCCIVCP
+from .vcp_retry import RetryPolicy
+from .vcp_scheduler import get_scheduler
 from types import TracebackType
-from typing import List, Optional, Tuple, Type
+from typing import Callable, Iterator, List, Optional, Tuple, Type, TypeVar
+import contextlib
+import math
 import os
+import stat
 import struct
 import sys
 import time
@@ -10,7 +26,8 @@ import logging
 # hide the Linux code from Windows CI coverage
 if sys.platform.startswith("linux"):
     import fcntl
-    import pyudev
+
+T = TypeVar("T")
 
 
 class LinuxVCP(VCP):
@@ -22,24 +39,33 @@ class LinuxVCP(VCP):
         https://github.com/siemer/ddcci/
     """
 
-    GET_VCP_HEADER_LENGTH = 2  # header packet length
-    PROTOCOL_FLAG = 0x80  # protocol flag is bit 7 of the length byte
+    GET_VCP_HEADER_LENGTH = vcp_frames.HEADER_LENGTH  # header packet length
+    PROTOCOL_FLAG = vcp_frames.PROTOCOL_FLAG
 
     # VCP commands
-    GET_VCP_CMD = 0x01  # get VCP feature command
-    GET_VCP_REPLY = 0x02  # get VCP feature reply code
-    SET_VCP_CMD = 0x03  # set VCP feature command
-    GET_VCP_CAPS_CMD = 0xF3  # Capabilities Request command
-    GET_VCP_CAPS_REPLY = 0xE3  # Capabilities Request reply
+    GET_VCP_CMD = vcp_frames.GET_VCP_CMD
+    GET_VCP_REPLY = vcp_frames.GET_VCP_REPLY
+    SET_VCP_CMD = vcp_frames.SET_VCP_CMD
+    GET_VCP_CAPS_CMD = vcp_frames.GET_VCP_CAPS_CMD
+    GET_VCP_CAPS_REPLY = vcp_frames.GET_VCP_CAPS_REPLY
+    TABLE_READ_CMD = vcp_frames.TABLE_READ_CMD
+    TABLE_READ_REPLY = vcp_frames.TABLE_READ_REPLY
+    TABLE_WRITE_CMD = vcp_frames.TABLE_WRITE_CMD
+    SAVE_SETTINGS_CMD = vcp_frames.SAVE_SETTINGS_CMD
+    TIMING_REQUEST_CMD = vcp_frames.TIMING_REQUEST_CMD
+    TIMING_REPLY = vcp_frames.TIMING_REPLY
 
     # timeouts
     GET_VCP_TIMEOUT = 0.04  # at least 40ms per the DDCCI specification
     CMD_RATE = 0.05  # at least 50ms between messages
+    SAVE_SETTINGS_DELAY = 0.2  # at least 200ms after saving the settings
 
     # addresses
-    DDCCI_ADDR = 0x37  # DDC-CI command address on the I2C bus
-    HOST_ADDRESS = 0x51  # virtual I2C slave address of the host
+    DDCCI_ADDR = vcp_frames.DDCCI_ADDR
+    HOST_ADDRESS = vcp_frames.HOST_ADDRESS
     I2C_SLAVE = 0x0703  # I2C bus slave address
+    I2C_TIMEOUT = 0x0702  # adapter timeout in units of 10ms
+    ADAPTER_TIMEOUT = 1.0  # default adapter timeout of the kernel in seconds
 
     GET_VCP_RESULT_CODES = {
         0: "No Error",
@@ -48,20 +74,48 @@ class LinuxVCP(VCP):
 
     CHECKSUM_ERRORS: str = "ignore"
 
-    def __init__(self, bus_number: int):
+    # advisory lock of the bus around every transaction, shared with other
+    # processes and tools such as ddcutil that lock the bus device
+    BUS_LOCK: bool = False
+    LOCK_POLL = 0.005  # delay between attempts to take the bus lock
+    # directory of the pacing state shared by processes locking the bus,
+    # defaults to $MONITORCONTROL_LOCK_DIR, $XDG_RUNTIME_DIR, or the
+    # temporary directory with the user ID in the file name
+    LOCK_DIR: Optional[str] = None
+    PACING_STRUCT = struct.Struct("<d")
+
+    # attempts of the default retry policy of get_vcps and find_vcps,
+    # 1 to never retry
+    RETRY_ATTEMPTS: int = 3
+
+    # root of the sysfs tree, changed to test against a fake sysfs tree
+    SYSFS_ROOT: str = "/sys"
+
+    def __init__(self, bus_number: int, retry_policy: Optional[RetryPolicy] = None):
         """
         Args:
             bus_number: I2C bus number.
+            retry_policy: Retry policy for transient errors, None to never retry.
         """
         self.logger = logging.getLogger(__name__)
         self.bus_number = bus_number
+        self.retry_policy = retry_policy
         self.fd: Optional[str] = None
         self.fp: str = f"/dev/i2c-{self.bus_number}"
         # time of last feature set call
         self.last_set: Optional[float] = None
+        # preallocated request and reply frames
+        self._codec = vcp_frames.FrameCodec()
+        # pacing state shared with other processes when the bus is locked
+        self._pacing_fd: Optional[int] = None
+        # turns of the bus shared with other VCPs of the process
+        self.scheduler = get_scheduler(self.fp)
 
     def __enter__(self):
         def cleanup(fd: Optional[int]):
+            if self._pacing_fd is not None:
+                os.close(self._pacing_fd)
+                self._pacing_fd = None
             if fd is not None:
                 try:
                     os.close(self.fd)
@@ -71,7 +125,11 @@ class LinuxVCP(VCP):
         try:
             self.fd = os.open(self.fp, os.O_RDWR)
             fcntl.ioctl(self.fd, self.I2C_SLAVE, self.DDCCI_ADDR)
-            self.read_bytes(1)
+            if self.BUS_LOCK:
+                self._pacing_fd = self._open_pacing()
+            with self.scheduler.turn(self.priority, self.deadline):
+                with self._bus_locked():
+                    self.read_bytes(1)
         except PermissionError as e:
             cleanup(self.fd)
             raise VCPPermissionError(f"permission error for {self.fp}") from e
@@ -89,6 +147,9 @@ class LinuxVCP(VCP):
         exception_value: Optional[BaseException],
         exception_traceback: Optional[TracebackType],
     ) -> Optional[bool]:
+        if self._pacing_fd is not None:
+            os.close(self._pacing_fd)
+            self._pacing_fd = None
         try:
             os.close(self.fd)
         except OSError as e:
@@ -107,27 +168,16 @@ class LinuxVCP(VCP):
 
         Raises:
             VCPIOError: failed to set VCP feature
+            VCPTimeoutError: the deadline was exceeded
         """
-        self.rate_limt()
-
-        # transmission data
-        data = bytearray()
-        data.append(self.SET_VCP_CMD)
-        data.append(code)
-        low_byte, high_byte = struct.pack("H", value)
-        data.append(high_byte)
-        data.append(low_byte)
+        self._retry(self._set_vcp_feature, code, value)
 
-        # add headers and footers
-        data.insert(0, (len(data) | self.PROTOCOL_FLAG))
-        data.insert(0, self.HOST_ADDRESS)
-        data.append(self.get_checksum(bytearray([self.DDCCI_ADDR << 1]) + data))
+    def _set_vcp_feature(self, code: int, value: int):
+        self.rate_limt()
+        self.time_remaining()
 
-        # write data
-        self.logger.debug(
-            "data={data}",
-            extra=dict(data=" ".join([f"{x:02X}" for x in data])),
-        )
+        data = self._codec.set_vcp_request(code, value)
+        self._log_bytes("data", data)
         self.write_bytes(data)
 
         # store time of last set VCP
@@ -145,53 +195,23 @@ class LinuxVCP(VCP):
 
         Raises:
             VCPIOError: Failed to get VCP feature.
+            VCPTimeoutError: The deadline was exceeded.
         """
-        self.rate_limt()
-
-        # transmission data
-        data = bytearray()
-        data.append(self.GET_VCP_CMD)
-        data.append(code)
+        return self._retry(self._get_vcp_feature, code)
 
-        # add headers and footers
-        data.insert(0, (len(data) | self.PROTOCOL_FLAG))
-        data.insert(0, self.HOST_ADDRESS)
-        data.append(self.get_checksum(bytearray([self.DDCCI_ADDR << 1]) + data))
+    def _get_vcp_feature(self, code: int) -> Tuple[int, int]:
+        self.rate_limt()
+        self.time_remaining()
 
-        # write data
-        self.logger.debug(
-            "data={data}",
-            extra=dict(data=" ".join([f"{x:02X}" for x in data])),
-        )
+        data = self._codec.get_vcp_request(code)
+        self._log_bytes("data", data)
         self.write_bytes(data)
 
-        time.sleep(self.GET_VCP_TIMEOUT)
+        self._sleep(self.GET_VCP_TIMEOUT)
 
-        # read the data
-        header = self.read_bytes(self.GET_VCP_HEADER_LENGTH)
-        self.logger.debug(
-            "header={header}",
-            extra=dict(header=" ".join([f"{x:02X}" for x in header])),
-        )
-        source, length = struct.unpack("=BB", header)
-        length &= ~self.PROTOCOL_FLAG  # clear protocol flag
-        payload = self.read_bytes(length + 1)
-        self.logger.debug(
-            "payload={payload}",
-            extra=dict(payload=" ".join([f"{x:02X}" for x in payload])),
-        )
-
-        # check checksum
-        payload, checksum = struct.unpack(f"={length}sB", payload)
-        calculated_checksum = self.get_checksum(header + payload)
-        checksum_xor = checksum ^ calculated_checksum
-        if checksum_xor:
-            message = f"checksum does not match: {checksum_xor}"
-            if self.CHECKSUM_ERRORS.lower() == "strict":
-                raise VCPIOError(message)
-            elif self.CHECKSUM_ERRORS.lower() == "warning":
-                self.logger.warning(message)
-            # else ignore
+        length = self._read_reply()
+        if length != vcp_frames.GET_VCP_REPLY_LENGTH:
+            raise VCPReplyError(f"received unexpected response length: {length}")
 
         # unpack the payload
         (
@@ -201,15 +221,17 @@ class LinuxVCP(VCP):
             vcp_type_code,
             feature_max,
             feature_current,
-        ) = struct.unpack(">BBBBHH", payload)
+        ) = self._codec.decode_get_vcp_reply()
 
         if reply_code != self.GET_VCP_REPLY:
-            raise VCPIOError(f"received unexpected response code: {reply_code}")
+            raise VCPReplyError(f"received unexpected response code: {reply_code}")
 
         if vcp_opcode != code:
-            raise VCPIOError(f"received unexpected opcode: {vcp_opcode}")
+            raise VCPReplyError(f"received unexpected opcode: {vcp_opcode}")
 
-        if result_code > 0:
+        if result_code == 1:
+            raise VCPUnsupportedCodeError(self.GET_VCP_RESULT_CODES[result_code])
+        elif result_code > 0:
             try:
                 message = self.GET_VCP_RESULT_CODES[result_code]
             except KeyError:
@@ -231,6 +253,7 @@ class LinuxVCP(VCP):
 
         Raises:
             VCPError: Failed to get VCP feature.
+            VCPTimeoutError: The deadline was exceeded.
         """
 
         # Create an empty capabilities string to be filled with the data
@@ -248,72 +271,15 @@ class LinuxVCP(VCP):
         while loop_count < loop_count_limit:
             loop_count += 1
 
-            # transmission data
-            data = bytearray()
-            data.append(self.GET_VCP_CAPS_CMD)
-            low_byte, high_byte = struct.pack("H", offset)
-            data.append(high_byte)
-            data.append(low_byte)
-
-            # add headers and footers
-            data.insert(0, (len(data) | self.PROTOCOL_FLAG))
-            data.insert(0, self.HOST_ADDRESS)
-            data.append(self.get_checksum(data))
-
-            # write data
-            self.write_bytes(data)
-
-            time.sleep(self.GET_VCP_TIMEOUT)
-
-            # read the data
-            header = self.read_bytes(self.GET_VCP_HEADER_LENGTH)
-            self.logger.debug(
-                "header={header}",
-                extra=dict(header=" ".join([f"{x:02X}" for x in header])),
-            )
-            source, length = struct.unpack("BB", header)
-            length &= ~self.PROTOCOL_FLAG  # clear protocol flag
-            payload = self.read_bytes(length + 1)
-            self.logger.debug(
-                "payload={payload}",
-                extra=dict(payload=" ".join([f"{x:02X}" for x in payload])),
-            )
-
-            # check if length is valid
-            if length < 3 or length > 35:
-                raise VCPIOError(f"received unexpected response length: {length}")
-
-            # check checksum
-            payload, checksum = struct.unpack(f"{length}sB", payload)
-            calculated_checksum = self.get_checksum(header + payload)
-            checksum_xor = checksum ^ calculated_checksum
-            if checksum_xor:
-                message = f"checksum does not match: {checksum_xor}"
-                if self.CHECKSUM_ERRORS.lower() == "strict":
-                    raise VCPIOError(message)
-                elif self.CHECKSUM_ERRORS.lower() == "warning":
-                    self.logger.warning(message)
-                # else ignore
-            # remove checksum from length
-
-            # unpack the payload
-            reply_code, payload = struct.unpack(f">B{length - 1}s", payload)
-            length -= 1
-
-            if reply_code != self.GET_VCP_CAPS_REPLY:
-                raise VCPIOError(f"received unexpected response code: {reply_code}")
-
-            # unpack the payload
-            offset, payload = struct.unpack(f">H{length - 2}s", payload)
-            length -= 2
-
-            if length > 0:
-                caps_str += payload.decode("ASCII")
+            offset, fragment = self._retry(self._get_caps_fragment, offset)
+
+            if len(fragment) > 0:
+                caps_str += fragment
             else:
                 break
 
             # update the offset and go again
-            offset += length
+            offset += len(fragment)
 
         self.logger.debug("caps str={caps_str}", extra=dict(caps_str=caps_str))
 
@@ -322,6 +288,434 @@ class LinuxVCP(VCP):
 
         return caps_str
 
+    def _get_caps_fragment(self, offset: int) -> Tuple[int, str]:
+        """
+        Gets one fragment of the capabilities string.
+
+        Args:
+            offset: Offset of the fragment.
+
+        Returns:
+            Offset reported by the monitor, capabilities fragment.
+
+        Raises:
+            VCPIOError: Failed to get the fragment.
+        """
+        # write data
+        self.time_remaining()
+        self.write_bytes(self._codec.caps_request(offset))
+
+        self._sleep(self.GET_VCP_TIMEOUT)
+
+        length = self._read_reply()
+
+        # check if length is valid
+        if length < 3:
+            raise VCPReplyError(f"received unexpected response length: {length}")
+
+        reply_code, offset, fragment = self._codec.decode_caps_reply(length)
+
+        if reply_code != self.GET_VCP_CAPS_REPLY:
+            raise VCPReplyError(f"received unexpected response code: {reply_code}")
+
+        return offset, str(fragment, "ASCII")
+
+    def read_table(
+        self, code: int, offset: int = 0, max_length: int = 0x10000
+    ) -> bytes:
+        """
+        Reads a table feature from the virtual control panel.
+
+        The table is read in fragments of up to 32 bytes until the monitor
+        replies with an empty fragment.
+        Every fragment is retried on its own with the retry policy.
+
+        Args:
+            code: Feature code.
+            offset: Offset in the table to start reading from.
+            max_length: Maximum number of bytes to read.
+
+        Returns:
+            Table data.
+
+        Raises:
+            VCPIOError: Failed to read the table, or the table is longer
+                than the maximum length.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        table = bytearray()
+        while True:
+            fragment = self._retry(self._read_table_fragment, code, offset + len(table))
+            if not fragment:
+                break
+            table += fragment
+            if len(table) > max_length:
+                raise VCPIOError(f"table is longer than {max_length} bytes")
+        return bytes(table)
+
+    def _read_table_fragment(self, code: int, offset: int) -> bytes:
+        """
+        Reads one fragment of a table.
+
+        Args:
+            code: Feature code.
+            offset: Offset of the fragment.
+
+        Returns:
+            Table fragment, empty at the end of the table.
+
+        Raises:
+            VCPIOError: Failed to read the fragment.
+        """
+        self.rate_limt()
+        self.time_remaining()
+
+        data = self._codec.table_read_request(code, offset)
+        self._log_bytes("data", data)
+        self.write_bytes(data)
+
+        self._sleep(self.GET_VCP_TIMEOUT)
+
+        length = self._read_reply()
+        if length < 3:
+            raise VCPReplyError(f"received unexpected response length: {length}")
+
+        reply_code, reply_offset, fragment = self._codec.decode_table_reply(length)
+
+        if reply_code != self.TABLE_READ_REPLY:
+            raise VCPReplyError(f"received unexpected response code: {reply_code}")
+
+        if reply_offset != offset:
+            raise VCPReplyError(f"received unexpected offset: {reply_offset}")
+
+        return bytes(fragment)
+
+    def write_table(self, code: int, data, offset: int = 0):
+        """
+        Writes a table feature to the virtual control panel.
+
+        The data is written in fragments of up to 32 bytes, sliced from the
+        buffer without copying it.
+        Every fragment is retried on its own with the retry policy.
+
+        Args:
+            code: Feature code.
+            data: Table data, any bytes-like object.
+            offset: Offset of the data in the table.
+
+        Raises:
+            ValueError: The data does not fit in the table offsets.
+            VCPIOError: Failed to write the table.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        view = memoryview(data).cast("B")
+        if offset + len(view) > 0x10000:
+            raise ValueError("table data exceeds the maximum offset")
+        size = vcp_frames.TABLE_FRAGMENT_SIZE
+        for start in range(0, len(view), size):
+            fragment = view[start : start + size]
+            self._retry(self._write_table_fragment, code, offset + start, fragment)
+
+    def _write_table_fragment(self, code: int, offset: int, fragment: memoryview):
+        self.rate_limt()
+        self.time_remaining()
+
+        data = self._codec.table_write_request(code, offset, fragment)
+        self._log_bytes("data", data)
+        self.write_bytes(data)
+
+        # store time of last write, the monitor needs time to process it
+        self.last_set = time.time()
+
+    def save_settings(self):
+        """
+        Stores the current settings in the non-volatile memory of the
+        monitor.
+
+        Saving wears the monitor memory and delays the next message by
+        200 ms, so save once after a group of changes instead of after
+        every change.
+
+        Raises:
+            VCPIOError: Failed to save the settings.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        self._retry(self._save_settings)
+
+    def _save_settings(self):
+        self.rate_limt()
+        self.time_remaining()
+
+        data = vcp_frames.SAVE_SETTINGS_REQUEST
+        self._log_bytes("data", data)
+        self.write_bytes(data)
+
+        # the rate limit of the next message covers the longer save delay
+        self.last_set = time.time() + self.SAVE_SETTINGS_DELAY - self.CMD_RATE
+
+    def get_timing_report(self) -> TimingReport:
+        """
+        Gets the timing of the display signal.
+
+        Returns:
+            Timing report.
+
+        Raises:
+            VCPIOError: Failed to get the timing report.
+            VCPTimeoutError: The deadline was exceeded.
+        """
+        return self._retry(self._get_timing_report)
+
+    def _get_timing_report(self) -> TimingReport:
+        self.rate_limt()
+        self.time_remaining()
+
+        data = vcp_frames.TIMING_REQUEST
+        self._log_bytes("data", data)
+        self.write_bytes(data)
+
+        self._sleep(self.GET_VCP_TIMEOUT)
+
+        length = self._read_reply()
+        if length != vcp_frames.TIMING_REPLY_LENGTH:
+            raise VCPReplyError(f"received unexpected response length: {length}")
+
+        reply_code, status, horizontal, vertical = self._codec.decode_timing_reply()
+        if reply_code != self.TIMING_REPLY:
+            raise VCPReplyError(f"received unexpected response code: {reply_code}")
+
+        return TimingReport(status, horizontal * 10, vertical / 100)
+
+    @property
+    def connector(self) -> Optional[str]:
+        """
+        Name of the DRM connector of the bus, such as ``"card0-DP-1"``,
+        or None if no connector owns the bus.
+        """
+        path = vcp_edid.find_connector(self.bus_number, self.SYSFS_ROOT)
+        return None if path is None else os.path.basename(path)
+
+    def read_edid(self) -> bytes:
+        """
+        Reads the EDID of the monitor from the DRM connector, or from the
+        bus if there is no connector.
+
+        This does not need the VCP to be open.
+
+        Returns:
+            EDID, at least the 128 byte base block.
+
+        Raises:
+            VCPIOError: Failed to read the EDID.
+        """
+        return vcp_edid.read_edid(self.bus_number, self.SYSFS_ROOT)
+
+    def _retry(self, func: Callable[..., T], *args) -> T:
+        """Calls a transaction function with the retry policy, if any."""
+        if self.retry_policy is None:
+            return self._transaction(func, *args)
+        return self.retry_policy.call(
+            self._transaction,
+            func,
+            *args,
+            min_delay=self.CMD_RATE,
+            deadline=self.deadline,
+        )
+
+    def _transaction(self, func: Callable[..., T], *args) -> T:
+        """
+        Calls a transaction function in a turn of the bus scheduler, holding
+        the bus lock if enabled.
+
+        The turn and the lock are released between retries and between the
+        fragments of capabilities and tables, so higher priority
+        transactions and other processes can take the bus in between.
+        """
+        scheduler = self.scheduler
+        with scheduler.turn(self.priority, self.deadline):
+            # the rate limit applies to the sets of every VCP of the bus
+            if scheduler.last_set is not None and (
+                self.last_set is None or scheduler.last_set > self.last_set
+            ):
+                self.last_set = scheduler.last_set
+            limited = False
+            try:
+                if not self.BUS_LOCK:
+                    self.rate_limt()
+                    limited = self._limit_adapter_timeout()
+                    return func(*args)
+                with self._bus_locked():
+                    limited = self._limit_adapter_timeout()
+                    return func(*args)
+            finally:
+                if limited:
+                    self._set_adapter_timeout(self.ADAPTER_TIMEOUT)
+                scheduler.last_set = self.last_set
+
+    def _limit_adapter_timeout(self) -> bool:
+        """
+        Lowers the timeout of the kernel for every message on the adapter
+        to the time remaining until the deadline, so blocking reads and
+        writes end by the deadline on adapters that honour it.
+
+        The timeout is shared by every user of the adapter, it is restored
+        to :py:attr:`ADAPTER_TIMEOUT` after the transaction.
+
+        Returns:
+            True if the timeout was lowered and has to be restored.
+        """
+        remaining = self.time_remaining()
+        if remaining is None or remaining >= self.ADAPTER_TIMEOUT:
+            return False
+        self._set_adapter_timeout(remaining)
+        return True
+
+    def _set_adapter_timeout(self, seconds: float):
+        """Sets the adapter timeout, rounded up to the 10ms unit."""
+        try:
+            fcntl.ioctl(self.fd, self.I2C_TIMEOUT, max(1, math.ceil(seconds * 100)))
+        except OSError as e:
+            self.logger.debug("unable to set the adapter timeout: %s", e)
+
+    def _open_pacing(self) -> Optional[int]:
+        """
+        Opens the pacing state shared by the processes of the user locking
+        the bus.
+
+        Returns:
+            File descriptor of the state, or None if it cannot be opened,
+            in which case only the lock is shared.
+        """
+        directory = (
+            self.LOCK_DIR
+            or os.environ.get("MONITORCONTROL_LOCK_DIR")
+            or os.environ.get("XDG_RUNTIME_DIR")
+        )
+        name = f"monitorcontrol-i2c-{self.bus_number}"
+        if not directory:
+            # imported here to keep it out of the import time of the package
+            import tempfile
+
+            directory = tempfile.gettempdir()
+            name = f"monitorcontrol-{os.getuid()}-i2c-{self.bus_number}"
+        path = os.path.join(directory, name)
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        except OSError:
+            self.logger.debug("unable to open %s", path)
+            return None
+        # never trust a file planted by another user
+        status = os.fstat(fd)
+        if not stat.S_ISREG(status.st_mode) or status.st_uid != os.getuid():
+            os.close(fd)
+            self.logger.debug("not a regular file of the user: %s", path)
+            return None
+        return fd
+
+    @contextlib.contextmanager
+    def _bus_locked(self) -> Iterator[None]:
+        """
+        Holds the advisory lock of the bus, if enabled.
+
+        The lock is an ``flock`` of the bus device, as taken by other DDC
+        tools.
+        While it is held the time of the last set shared by every process
+        is loaded and the rate limit is applied, and a new time of the last
+        set is stored for the next process.
+
+        Raises:
+            VCPIOError: Failed to lock the bus.
+            VCPTimeoutError: The deadline was exceeded waiting for the lock.
+        """
+        if not self.BUS_LOCK:
+            yield
+            return
+        while True:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                self._sleep(self.LOCK_POLL)
+            except OSError as e:
+                raise VCPIOError("unable to lock the I2C bus") from e
+        try:
+            self._load_pacing()
+            last_set = self.last_set
+            try:
+                self.rate_limt()
+                yield
+            finally:
+                if self.last_set != last_set:
+                    self._store_pacing()
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _load_pacing(self):
+        """Loads the time of the last set by any process locking the bus."""
+        if self._pacing_fd is None:
+            return
+        data = os.pread(self._pacing_fd, self.PACING_STRUCT.size, 0)
+        if len(data) == self.PACING_STRUCT.size:
+            (shared,) = self.PACING_STRUCT.unpack(data)
+            # a time in the future only delays as long as a save
+            latest = time.time() + max(self.CMD_RATE, self.SAVE_SETTINGS_DELAY)
+            shared = min(shared, latest)
+            if self.last_set is None or shared > self.last_set:
+                self.last_set = shared
+
+    def _store_pacing(self):
+        """Stores the time of the last set for other processes locking the bus."""
+        if self._pacing_fd is not None and self.last_set is not None:
+            os.pwrite(self._pacing_fd, self.PACING_STRUCT.pack(self.last_set), 0)
+
+    def _sleep(self, seconds: float):
+        """
+        Sleeps for a bus delay.
+
+        Raises:
+            VCPTimeoutError: The delay would end past the deadline.
+        """
+        remaining = self.time_remaining()
+        if remaining is not None and seconds >= remaining:
+            raise VCPTimeoutError("VCP deadline exceeded")
+        time.sleep(seconds)
+
+    def _read_reply(self) -> int:
+        """
+        Reads a reply into the reusable reply buffer and checks the checksum.
+
+        Returns:
+            Payload length of the reply, excluding the checksum.
+
+        Raises:
+            VCPIOError: Unable to read data or invalid reply.
+        """
+        codec = self._codec
+        self.read_into(codec.header_view)
+        self._log_bytes("header", codec.header_view)
+        length = codec.payload_length()
+        if length > vcp_frames.MAX_PAYLOAD_LENGTH:
+            raise VCPReplyError(f"received unexpected response length: {length}")
+        payload = codec.payload_view(length)
+        self.read_into(payload)
+        self._log_bytes("payload", payload)
+
+        checksum_xor = codec.checksum_xor(length)
+        if checksum_xor:
+            message = f"checksum does not match: {checksum_xor}"
+            if self.CHECKSUM_ERRORS.lower() == "strict":
+                raise VCPChecksumError(message)
+            elif self.CHECKSUM_ERRORS.lower() == "warning":
+                self.logger.warning(message)
+            # else ignore
+
+        return length
+
+    def _log_bytes(self, name: str, data):
+        """Logs raw frame bytes, formatting them only when enabled."""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s=%s", name, " ".join([f"{x:02X}" for x in data]))
+
     @staticmethod
     def get_checksum(data: bytearray) -> int:
         """
@@ -334,19 +728,16 @@ class LinuxVCP(VCP):
         Returns:
             Checksum for the data.
         """
-        checksum = 0x00
-        for data_byte in data:
-            checksum ^= data_byte
-        return checksum
+        return vcp_frames.checksum(data)
 
     def rate_limt(self):
         """Rate limits messages to the VCP."""
         if self.last_set is None:
             return
 
-        rate_delay = self.CMD_RATE - time.time() - self.last_set
+        rate_delay = self.CMD_RATE - (time.time() - self.last_set)
         if rate_delay > 0:
-            time.sleep(rate_delay)
+            self._sleep(rate_delay)
 
     def read_bytes(self, num_bytes: int) -> bytes:
         """
@@ -363,6 +754,27 @@ class LinuxVCP(VCP):
         except OSError as e:
             raise VCPIOError("unable to read from I2C bus") from e
 
+    def read_into(self, buffer: memoryview) -> int:
+        """
+        Reads bytes from the I2C bus into an existing buffer.
+
+        Args:
+            buffer: writable buffer, filled completely
+
+        Returns:
+            Number of bytes read.
+
+        Raises:
+            VCPIOError: unable to read data
+        """
+        try:
+            num_bytes = os.readv(self.fd, [buffer])
+        except OSError as e:
+            raise VCPIOError("unable to read from I2C bus") from e
+        if num_bytes != len(buffer):
+            raise VCPIOError(f"short read from I2C bus: {num_bytes}")
+        return num_bytes
+
     def write_bytes(self, data: bytes):
         """
         Writes bytes to the I2C bus.
@@ -379,18 +791,41 @@ class LinuxVCP(VCP):
             raise VCPIOError("unable write to I2C bus") from e
 
 
-def get_vcps() -> List[LinuxVCP]:
+def _bus_vcp(bus_number: int, retry_policy: Optional[RetryPolicy]) -> VCP:
+    """Creates the VCP of a bus, using the ddcci driver if it is bound."""
+    if DDCCIVCP.is_available(bus_number):
+        return DDCCIVCP(bus_number)
+    return LinuxVCP(bus_number, retry_policy)
+
+
+def get_vcps(retry_policy: Optional[RetryPolicy] = None) -> List[VCP]:
     """
     Interrogates I2C buses to determine if they are DDC-CI capable.
 
+    Buses with a monitor bound to the ``ddcci`` kernel driver are accessed
+    through the driver with :py:class:`~monitorcontrol.vcp.vcp_ddcci.DDCCIVCP`,
+    which owns the DDC/CI address of the bus.
+
+    Args:
+        retry_policy:
+            Retry policy shared by the VCPs, None for a new
+            :py:class:`~monitorcontrol.vcp.vcp_retry.RetryPolicy` with
+            ``LinuxVCP.RETRY_ATTEMPTS`` attempts.
+            ``RetryPolicy(attempts=1)`` never retries.
+
     Returns:
         List of all VCPs detected.
     """
+    # imported here to keep it out of the import time of the package
+    import pyudev
+
+    if retry_policy is None:
+        retry_policy = RetryPolicy(LinuxVCP.RETRY_ATTEMPTS)
     vcps = []
 
     # iterate I2C devices
     for device in pyudev.Context().list_devices(subsystem="i2c"):
-        vcp = LinuxVCP(device.sys_number)
+        vcp = _bus_vcp(device.sys_number, retry_policy)
         try:
             with vcp:
                 pass
@@ -400,3 +835,60 @@ def get_vcps() -> List[LinuxVCP]:
             vcps.append(vcp)
 
     return vcps
+
+
+def find_vcps(
+    field: str, value: str, retry_policy: Optional[RetryPolicy] = None
+) -> Optional[List[VCP]]:
+    """
+    Finds VCPs by identity from the DRM connectors in sysfs.
+
+    Only sysfs and the EDIDs cached by the kernel are read, no bus is
+    opened or probed.
+
+    Args:
+        field:
+            ``"connector"`` for the DRM connector name, with or without the
+            card prefix, such as ``"DP-2"`` or ``"card0-DP-2"``,
+            ``"model"`` for the monitor name from the EDID, or any other
+            field of :py:attr:`~monitorcontrol.vcp.vcp_edid.EDID.identity`.
+        value: Expected value, compared ignoring case.
+        retry_policy: Retry policy shared by the VCPs, as in ``get_vcps``.
+
+    Returns:
+        VCPs of the matching monitors in a closed state, or None if no DRM
+        connector owns an I2C bus, as with some proprietary drivers, and
+        the buses have to be probed instead.
+
+    Raises:
+        ValueError: Unknown field.
+    """
+    if field == "model":
+        field = "name"
+    if field != "connector" and field not in vcp_edid.EDID_FIELDS:
+        raise ValueError(f"unknown monitor field: {field}")
+    value = value.strip().lower()
+
+    connectors = vcp_edid.list_connectors(LinuxVCP.SYSFS_ROOT)
+    if not connectors:
+        return None
+
+    if retry_policy is None:
+        retry_policy = RetryPolicy(LinuxVCP.RETRY_ATTEMPTS)
+    vcps = []
+    for connector, bus_number in connectors:
+        if field == "connector":
+            # strip the card prefix, "card0-DP-2" is "DP-2"
+            name = os.path.basename(connector).lower()
+            if value not in (name, name.partition("-")[2]):
+                continue
+        else:
+            try:
+                edid = vcp_edid.parse_edid(vcp_edid.read_connector_edid(connector))
+            except ValueError:
+                # nothing connected
+                continue
+            if edid.identity[field].strip().lower() != value:
+                continue
+        vcps.append(_bus_vcp(bus_number, retry_policy))
+    return vcps
@@ -0,0 +1,136 @@
+from .vcp_abc import VCPIOError, VCPTimeoutError, VCPUnsupportedCodeError
+from typing import Any, Callable, Optional
+import logging
+import random
+import threading
+import time
+
+
+class RetryPolicy:
+    """
+    Retry policy for transient VCP errors.
+
+    Failed transactions are retried with exponential backoff and random
+    jitter.
+    Only errors that may succeed on a second attempt are retried, these are
+    I/O errors (including NAKs), checksum errors, and unexpected replies.
+    Unsupported VCP codes and timeouts are never retried.
+    One policy can be shared by the VCPs of many threads.
+
+    Args:
+        attempts: Maximum number of attempts, including the first attempt.
+        backoff: Delay before the first retry in seconds.
+        multiplier: Backoff multiplier applied for every following retry.
+        max_backoff: Upper limit of the delay between attempts in seconds.
+        jitter: Random jitter as a fraction of the delay.
+        timeout:
+            Time in seconds after the start of a call past which no retry
+            is started, or None for no limit.
+            It does not interrupt an attempt that is running, see
+            :py:meth:`~monitorcontrol.monitorcontrol.Monitor.timeout` to bound
+            attempts.
+        on_retry:
+            Called with the attempt number, the error, and the delay
+            before every retry.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.05,
+        multiplier: float = 2.0,
+        max_backoff: float = 1.0,
+        jitter: float = 0.25,
+        timeout: Optional[float] = None,
+        on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+    ):
+        if attempts < 1:
+            raise ValueError(f"attempts must be at least 1: {attempts}")
+        self.logger = logging.getLogger(__name__)
+        self.attempts = attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.on_retry = on_retry
+        #: Total number of retries performed with this policy.
+        self.retries = 0
+        #: Total number of calls that failed after retrying.
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """Returns true if the error is transient and worth retrying."""
+        if isinstance(error, (VCPUnsupportedCodeError, VCPTimeoutError)):
+            return False
+        return isinstance(error, VCPIOError)
+
+    def get_delay(self, attempt: int, min_delay: float = 0.0) -> float:
+        """
+        Computes the delay before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1.
+            min_delay: Lower limit of the delay, such as the bus pacing.
+
+        Returns:
+            Delay in seconds.
+        """
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(delay, min_delay)
+
+    def call(
+        self,
+        func: Callable[..., Any],
+        *args,
+        min_delay: float = 0.0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """
+        Calls a function, retrying transient errors.
+
+        Args:
+            func: Function to call.
+            args: Arguments for the function.
+            min_delay: Lower limit of the delay between attempts.
+            deadline:
+                Absolute :py:func:`time.monotonic` deadline,
+                no retries are started that would wait past the deadline.
+                The running attempt is not interrupted.
+
+        Returns:
+            Return value of the function.
+
+        Raises:
+            VCPError: The last error when no attempts remain.
+        """
+        if self.timeout is not None:
+            timeout_deadline = time.monotonic() + self.timeout
+            if deadline is None or timeout_deadline < deadline:
+                deadline = timeout_deadline
+        attempt = 1
+        while True:
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt >= self.attempts or not self.is_retryable(e):
+                    if attempt > 1:
+                        with self._lock:
+                            self.failures += 1
+                    raise
+                delay = self.get_delay(attempt, min_delay)
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    if attempt > 1:
+                        with self._lock:
+                            self.failures += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                self.logger.debug("retry %d in %.3fs after %s", attempt, delay, e)
+                if self.on_retry is not None:
+                    self.on_retry(attempt, e, delay)
+                time.sleep(delay)
+                attempt += 1
@@ -0,0 +1,117 @@
+"""
+Scheduling of the transactions of the VCPs sharing one bus in a process.
+
+Every transaction, such as one get or set, or one fragment of the
+capabilities string or a table, takes a turn of the bus.
+Waiting turns are granted by priority, so an interactive command waits for
+at most the transaction in progress, even behind a capabilities download.
+"""
+
+from .vcp_abc import Priority, VCPTimeoutError
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+import contextlib
+import itertools
+import threading
+import time
+
+
+class BusScheduler:
+    """
+    Grants turns of one bus to threads by priority.
+
+    Turns of one priority class are granted in order of arrival.
+    A waiting turn is raised by one priority class for every ``aging``
+    seconds it has waited, so low priority work is never starved:
+    a background turn waits at most twice the aging time behind a stream of
+    interactive turns.
+
+    Args:
+        aging: Seconds of waiting that raise a turn by one priority class.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol.vcp import Priority
+            from monitorcontrol.vcp.vcp_scheduler import get_scheduler
+
+            with get_scheduler("/dev/i2c-4").turn(Priority.INTERACTIVE):
+                ...
+    """
+
+    def __init__(self, aging: float = 0.5):
+        self.aging = aging
+        #: Time of the last set by any VCP of the bus, for the rate limit.
+        self.last_set: Optional[float] = None
+        self._condition = threading.Condition()
+        self._busy = False
+        # sort key and sequence number of every waiting turn
+        self._waiting: List[Tuple[float, int]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Number of turns waiting for the bus."""
+        with self._condition:
+            return len(self._waiting)
+
+    @contextlib.contextmanager
+    def turn(
+        self, priority: Priority = Priority.NORMAL, deadline: Optional[float] = None
+    ) -> Iterator[None]:
+        """
+        Holds the bus within the context.
+
+        Args:
+            priority: Priority class of the turn.
+            deadline:
+                Absolute :py:func:`time.monotonic` deadline,
+                or None to wait forever.
+
+        Raises:
+            VCPTimeoutError: The deadline was exceeded waiting for the bus.
+        """
+        # aging at the same rate keeps the order of waiting turns fixed,
+        # so a turn is ranked by the time it reaches the next class
+        waiter = (time.monotonic() + int(priority) * self.aging, next(self._sequence))
+        with self._condition:
+            self._waiting.append(waiter)
+            try:
+                while self._busy or min(self._waiting) != waiter:
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            raise VCPTimeoutError("VCP deadline exceeded")
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting.remove(waiter)
+                # another turn may be next when this one leaves early
+                self._condition.notify_all()
+            self._busy = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+
+_schedulers: Dict[Hashable, BusScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(key: Hashable) -> BusScheduler:
+    """
+    Gets the scheduler of a bus, shared by every VCP of the process.
+
+    Args:
+        key: Key of the bus, such as the device path.
+
+    Returns:
+        Scheduler of the bus.
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = BusScheduler()
+        return scheduler
@@ -0,0 +1,303 @@
+"""
+Recording and replay of the raw DDC/CI frames of
+``monitorcontrol.vcp.vcp_linux.LinuxVCP``.
+
+A trace is a binary file with a header followed by one record per bus
+operation.
+The header is the magic ``b"MCTRACE"``, the format version, and the I2C bus
+number as a little endian 16 bit integer.
+Every record is the operation kind, the microseconds since the previous
+record as a little endian 32 bit integer, the data length as a little
+endian 16 bit integer, and the data.
+The data of a read or write is the raw frame, the data of an error is the
+error message.
+"""
+
+from .vcp_abc import VCPError, VCPIOError
+from .vcp_linux import LinuxVCP
+from .vcp_retry import RetryPolicy
+from types import TracebackType
+from typing import BinaryIO, List, Optional, Tuple, Type
+import struct
+import time
+
+TRACE_MAGIC = b"MCTRACE"
+TRACE_VERSION = 1
+
+# record kinds
+WRITE = 0
+READ = 1
+WRITE_ERROR = 2
+READ_ERROR = 3
+
+HEADER_STRUCT = struct.Struct("<7sBH")
+RECORD_STRUCT = struct.Struct("<BIH")
+
+MAX_DELTA = 0xFFFFFFFF  # longest time between records in microseconds
+
+
+class TraceMismatchError(VCPError):
+    """Raised when a replayed transaction differs from the trace."""
+
+    pass
+
+
+class TraceRecord:
+    """
+    One bus operation of a trace.
+
+    Args:
+        kind: Operation kind, one of ``WRITE``, ``READ``, ``WRITE_ERROR``,
+            or ``READ_ERROR``.
+        time: Time since the start of the trace in seconds.
+        data: Frame bytes, or the error message for errors.
+    """
+
+    __slots__ = ("kind", "time", "data")
+
+    def __init__(self, kind: int, time: float, data: bytes):
+        self.kind = kind
+        self.time = time
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"TraceRecord({self.kind}, {self.time:.6f}, {self.data!r})"
+
+
+def read_trace(trace: BinaryIO) -> Tuple[int, List[TraceRecord]]:
+    """
+    Reads a trace file.
+
+    Args:
+        trace: Binary file positioned at the start of the trace.
+
+    Returns:
+        I2C bus number, records.
+
+    Raises:
+        ValueError: The file is not a trace or is truncated.
+    """
+    header = trace.read(HEADER_STRUCT.size)
+    if len(header) != HEADER_STRUCT.size:
+        raise ValueError("truncated trace header")
+    magic, version, bus_number = HEADER_STRUCT.unpack(header)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError("not a monitorcontrol trace")
+
+    records = []
+    elapsed = 0
+    while True:
+        head = trace.read(RECORD_STRUCT.size)
+        if not head:
+            break
+        if len(head) != RECORD_STRUCT.size:
+            raise ValueError("truncated trace record")
+        kind, delta, length = RECORD_STRUCT.unpack(head)
+        data = trace.read(length)
+        if len(data) != length:
+            raise ValueError("truncated trace record")
+        elapsed += delta
+        records.append(TraceRecord(kind, elapsed / 1e6, data))
+    return bus_number, records
+
+
+class RecordingVCP(LinuxVCP):
+    """
+    Linux VCP that records every frame read from and written to the bus.
+
+    The header is written when the trace file is empty, so several sessions
+    can be recorded to one file by entering the context again.
+
+    Args:
+        bus_number: I2C bus number.
+        trace: Binary file the trace is written to.
+        retry_policy: Retry policy for transient errors, None to never retry.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol import Monitor
+            from monitorcontrol.vcp.vcp_trace import RecordingVCP
+
+            with open("monitor.trace", "wb") as trace:
+                with Monitor(RecordingVCP(5, trace)) as monitor:
+                    monitor.get_vcp_capabilities()
+                    monitor.get_luminance()
+    """
+
+    def __init__(
+        self,
+        bus_number: int,
+        trace: BinaryIO,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        super().__init__(bus_number, retry_policy)
+        self.trace = trace
+        self._last_record: Optional[float] = None
+
+    def _record(self, kind: int, data):
+        now = time.monotonic()
+        if self._last_record is None:
+            if self.trace.tell() == 0:
+                self.trace.write(
+                    HEADER_STRUCT.pack(TRACE_MAGIC, TRACE_VERSION, int(self.bus_number))
+                )
+            delta = 0
+        else:
+            delta = min(round((now - self._last_record) * 1e6), MAX_DELTA)
+        self._last_record = now
+        self.trace.write(RECORD_STRUCT.pack(kind, delta, len(data)))
+        self.trace.write(data)
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        try:
+            return super().__exit__(
+                exception_type, exception_value, exception_traceback
+            )
+        finally:
+            self.trace.flush()
+
+    def read_bytes(self, num_bytes: int) -> bytes:
+        try:
+            data = super().read_bytes(num_bytes)
+        except VCPIOError as e:
+            self._record(READ_ERROR, str(e).encode())
+            raise
+        self._record(READ, data)
+        return data
+
+    def read_into(self, buffer: memoryview) -> int:
+        try:
+            num_bytes = super().read_into(buffer)
+        except VCPIOError as e:
+            self._record(READ_ERROR, str(e).encode())
+            raise
+        self._record(READ, buffer)
+        return num_bytes
+
+    def write_bytes(self, data: bytes):
+        try:
+            super().write_bytes(data)
+        except VCPIOError as e:
+            self._record(WRITE_ERROR, str(e).encode())
+            raise
+        self._record(WRITE, data)
+
+
+class ReplayVCP(LinuxVCP):
+    """
+    Linux VCP that replays a trace recorded by :py:class:`RecordingVCP`
+    instead of accessing a bus.
+
+    Frames written by the VCP are compared against the trace and the
+    recorded replies and errors are served back, so the framing, retry,
+    and pacing logic runs against the recorded behaviour of a real monitor.
+
+    Args:
+        trace: Binary file positioned at the start of the trace.
+        realtime:
+            Serve every record no earlier than its recorded time after the
+            first record, reproducing the response times of the monitor.
+        retry_policy: Retry policy for transient errors, None to never retry.
+
+    Raises:
+        ValueError: The file is not a trace.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol import Monitor
+            from monitorcontrol.vcp.vcp_trace import ReplayVCP
+
+            with open("monitor.trace", "rb") as trace:
+                with Monitor(ReplayVCP(trace)) as monitor:
+                    monitor.get_vcp_capabilities()
+                    monitor.get_luminance()
+    """
+
+    # there is no bus to share with other processes
+    BUS_LOCK = False
+
+    def __init__(
+        self,
+        trace: BinaryIO,
+        realtime: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        bus_number, self.records = read_trace(trace)
+        super().__init__(bus_number, retry_policy)
+        self.realtime = realtime
+        #: Index of the next record to replay.
+        self.position = 0
+        self._start: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """True if every record was replayed."""
+        return self.position == len(self.records)
+
+    def __enter__(self):
+        self.fd = -1
+        self.read_bytes(1)
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.fd = None
+        return False
+
+    def _next(self, kind: int, error_kind: int) -> TraceRecord:
+        """
+        Returns the next record, after its recorded time in realtime mode.
+
+        Raises:
+            TraceMismatchError: The next record is of another kind.
+            VCPIOError: The next record is a recorded error.
+        """
+        if self.finished:
+            raise TraceMismatchError("replayed past the end of the trace")
+        record = self.records[self.position]
+        if record.kind not in (kind, error_kind):
+            raise TraceMismatchError(
+                f"record {self.position} has kind {record.kind}, expected {kind}"
+            )
+        self.position += 1
+        if self.realtime:
+            if self._start is None:
+                self._start = time.monotonic() - record.time
+            delay = self._start + record.time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if record.kind == error_kind:
+            raise VCPIOError(record.data.decode(errors="replace"))
+        return record
+
+    def read_bytes(self, num_bytes: int) -> bytes:
+        record = self._next(READ, READ_ERROR)
+        if len(record.data) != num_bytes:
+            raise TraceMismatchError(
+                f"read {num_bytes} bytes, recorded {len(record.data)} bytes"
+            )
+        return record.data
+
+    def read_into(self, buffer: memoryview) -> int:
+        buffer[:] = self.read_bytes(len(buffer))
+        return len(buffer)
+
+    def write_bytes(self, data: bytes):
+        position = self.position
+        record = self._next(WRITE, WRITE_ERROR)
+        if record.data != bytes(data):
+            raise TraceMismatchError(
+                f"record {position} wrote {record.data.hex(' ')}, "
+                f"replay wrote {bytes(data).hex(' ')}"
+            )
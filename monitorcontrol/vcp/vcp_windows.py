@@ -1,4 +1,4 @@
-from .vcp_abc import VCP, VCPError
+from .vcp_abc import TimingReport, VCP, VCPError
 from types import TracebackType
 from typing import Iterator, List, Optional, Tuple, Type
 import ctypes
@@ -22,6 +22,15 @@ class PhysicalMonitor(ctypes.Structure):
     _fields_ = [("handle", HANDLE), ("description", WCHAR * 128)]
 
 
+# structure type for a timing report
+class MCTimingReport(ctypes.Structure):
+    _fields_ = [
+        ("horizontal_frequency", DWORD),
+        ("vertical_frequency", DWORD),
+        ("status", BYTE),
+    ]
+
+
 class WindowsVCP(VCP):
     """
     Windows API access to a monitor's virtual control panel.
@@ -65,6 +74,7 @@ class WindowsVCP(VCP):
         Raises:
             VCPError: Failed to set VCP feature.
         """
+        self.time_remaining()
         self.logger.debug(
             "SetVCPFeature(_, {code=}, {value=})",
             extra=dict(code=code, value=value),
@@ -90,6 +100,7 @@ class WindowsVCP(VCP):
         Raises:
             VCPError: Failed to get VCP feature.
         """
+        self.time_remaining()
         feature_current = DWORD()
         feature_max = DWORD()
         self.logger.debug(
@@ -128,6 +139,7 @@ class WindowsVCP(VCP):
             VCPError: Failed to get VCP feature.
         """
 
+        self.time_remaining()
         cap_length = DWORD()
         self.logger.debug("GetCapabilitiesStringLength")
         try:
@@ -149,6 +161,46 @@ class WindowsVCP(VCP):
             raise VCPError("failed to get VCP capabilities") from e
         return cap_string.value.decode("ascii")
 
+    def save_settings(self):
+        """
+        Stores the current settings in the non-volatile memory of the
+        monitor.
+
+        Raises:
+            VCPError: Failed to save the settings.
+        """
+        self.time_remaining()
+        self.logger.debug("SaveCurrentMonitorSettings")
+        try:
+            if not ctypes.windll.dxva2.SaveCurrentMonitorSettings(HANDLE(self.handle)):
+                raise VCPError("failed to save settings: " + ctypes.FormatError())
+        except OSError as e:
+            raise VCPError("failed to save settings") from e
+
+    def get_timing_report(self) -> TimingReport:
+        """
+        Gets the timing of the display signal.
+
+        Returns:
+            Timing report.
+
+        Raises:
+            VCPError: Failed to get the timing report.
+        """
+        self.time_remaining()
+        report = MCTimingReport()
+        self.logger.debug("GetTimingReport")
+        try:
+            if not ctypes.windll.dxva2.GetTimingReport(
+                HANDLE(self.handle), ctypes.byref(report)
+            ):
+                raise VCPError("failed to get timing report: " + ctypes.FormatError())
+        except OSError as e:
+            raise VCPError("failed to get timing report") from e
+        return TimingReport(
+            report.status, report.horizontal_frequency, report.vertical_frequency
+        )
+
     @staticmethod
     def _get_physical_monitors() -> Iterator[Tuple[HANDLE, str]]:
         """
@@ -0,0 +1,442 @@
+from . import vcp
+from .monitorcontrol import Monitor, _normalize
+from .vcp import vcp_codes
+from types import TracebackType
+from typing import (
+    AsyncIterator,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
+import logging
+import time
+
+#: Codes watched by default, the controls users typically change with the
+#: monitor buttons.
+DEFAULT_CODES = (
+    vcp_codes.image_luminance,
+    vcp_codes.image_contrast,
+    vcp_codes.input_select,
+    vcp_codes.sound_volume,
+    vcp_codes.display_audio_mute_mode,
+    vcp_codes.display_power_mode,
+)
+
+# values of the new control value code
+_NO_NEW_VALUES = 0x01
+_NEW_VALUES_PENDING = 0x02
+# upper limit on the active control FIFO, protects against monitors that
+# never report an empty FIFO
+_MAX_FIFO_DEPTH = 16
+
+
+class ChangeEvent:
+    """
+    A change of a watched feature value.
+
+    Args:
+        index: Index of the monitor in the watched monitors.
+        monitor: Monitor that changed.
+        code: Code that changed.
+        value: New feature value.
+        previous: Previous feature value.
+        timestamp: ``time.time()`` when the change was seen.
+    """
+
+    __slots__ = ("index", "monitor", "code", "value", "previous", "timestamp")
+
+    def __init__(
+        self,
+        index: int,
+        monitor: Monitor,
+        code: vcp.VCPCode,
+        value: int,
+        previous: int,
+        timestamp: float,
+    ):
+        self.index = index
+        self.monitor = monitor
+        self.code = code
+        self.value = value
+        self.previous = previous
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return (
+            f"ChangeEvent(index={self.index}, code={self.code.name!r}, "
+            f"value={self.value}, previous={self.previous})"
+        )
+
+    def to_dict(self) -> dict:
+        """Converts the event to a dictionary that can be serialized to JSON."""
+        return {
+            "index": self.index,
+            "code": self.code.value,
+            "name": self.code.name,
+            "value": self.value,
+            "previous": self.previous,
+            "timestamp": self.timestamp,
+        }
+
+
+class ChangeDetector:
+    """
+    Detects changes of feature values of one monitor.
+
+    Monitors that support the MCCS new control value (0x02) code are only
+    read when it reports new values.
+    The active control (0x52) FIFO is then drained and only the codes it
+    reports are read, before the new control value is reset.
+    Monitors that do not support the new control value code, or report
+    that they have no user controls, have every code read on each poll.
+
+    The VCP transactions of every poll are counted to measure the cost of
+    change detection.
+
+    This must be used from within the monitor context manager.
+
+    Args:
+        monitor: Monitor to watch.
+        codes:
+            VCP codes to watch, in any form accepted by
+            :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get`.
+        index: Index of the monitor reported in the events.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol import get_monitors, ChangeDetector
+
+            for monitor in get_monitors():
+                with monitor:
+                    detector = ChangeDetector(monitor)
+                    detector.start()
+                    print(detector.poll())
+                    print(detector.transactions / detector.polls)
+    """
+
+    def __init__(
+        self,
+        monitor: Monitor,
+        codes: Iterable[Union[int, str, vcp.VCPCode]] = DEFAULT_CODES,
+        index: int = 0,
+    ):
+        self.monitor = monitor
+        self.codes = [vcp_codes.get_vcp_code(code) for code in codes]
+        for code in self.codes:
+            if not code.readable:
+                raise TypeError(f"cannot watch write-only code: {code.name}")
+        self.index = index
+        #: Last known values indexed by code value.
+        self.values: Dict[int, int] = {}
+        #: True if the monitor reports changes with the new control value
+        #: code, None until started.
+        self.active_control: Optional[bool] = None
+        #: Number of VCP transactions of every poll, excluding the start.
+        self.transactions = 0
+        #: Number of polls, excluding the start.
+        self.polls = 0
+
+    def _get(self, code: vcp.VCPCode) -> int:
+        self.transactions += 1
+        return self.monitor.get(code)
+
+    def _read(self, codes: Sequence[vcp.VCPCode]) -> Dict[int, int]:
+        self.transactions += len(codes)
+        values = self.monitor.get_many(codes, ignore_unsupported=True)
+        return {code: _normalize(code, value) for code, value in values.items()}
+
+    def _pending(self) -> bool:
+        """Returns true if the new control value reports new values."""
+        try:
+            value = self._get(vcp_codes.new_control_value)
+        except vcp.VCPUnsupportedCodeError:
+            value = None
+        if value not in (_NO_NEW_VALUES, _NEW_VALUES_PENDING):
+            # unsupported, or 0xFF for no user controls
+            self.active_control = False
+            return True
+        return value == _NEW_VALUES_PENDING
+
+    def _drain(self) -> List[vcp.VCPCode]:
+        """
+        Drains the active control FIFO and clears the new control value.
+
+        Returns:
+            Watched codes that changed, or every watched code if the monitor
+            does not report which controls changed.
+        """
+        changed = set()
+        try:
+            for _ in range(_MAX_FIFO_DEPTH):
+                value = self._get(vcp_codes.active_control) & 0xFF
+                if value == 0:
+                    break
+                changed.add(value)
+        except vcp.VCPUnsupportedCodeError:
+            changed = None
+        self.transactions += 1
+        self.monitor.set(vcp_codes.new_control_value, _NO_NEW_VALUES)
+        if not changed:
+            return self.codes
+        return [code for code in self.codes if code.value in changed]
+
+    def start(self):
+        """
+        Reads the initial values and clears pending changes.
+
+        Codes the monitor does not support are no longer watched.
+
+        Raises:
+            VCPError: Failed to get or set a VCP feature.
+        """
+        transactions = self.transactions
+        self.active_control = True
+        try:
+            if self._pending() and self.active_control:
+                self._drain()
+            self.values = self._read(self.codes)
+        except BaseException:
+            # started again by the next poll
+            self.active_control = None
+            raise
+        finally:
+            self.transactions = transactions
+        self.codes = [code for code in self.codes if code.value in self.values]
+
+    def poll(self) -> List[ChangeEvent]:
+        """
+        Reads the values that changed since the last poll.
+
+        The detector is started by the first poll if it was not started.
+
+        Returns:
+            Changes since the last poll.
+
+        Raises:
+            VCPError: Failed to get or set a VCP feature.
+        """
+        if self.active_control is None:
+            self.start()
+            return []
+        self.polls += 1
+        if self.active_control:
+            if not self._pending():
+                return []
+            codes = self._drain() if self.active_control else self.codes
+        else:
+            codes = self.codes
+
+        timestamp = time.time()
+        events = []
+        for code_value, value in self._read(codes).items():
+            previous = self.values.get(code_value)
+            if previous != value:
+                self.values[code_value] = value
+                code = vcp_codes.get_vcp_code(code_value)
+                events.append(
+                    ChangeEvent(
+                        self.index, self.monitor, code, value, previous, timestamp
+                    )
+                )
+        return events
+
+
+class _Bus:
+    """Polling schedule shared by the monitors on one bus."""
+
+    def __init__(self, detectors: List[ChangeDetector], interval: float):
+        self.detectors = detectors
+        self.interval = interval
+        self.next_poll = 0.0
+
+
+def _bus_key(monitor: Monitor) -> Hashable:
+    """Returns a key that is equal for monitors on the same bus."""
+    bus_number = getattr(monitor.vcp, "bus_number", None)
+    if bus_number is None:
+        return id(monitor)
+    return bus_number
+
+
+class Watcher:
+    """
+    Watches monitors for changes of feature values, such as users
+    pressing the monitor buttons.
+
+    Monitors on the same bus are polled together on one schedule.
+    Each bus is polled at ``min_interval`` after a change, slowing down by
+    ``backoff`` every idle poll up to ``max_interval``.
+
+    Changes of each monitor are detected with a :py:class:`ChangeDetector`,
+    which only reads the changed codes of monitors that support the MCCS
+    active control (0x52) code.
+    Codes that a monitor does not support are not watched.
+    Polls run with the background priority, so they do not delay
+    interactive commands on the same bus.
+
+    Args:
+        monitors: Monitors in a closed state.
+        codes:
+            VCP codes to watch, in any form accepted by
+            :py:meth:`~monitorcontrol.monitorcontrol.Monitor.get`.
+        min_interval: Polling interval after a change in seconds.
+        max_interval: Polling interval when idle in seconds.
+        backoff: Growth of the polling interval for every idle poll.
+
+    Example:
+        Basic Usage::
+
+            from monitorcontrol import get_monitors, Watcher
+
+            with Watcher(get_monitors()) as watcher:
+                for event in watcher:
+                    print(event.index, event.code.name, event.value)
+
+        Asynchronous Usage::
+
+            async with Watcher(get_monitors()) as watcher:
+                async for event in watcher:
+                    print(event.index, event.code.name, event.value)
+    """
+
+    def __init__(
+        self,
+        monitors: Sequence[Monitor],
+        codes: Iterable[Union[int, str, vcp.VCPCode]] = DEFAULT_CODES,
+        min_interval: float = 0.2,
+        max_interval: float = 2.0,
+        backoff: float = 1.5,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.monitors = list(monitors)
+        self.codes = [vcp_codes.get_vcp_code(code) for code in codes]
+        for code in self.codes:
+            if not code.readable:
+                raise TypeError(f"cannot watch write-only code: {code.name}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        #: Change detector of each monitor.
+        self.detectors = [
+            ChangeDetector(monitor, self.codes, index)
+            for index, monitor in enumerate(self.monitors)
+        ]
+        buses: Dict[Hashable, List[ChangeDetector]] = {}
+        for detector in self.detectors:
+            buses.setdefault(_bus_key(detector.monitor), []).append(detector)
+        self._buses = [_Bus(detectors, min_interval) for detectors in buses.values()]
+        self._executor = None
+
+    def open(self):
+        """Opens every monitor."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        opened = []
+        try:
+            for monitor in self.monitors:
+                monitor.__enter__()
+                opened.append(monitor)
+        except BaseException:
+            for monitor in reversed(opened):
+                monitor.__exit__(None, None, None)
+            raise
+        self._executor = ThreadPoolExecutor(max_workers=max(len(self._buses), 1))
+
+    def close(self):
+        """Closes every monitor."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for monitor in reversed(self.monitors):
+            monitor.__exit__(None, None, None)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.close()
+        return False
+
+    async def __aenter__(self):
+        import asyncio
+
+        await asyncio.to_thread(self.open)
+        return self
+
+    async def __aexit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        import asyncio
+
+        await asyncio.to_thread(self.close)
+        return False
+
+    def _poll_bus(self, bus: _Bus) -> List[ChangeEvent]:
+        events = []
+        for detector in bus.detectors:
+            try:
+                with detector.monitor.prioritize(vcp.Priority.BACKGROUND):
+                    events += detector.poll()
+            except vcp.VCPError as e:
+                self.logger.warning("failed to poll monitor %d: %s", detector.index, e)
+        if events:
+            bus.interval = self.min_interval
+        else:
+            bus.interval = min(bus.interval * self.backoff, self.max_interval)
+        bus.next_poll = time.monotonic() + bus.interval
+        return events
+
+    def poll(self) -> List[ChangeEvent]:
+        """
+        Polls the buses that are due, in parallel.
+
+        The first poll of each monitor reads the initial values and does not
+        return events.
+
+        Returns:
+            Changes since the last poll.
+        """
+        assert self._executor is not None, "Watcher must be opened first"
+        now = time.monotonic()
+        due = [bus for bus in self._buses if bus.next_poll <= now]
+        events = []
+        for bus_events in self._executor.map(self._poll_bus, due):
+            events += bus_events
+        return events
+
+    def time_until_poll(self) -> float:
+        """Returns the time in seconds until the next bus is due."""
+        if not self._buses:
+            return self.max_interval
+        next_poll = min(bus.next_poll for bus in self._buses)
+        return max(next_poll - time.monotonic(), 0.0)
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        while True:
+            yield from self.poll()
+            time.sleep(self.time_until_poll())
+
+    async def __aiter__(self) -> AsyncIterator[ChangeEvent]:
+        import asyncio
+
+        while True:
+            for event in await asyncio.to_thread(self.poll):
+                yield event
+            await asyncio.sleep(self.time_until_poll())
@@ -1,11 +1,20 @@
 from .test_monitorcontrol import UnitTestVCP
-from monitorcontrol import Monitor
+from monitorcontrol import InputSource, Monitor, PowerMode
 import monitorcontrol.__main__
-from monitorcontrol.__main__ import main, count_to_level
+from monitorcontrol.__main__ import (
+    count_to_level,
+    get_parser,
+    main,
+    read_batch,
+    run_batch,
+)
 
 from unittest import mock
+import json
 import monitorcontrol
 import pytest
+import subprocess
+import sys
 
 get_monitors_mock = mock.patch.object(
     monitorcontrol.__main__,
@@ -14,12 +23,43 @@ get_monitors_mock = mock.patch.object(
 )
 
 
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch, tmp_path):
+    monkeypatch.setenv("MONITORCONTROL_SOCKET", str(tmp_path / "missing.sock"))
+
+
 def test_version():
     with mock.patch("builtins.print") as stdout_mock:
         main(["--version"])
         stdout_mock.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    "module",
+    [
+        "pyudev",
+        "importlib.metadata",
+        "monitorcontrol.daemon",
+        "concurrent.futures",
+        "asyncio",
+        "socket",
+        "monitorcontrol.watch",
+        "monitorcontrol.remote",
+        "monitorcontrol.fleet",
+    ],
+)
+def test_lazy_imports(module: str):
+    # a fresh interpreter, this test process has already imported everything
+    code = f"import sys, monitorcontrol.__main__; assert {module!r} not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_exports_access():
+    assert "Fleet" in dir(monitorcontrol)
+    assert monitorcontrol.RemoteVCP is monitorcontrol.remote.RemoteVCP
+    assert not hasattr(monitorcontrol, "missing")
+
+
 def test_get_luminance():
     with get_monitors_mock, mock.patch.object(Monitor, "get_luminance") as api_mock:
         main(["--get-luminance"])
@@ -78,10 +118,22 @@ def test_set_audio_mute(value: int):
         api_mock.assert_called_once_with(value)
 
 
-def test_get_input_source():
-    with get_monitors_mock, mock.patch.object(Monitor, "get_input_source") as api_mock:
-        main(["--get-input-source"])
+@pytest.mark.parametrize(
+    "argv, output",
+    [([], "17"), (["--json"], '"HDMI1"')],
+)
+def test_get_input_source(argv: list, output: str):
+    with (
+        get_monitors_mock,
+        mock.patch.object(
+            Monitor, "get_input_source", return_value=InputSource.HDMI1
+        ) as api_mock,
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--get-input-source", *argv])
         api_mock.assert_called_once()
+    # plain text input sources are printed by value
+    print_mock.assert_called_once_with(output)
 
 
 @pytest.mark.parametrize("value", ["DP1", "HDMI1", "27"])
@@ -110,3 +162,250 @@ def test_count_to_level_cli():
 def test_count_to_level():
     for num_v in range(10):
         assert isinstance(count_to_level(num_v), int)
+
+
+def batch_test_monitors():
+    return [
+        Monitor(
+            UnitTestVCP(
+                {
+                    0x10: {"current": 50, "maximum": 100},
+                    0x12: {"current": 40, "maximum": 100},
+                }
+            )
+        )
+        for _ in range(2)
+    ]
+
+
+BATCH = """
+# comments and empty lines are ignored
+--set-luminance 70
+--set-contrast 20 --monitor 2
+--get-luminance --monitor 2
+--get-contrast --monitor 2
+--get-contrast
+"""
+
+
+def test_read_batch():
+    commands = read_batch(get_parser(), BATCH.splitlines())
+    assert commands == [
+        (None, "set_luminance", (70,)),
+        (1, "set_contrast", (20,)),
+        (1, "get_luminance", ()),
+        (1, "get_contrast", ()),
+        (0, "get_contrast", ()),
+    ]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "--set-luminance x",
+        "--version",
+        "--batch -",
+        "--get-luminance --monitor serial:ABC",
+    ],
+)
+def test_read_batch_invalid(line: str):
+    with pytest.raises(SystemExit):
+        read_batch(get_parser(), [line])
+
+
+def test_run_batch():
+    monitors = batch_test_monitors()
+    commands = read_batch(get_parser(), BATCH.splitlines())
+    with mock.patch.object(
+        Monitor, "__enter__", autospec=True, side_effect=Monitor.__enter__
+    ) as enter_mock:
+        results = run_batch(commands, monitors)
+    # every monitor is opened once
+    assert enter_mock.call_count == len(monitors)
+    assert results == [[None, None], [None], [70], [20], [40]]
+
+
+def test_run_batch_errors():
+    commands = [(5, "get_luminance", ()), (0, "set_luminance", (101,))]
+    results = run_batch(commands, batch_test_monitors())
+    assert isinstance(results[0][0], IndexError)
+    assert isinstance(results[1][0], ValueError)
+
+
+def test_run_batch_internal_error(caplog: pytest.LogCaptureFixture):
+    commands = [(0, "get_luminance", ()), (0, "get_contrast", ())]
+    with (
+        mock.patch.object(Monitor, "get_luminance", side_effect=RuntimeError("bug")),
+        caplog.at_level("ERROR", "monitorcontrol.__main__"),
+    ):
+        results = run_batch(commands, batch_test_monitors())
+    assert isinstance(results[0][0], RuntimeError)
+    assert results[1] == [40]
+    (record,) = caplog.records
+    assert record.getMessage() == "internal error in get_luminance"
+    assert record.exc_info is not None
+
+
+def test_batch_cli(tmp_path):
+    path = tmp_path / "batch.txt"
+    path.write_text(BATCH + "--get-luminance --monitor 3\n")
+    with (
+        mock.patch.object(
+            monitorcontrol.__main__,
+            "get_monitors",
+            return_value=batch_test_monitors(),
+        ),
+        mock.patch("builtins.print") as print_mock,
+        pytest.raises(SystemExit) as exc_info,
+    ):
+        main(["--batch", str(path)])
+    assert exc_info.value.code == 1
+    assert [c.args[0] for c in print_mock.call_args_list] == [
+        "ok",
+        "ok",
+        "70",
+        "20",
+        "40",
+        "error: no monitor 3",
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2", 2),
+        ("serial:T5SAA0012345", ("serial", "T5SAA0012345")),
+        ("model:DELL U2720Q", ("model", "DELL U2720Q")),
+        ("connector:DP-2", ("connector", "DP-2")),
+    ],
+)
+def test_monitor_selector(value: str, expected):
+    assert get_parser().parse_args(["--get-luminance", "--monitor", value]).monitor == (
+        expected
+    )
+
+
+@pytest.mark.parametrize("value", ["bus:5", "serial:", "DP-2", "-1"])
+def test_monitor_selector_invalid(value: str):
+    with pytest.raises(SystemExit):
+        get_parser().parse_args(["--get-luminance", "--monitor", value])
+
+
+def test_select_monitors():
+    monitors = batch_test_monitors()
+    with (
+        mock.patch.object(
+            monitorcontrol.__main__, "find_monitors", return_value=monitors
+        ) as find_mock,
+        mock.patch.object(monitorcontrol.__main__, "get_monitors") as get_mock,
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--get-luminance", "--monitor", "model:DELL U2720Q"])
+        main(["--set-contrast", "30", "--monitor", "serial:B"])
+    # only the selected monitors are opened, without a full probe
+    get_mock.assert_not_called()
+    assert find_mock.call_args_list == [
+        mock.call("model", "DELL U2720Q"),
+        mock.call("serial", "B"),
+    ]
+    print_mock.assert_called_once_with("50")
+    for monitor in monitors:
+        with monitor:
+            assert monitor.get_contrast() == 30
+
+
+def test_select_monitors_no_match():
+    with (
+        mock.patch.object(monitorcontrol.__main__, "find_monitors", return_value=[]),
+        pytest.raises(SystemExit, match="no monitor matches connector:DP-9"),
+    ):
+        main(["--get-luminance", "--monitor", "connector:DP-9"])
+
+
+def test_get_json():
+    with (
+        get_monitors_mock,
+        mock.patch.object(Monitor, "get_power_mode", return_value=PowerMode.on),
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--get-power-mode", "--json"])
+        print_mock.assert_called_once_with('"on"')
+
+
+def test_get_monitors_json():
+    with (
+        mock.patch.object(
+            monitorcontrol.__main__,
+            "get_monitors",
+            return_value=batch_test_monitors(),
+        ),
+        mock.patch.object(Monitor, "get_input_source", return_value=0x0F),
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--get-monitors", "--json"])
+    monitors = json.loads(print_mock.call_args.args[0])
+    assert len(monitors) == 2
+    assert monitors[1] == {
+        "monitor": 2,
+        "model": "ACER VG271U",
+        "inputs": ["OFF", "DP1", "HDMI1", "HDMI2", 0x24],
+        "input_source": "DP1",
+    }
+
+
+def test_dump():
+    with (
+        mock.patch.object(
+            monitorcontrol.__main__,
+            "get_monitors",
+            return_value=batch_test_monitors(),
+        ),
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--dump"])
+    dumps = json.loads(print_mock.call_args.args[0])
+    assert [dump["monitor"] for dump in dumps] == [1, 2]
+    assert dumps[0]["capabilities"]["model"] == "ACER VG271U"
+    assert dumps[0]["capabilities"]["vcp"]["16"] == {}
+    # unsupported codes are left out
+    assert dumps[0]["values"] == {"16": 50, "18": 40}
+
+
+def test_batch_json(tmp_path):
+    path = tmp_path / "batch.txt"
+    path.write_text("--set-luminance 30\n--get-luminance\n--get-volume\n")
+    with (
+        mock.patch.object(
+            monitorcontrol.__main__,
+            "get_monitors",
+            return_value=batch_test_monitors(),
+        ),
+        mock.patch("builtins.print") as print_mock,
+        pytest.raises(SystemExit),
+    ):
+        main(["--batch", str(path), "--json"])
+    lines = [json.loads(c.args[0]) for c in print_mock.call_args_list]
+    assert lines[:2] == [{"ok": True, "result": None}, {"ok": True, "result": 30}]
+    assert lines[2]["ok"] is False
+    assert lines[2]["type"] == "VCPUnsupportedCodeError"
+
+
+def test_bus_lock(monkeypatch: pytest.MonkeyPatch):
+    from monitorcontrol.vcp.vcp_linux import LinuxVCP
+
+    monkeypatch.setattr(LinuxVCP, "BUS_LOCK", False)
+    with get_monitors_mock, mock.patch.object(Monitor, "get_luminance"):
+        main(["--get-luminance", "--bus-lock"])
+    assert LinuxVCP.BUS_LOCK
+
+
+def test_retries(monkeypatch: pytest.MonkeyPatch):
+    from monitorcontrol.vcp.vcp_linux import LinuxVCP
+
+    monkeypatch.setattr(LinuxVCP, "RETRY_ATTEMPTS", 3)
+    with get_monitors_mock, mock.patch.object(Monitor, "get_luminance"):
+        main(["--get-luminance", "--retries", "1"])
+    assert LinuxVCP.RETRY_ATTEMPTS == 1
+
+    with pytest.raises(SystemExit):
+        main(["--get-luminance", "--retries", "0"])
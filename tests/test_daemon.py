@@ -0,0 +1,324 @@
+from .test_monitorcontrol import UnitTestVCP
+from monitorcontrol import InputSource, Monitor, vcp_codes
+from monitorcontrol.__main__ import main
+from monitorcontrol.daemon import Daemon, DaemonClient, DaemonError, get_socket_path
+from monitorcontrol.vcp import VCPIOError
+from typing import Iterable, Tuple
+from unittest import mock
+import os
+import pytest
+import socket
+import threading
+import time
+
+
+def daemon_test_monitors():
+    return [
+        Monitor(
+            UnitTestVCP(
+                {
+                    0x10: {"current": 50, "maximum": 100},
+                    0x12: {"current": 40, "maximum": 100},
+                    0xD6: {"current": 1, "maximum": 5},
+                }
+            )
+        )
+        for _ in range(2)
+    ]
+
+
+@pytest.fixture
+def daemon(tmp_path) -> Iterable[Tuple[Daemon, str]]:
+    path = str(tmp_path / "daemon.sock")
+    daemon = Daemon(daemon_test_monitors())
+    thread = threading.Thread(target=daemon.serve, args=(path,))
+    thread.start()
+    while not os.path.exists(path):
+        time.sleep(0.001)
+    try:
+        yield daemon, path
+    finally:
+        daemon.shutdown()
+        thread.join()
+    assert not os.path.exists(path)
+
+
+def test_socket_path(monkeypatch):
+    monkeypatch.setenv("MONITORCONTROL_SOCKET", "/run/test.sock")
+    assert get_socket_path() == "/run/test.sock"
+    monkeypatch.delenv("MONITORCONTROL_SOCKET")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert get_socket_path() == "/run/user/1000/monitorcontrol.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert get_socket_path().endswith(f"monitorcontrol-{os.getuid()}.sock")
+
+
+def test_handle():
+    daemon = Daemon(daemon_test_monitors())
+    with daemon:
+        assert daemon.handle({"op": "list"}) == {
+            "ok": True,
+            "result": [{"index": 0}, {"index": 1}],
+        }
+        response = daemon.handle(
+            {"op": "call", "monitor": 1, "method": "get_power_mode"}
+        )
+        assert response == {"ok": True, "result": "on"}
+        response = daemon.handle(
+            {"op": "set", "monitor": None, "values": {"image luminance": 70}}
+        )
+        assert response == {"ok": True, "result": [None, None]}
+        response = daemon.handle({"op": "get", "monitor": 0, "codes": [0x10, 0x12]})
+        assert response == {"ok": True, "result": {"16": 70, "18": 40}}
+        # JSON object keys are strings
+        response = daemon.handle(
+            {"op": "call", "method": "set_many", "args": [{"16": 30, "18": 20}]}
+        )
+        assert response == {"ok": True, "result": None}
+        assert daemon.monitors[0].get_cached(0x12) == 20
+
+
+def test_handle_parallel_batch():
+    daemon = Daemon(daemon_test_monitors())
+    commands = []
+    for i in range(20):
+        commands.append(
+            {"op": "set", "monitor": i % 2, "values": {"image luminance": i}}
+        )
+        commands.append({"op": "get", "monitor": i % 2, "codes": [0x10]})
+    commands.append({"op": "get", "monitor": 2, "codes": [0x10]})
+    with daemon:
+        response = daemon.handle(
+            {"op": "batch", "parallel": True, "commands": commands}
+        )
+    responses = response["result"]
+    # the commands of one monitor run in order
+    assert [r["result"] for r in responses[1:40:2]] == [{"16": i} for i in range(20)]
+    assert responses[40]["type"] == "IndexError"
+
+
+def test_coalesced_writes():
+    daemon = Daemon(daemon_test_monitors())
+    monitor = daemon.monitors[0]
+    writes = []
+    set_vcp_feature = monitor.vcp.set_vcp_feature
+
+    def record(code: int, value: int):
+        writes.append((code, value))
+        set_vcp_feature(code, value)
+
+    monitor.vcp.set_vcp_feature = record
+    threads = []
+    with daemon:
+        # writes wait while the monitor is busy
+        with daemon._locks[0]:
+            for values in ({0x10: 10}, {"image luminance": 20}, {"18": 30}):
+                threads.append(threading.Thread(target=daemon.write, args=(0, values)))
+                threads[-1].start()
+                while daemon._pending[0] is None or not all(
+                    daemon._pending[0].values.get(vcp_codes.get_vcp_code(code).value)
+                    == value
+                    for code, value in values.items()
+                ):
+                    time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+        assert writes == [(0x10, 20), (0x12, 30)]
+        assert daemon._pending == [None, None]
+
+        with pytest.raises(ValueError):
+            daemon.write(0, {0x10: 101})
+        assert daemon.read(0, [0x10, 0x12], max_age=60) == {
+            0x10: {"value": 20, "age": mock.ANY, "cached": True},
+            0x12: {"value": 30, "age": mock.ANY, "cached": True},
+        }
+
+
+def test_coalesced_write_errors():
+    daemon = Daemon(daemon_test_monitors())
+    monitor = daemon.monitors[0]
+    set_vcp_feature = monitor.vcp.set_vcp_feature
+
+    def fail_contrast(code: int, value: int):
+        if code == 0x12:
+            raise VCPIOError("no acknowledge")
+        set_vcp_feature(code, value)
+
+    monitor.vcp.set_vcp_feature = fail_contrast
+    errors = {}
+
+    def write(name: str, values: dict):
+        try:
+            daemon.write(0, values)
+        except Exception as e:
+            errors[name] = e
+
+    with daemon:
+        with daemon._locks[0]:
+            leader = threading.Thread(
+                target=write, args=("leader", {0x12: 10, 0x10: 20})
+            )
+            leader.start()
+            while daemon._pending[0] is None:
+                time.sleep(0.001)
+            # invalid values are rejected before they are merged
+            with pytest.raises(ValueError):
+                daemon.write(0, {0xD6: 1, 0x10: 101})
+            follower = threading.Thread(target=write, args=("follower", {0xD6: 4}))
+            follower.start()
+            while 0xD6 not in daemon._pending[0].values:
+                time.sleep(0.001)
+        leader.join()
+        follower.join()
+    # only the writer of the failed code sees the error
+    assert list(errors) == ["leader"]
+    assert isinstance(errors["leader"], VCPIOError)
+    assert monitor.vcp.vcp[0x10]["current"] == 20
+    assert monitor.vcp.vcp[0xD6]["current"] == 4
+
+
+def test_vcp_set_invalidates_cache():
+    daemon = Daemon(daemon_test_monitors())
+    with daemon:
+        daemon.read(0, [0x10])
+        response = daemon.handle(
+            {"op": "vcp", "method": "set_vcp_feature", "args": [0x10, 70]}
+        )
+        assert response == {"ok": True, "result": None}
+        assert daemon.monitors[0].get_cached(0x10) is None
+        assert daemon.read(0, [0x10], max_age=60)[0x10]["value"] == 70
+
+
+@pytest.mark.parametrize(
+    "request_, error_type",
+    [
+        ({"op": "unknown"}, "ValueError"),
+        ({"op": "call", "method": "__exit__"}, "ValueError"),
+        ({"op": "get", "monitor": 2, "codes": [0x10]}, "IndexError"),
+        ({"op": "set", "values": {"image luminance": 101}}, "ValueError"),
+        ({}, "KeyError"),
+    ],
+)
+def test_handle_error(
+    request_: dict, error_type: str, caplog: pytest.LogCaptureFixture
+):
+    daemon = Daemon(daemon_test_monitors())
+    with daemon, caplog.at_level("DEBUG", "monitorcontrol.daemon"):
+        response = daemon.handle(request_)
+    assert response["ok"] is False
+    assert response["type"] == error_type
+    assert caplog.messages == [f"request failed: {response['error']}"]
+
+
+def test_handle_internal_error(caplog: pytest.LogCaptureFixture):
+    daemon = Daemon(daemon_test_monitors())
+    request = {"op": "call", "method": "get_luminance"}
+    with (
+        daemon,
+        mock.patch.object(Monitor, "get_luminance", side_effect=RuntimeError("bug")),
+        caplog.at_level("ERROR", "monitorcontrol.daemon"),
+    ):
+        response = daemon.handle(request)
+    assert response == {"ok": False, "error": "bug", "type": "RuntimeError"}
+    (record,) = caplog.records
+    assert record.getMessage() == "internal error in call request"
+    assert record.exc_info is not None
+
+
+def test_client(daemon):
+    _, path = daemon
+    with DaemonClient(path) as client:
+        assert client.call(0, "get_luminance") == 50
+        client.call(None, "set_luminance", 60)
+        assert client.call(None, "get_luminance") == [60, 60]
+        assert client.request(
+            {
+                "op": "batch",
+                "commands": [
+                    {"op": "call", "monitor": 0, "method": "set_contrast", "args": [1]},
+                    {"op": "get", "monitor": 0, "codes": ["image contrast"]},
+                ],
+            }
+        ) == [{"ok": True, "result": None}, {"ok": True, "result": {"18": 1}}]
+        with pytest.raises(DaemonError) as exc_info:
+            client.call(5, "get_luminance")
+        assert exc_info.value.error_type == "IndexError"
+
+
+def test_client_scene(daemon):
+    _, path = daemon
+    scene = {"name": "night", "monitors": [{"state": {"image luminance": 10}}]}
+    with DaemonClient(path) as client:
+        result = client.request({"op": "scene", "scene": scene})
+        assert result == [{"16": 10}, {"16": 10}]
+        assert client.request({"op": "scene", "scene": scene}) == [{}, {}]
+
+
+def test_serve_socket(daemon):
+    running, path = daemon
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    # a running daemon is not taken over
+    with pytest.raises(OSError, match="already running"):
+        Daemon([]).serve(path)
+    assert running._server is not None
+    with DaemonClient(path) as client:
+        assert client.request({"op": "list"}) == [{"index": 0}, {"index": 1}]
+
+
+def test_serve_stale_socket(tmp_path):
+    path = str(tmp_path / "daemon.sock")
+    # left by a daemon that exited
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(path)
+    daemon = Daemon([])
+    thread = threading.Thread(target=daemon.serve, args=(path,))
+    thread.start()
+    while daemon._server is None:
+        time.sleep(0.001)
+    with DaemonClient(path) as client:
+        assert client.request({"op": "list"}) == []
+    daemon.shutdown()
+    thread.join()
+
+    (tmp_path / "file").write_text("data")
+    with pytest.raises(OSError, match="not a socket"):
+        Daemon([]).serve(str(tmp_path / "file"))
+    assert (tmp_path / "file").read_text() == "data"
+
+
+def test_client_not_running(tmp_path):
+    with pytest.raises(OSError):
+        DaemonClient(str(tmp_path / "missing.sock"))
+
+
+def test_cli_uses_daemon(daemon):
+    _, path = daemon
+    with (
+        mock.patch("monitorcontrol.__main__.get_monitors") as get_monitors_mock,
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--get-power-mode", "--socket", path])
+        print_mock.assert_called_once_with("on")
+        main(["--set-luminance", "30", "--socket", path])
+        main(["--get-luminance", "--monitor", "2", "--socket", path])
+        print_mock.assert_called_with("30")
+        # the daemon answers with the name, printed by value
+        with mock.patch.object(
+            Monitor, "get_input_source", return_value=InputSource.DP1
+        ):
+            main(["--get-input-source", "--socket", path])
+        print_mock.assert_called_with("15")
+        get_monitors_mock.assert_not_called()
+
+
+def test_cli_batch_uses_daemon(daemon, tmp_path):
+    _, path = daemon
+    batch = tmp_path / "batch.txt"
+    batch.write_text("--set-luminance 20\n--get-luminance --monitor 2\n")
+    with (
+        mock.patch("monitorcontrol.__main__.get_monitors") as get_monitors_mock,
+        mock.patch("builtins.print") as print_mock,
+    ):
+        main(["--batch", str(batch), "--socket", path])
+        assert [c.args[0] for c in print_mock.call_args_list] == ["ok", "20"]
+        get_monitors_mock.assert_not_called()
@@ -0,0 +1,191 @@
+from monitorcontrol import Monitor
+from monitorcontrol.vcp import (
+    VCPIOError,
+    VCPReplyError,
+    VCPUnsupportedCodeError,
+    vcp_ddcci,
+    vcp_linux,
+)
+from monitorcontrol.vcp.vcp_ddcci import DDCCIVCP
+from typing import List, Optional
+from unittest import mock
+import pathlib
+import pytest
+import struct
+
+CAPS = "(prot(monitor)type(LCD)model(ACER VG271U)cmds(01 02 03 07 0C)vcp(10 12))"
+
+
+class FakeDriver:
+    """Message level ddcci driver answering the payloads sent by DDCCIVCP."""
+
+    def __init__(self, features: dict):
+        self.features = features
+        self.replies: List[bytes] = []
+        self.writes: List[bytes] = []
+
+    def attach(self, vcp: DDCCIVCP):
+        vcp.write_bytes = self.write
+        vcp.read_bytes = self.read
+
+    def write(self, data: bytes):
+        self.writes.append(bytes(data))
+        if data[0] == 0x01:
+            code = data[1]
+            if code in self.features:
+                current, maximum = self.features[code]
+                result = 0
+            else:
+                current, maximum, result = 0, 0, 1
+            self.replies.append(
+                struct.pack(">BBBBHH", 0x02, result, code, 0, maximum, current)
+            )
+        elif data[0] == 0x03:
+            code, value = struct.unpack(">BH", data[1:])
+            self.features[code][0] = value
+        elif data[0] == 0x07:
+            self.replies.append(struct.pack(">BBHH", 0x4E, 0x03, 6750, 6000))
+
+    def read(self, num_bytes: int) -> bytes:
+        return self.replies.pop(0)[:num_bytes]
+
+
+@pytest.fixture
+def sysfs(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setattr(DDCCIVCP, "SYSFS_ROOT", str(tmp_path / "sys"))
+    monkeypatch.setattr(DDCCIVCP, "DEV_ROOT", str(tmp_path / "dev"))
+    return tmp_path
+
+
+def make_device(
+    root: pathlib.Path,
+    bus_number: int,
+    brightness: Optional[int] = 50,
+    char_device: bool = True,
+    capabilities: str = CAPS,
+):
+    device = root / "sys" / "bus" / "ddcci" / "devices" / f"ddcci{bus_number}"
+    device.mkdir(parents=True)
+    (device / "capabilities").write_text(capabilities + "\n")
+    if brightness is not None:
+        backlight = root / "sys" / "class" / "backlight" / f"ddcci{bus_number}"
+        backlight.mkdir(parents=True)
+        (backlight / "brightness").write_text(f"{brightness}\n")
+        (backlight / "max_brightness").write_text("100\n")
+    if char_device:
+        display = root / "dev" / "bus" / "ddcci" / str(bus_number) / "display"
+        display.parent.mkdir(parents=True)
+        display.touch()
+
+
+def test_backlight(sysfs: pathlib.Path):
+    make_device(sysfs, 3, char_device=False)
+    vcp = DDCCIVCP(3)
+    with vcp:
+        assert vcp.get_vcp_feature(0x10) == (50, 100)
+        vcp.set_vcp_feature(0x10, 80)
+        assert vcp.get_vcp_feature(0x10) == (80, 100)
+        # other codes need the character device
+        with pytest.raises(VCPIOError):
+            vcp.get_vcp_feature(0x12)
+    brightness = sysfs / "sys" / "class" / "backlight" / "ddcci3" / "brightness"
+    assert brightness.read_text() == "80"
+
+
+def test_backlight_control(sysfs: pathlib.Path):
+    # the driver maps the brightness to the backlight control when listed
+    make_device(sysfs, 3, capabilities=CAPS.replace("vcp(10 12)", "vcp(10 13)"))
+    fake = FakeDriver({0x10: [30, 100]})
+    vcp = DDCCIVCP(3)
+    fake.attach(vcp)
+    with vcp:
+        assert vcp.backlight_code == 0x13
+        assert vcp.get_vcp_feature(0x13) == (50, 100)
+        assert vcp.get_vcp_feature(0x10) == (30, 100)
+        vcp.set_vcp_feature(0x10, 40)
+    assert [w[:2] for w in fake.writes] == [b"\x01\x10", b"\x03\x10"]
+    brightness = sysfs / "sys" / "class" / "backlight" / "ddcci3" / "brightness"
+    assert brightness.read_text() == "50\n"
+
+
+@pytest.mark.parametrize(
+    "capabilities, codes",
+    [
+        (CAPS, {0x10, 0x12}),
+        ("(vcp(02 10 14(05 06 13) 60(0F 11)))", {0x02, 0x10, 0x14, 0x60}),
+        ("(type(LCD)vcp(13)mccs_ver(2.1))", {0x13}),
+        ("(type(LCD))", set()),
+    ],
+)
+def test_vcp_codes(capabilities: str, codes: set):
+    assert vcp_ddcci._vcp_codes(capabilities) == codes
+
+
+def test_char_device(sysfs: pathlib.Path):
+    make_device(sysfs, 3)
+    fake = FakeDriver({0x12: [40, 100]})
+    vcp = DDCCIVCP(3)
+    fake.attach(vcp)
+    with Monitor(vcp) as monitor:
+        assert monitor.get_luminance() == 50
+        assert monitor.get_contrast() == 40
+        monitor.set_many({0x12: 60}, save=True)
+        assert monitor.get_contrast() == 60
+        assert monitor.get_timing_report().vertical_frequency == 60.0
+        with pytest.raises(VCPUnsupportedCodeError):
+            monitor.get(0x14)
+        assert monitor.get_vcp_capabilities()["model"] == "ACER VG271U"
+    # luminance never goes through the character device
+    commands = [w[0] for w in fake.writes]
+    assert commands == [0x01, 0x01, 0x03, 0x0C, 0x01, 0x07, 0x01]
+
+
+def test_bad_reply(sysfs: pathlib.Path):
+    make_device(sysfs, 3)
+    fake = FakeDriver({})
+    fake.write = fake.writes.append
+    vcp = DDCCIVCP(3)
+    fake.attach(vcp)
+    with vcp:
+        fake.replies.append(struct.pack(">BBBBHH", 0x02, 0, 0x13, 0, 0, 0))
+        with pytest.raises(VCPReplyError):
+            vcp.get_vcp_feature(0x12)
+        fake.replies.append(b"\x02")
+        with pytest.raises(VCPReplyError):
+            vcp.get_vcp_feature(0x12)
+
+
+def test_missing_device(sysfs: pathlib.Path):
+    make_device(sysfs, 3, brightness=None, char_device=False)
+    with pytest.raises(VCPIOError), DDCCIVCP(3):
+        pass
+
+
+def test_get_vcps(sysfs: pathlib.Path):
+    make_device(sysfs, 3)
+    devices = [mock.Mock(sys_number="3"), mock.Mock(sys_number="4")]
+    with (
+        mock.patch("pyudev.Context") as context,
+        mock.patch.object(vcp_linux.LinuxVCP, "__enter__", return_value=None),
+        mock.patch.object(vcp_linux.LinuxVCP, "__exit__", return_value=False),
+    ):
+        context.return_value.list_devices.return_value = devices
+        vcps = vcp_linux.get_vcps()
+    assert [type(vcp) for vcp in vcps] == [DDCCIVCP, vcp_linux.LinuxVCP]
+    assert [vcp.bus_number for vcp in vcps] == ["3", "4"]
+    # retries are enabled by default
+    assert vcps[1].retry_policy.attempts == vcp_linux.LinuxVCP.RETRY_ATTEMPTS
+
+
+@pytest.mark.usefixtures("sysfs")
+def test_get_vcps_retry_policy():
+    policy = vcp_linux.RetryPolicy(attempts=1)
+    devices = [mock.Mock(sys_number="4"), mock.Mock(sys_number="5")]
+    with (
+        mock.patch("pyudev.Context") as context,
+        mock.patch.object(vcp_linux.LinuxVCP, "__enter__", return_value=None),
+        mock.patch.object(vcp_linux.LinuxVCP, "__exit__", return_value=False),
+    ):
+        context.return_value.list_devices.return_value = devices
+        vcps = vcp_linux.get_vcps(policy)
+    assert [vcp.retry_policy for vcp in vcps] == [policy, policy]
@@ -0,0 +1,227 @@
+from .test_monitorcontrol import UnitTestVCP
+from monitorcontrol import Monitor, Scene, apply_scene, find_monitors, vcp
+from monitorcontrol.vcp import vcp_edid
+from monitorcontrol.vcp.vcp_ddcci import DDCCIVCP
+from monitorcontrol.vcp.vcp_linux import LinuxVCP, find_vcps
+from unittest import mock
+import pathlib
+import pytest
+import struct
+
+
+def descriptor(tag: int, text: str) -> bytes:
+    return bytes([0, 0, 0, tag, 0]) + (text.encode() + b"\n").ljust(13, b" ")
+
+
+def make_edid(
+    manufacturer: str = "ACR",
+    product_code: int = 0x0412,
+    serial_number: int = 0x01020304,
+    serial: str = "T5SAA0012345",
+    name: str = "VG271U",
+) -> bytes:
+    data = bytearray(128)
+    data[0:8] = vcp_edid.EDID_HEADER
+    packed = sum(
+        (ord(c) - 64) << s for c, s in zip(manufacturer, (10, 5, 0), strict=True)
+    )
+    data[8:10] = packed.to_bytes(2, "big")
+    struct.pack_into("<HIBBBB", data, 10, product_code, serial_number, 12, 29, 1, 4)
+    # detailed timing descriptor
+    data[54:56] = b"\x02\x3a"
+    if serial:
+        data[72:90] = descriptor(0xFF, serial)
+    if name:
+        data[90:108] = descriptor(0xFC, name)
+    data[108:126] = descriptor(0xFD, "")
+    data[127] = -sum(data[:127]) & 0xFF
+    return bytes(data)
+
+
+class EDIDTestVCP(UnitTestVCP):
+    def __init__(self, edid: bytes, connector: str = None):
+        super().__init__({0x10: {"current": 50, "maximum": 100}})
+        self.edid = edid
+        self.connector = connector
+        self.edid_reads = 0
+
+    def read_edid(self) -> bytes:
+        self.edid_reads += 1
+        return self.edid
+
+
+def test_parse_edid():
+    edid = vcp.parse_edid(make_edid() + bytes(128))
+    assert (edid.manufacturer, edid.product_code) == ("ACR", 0x0412)
+    assert (edid.serial, edid.name) == ("T5SAA0012345", "VG271U")
+    assert (edid.serial_number, edid.week, edid.year) == (0x01020304, 12, 2019)
+    assert edid.version == "1.4"
+    assert edid.key == "ACR-0412-T5SAA0012345"
+    assert edid.identity == {
+        "manufacturer": "ACR",
+        "product_code": "0412",
+        "serial": "T5SAA0012345",
+        "name": "VG271U",
+    }
+
+
+def test_parse_edid_numeric_serial():
+    edid = vcp.parse_edid(make_edid("DEL", 0xA0C8, 12345, serial="", name=""))
+    assert edid.name == ""
+    assert edid.key == "DEL-A0C8-12345"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        make_edid()[:127],
+        b"\x01" + make_edid()[1:],
+        make_edid()[:127] + b"\x00",
+    ],
+)
+def test_parse_edid_invalid(data: bytes):
+    with pytest.raises(ValueError):
+        vcp.parse_edid(data)
+
+
+@pytest.fixture
+def sysfs(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Fake sysfs with DRM connectors owning I2C buses 5 to 7, nothing is
+    connected to bus 7.
+    """
+    monkeypatch.setattr(LinuxVCP, "SYSFS_ROOT", str(tmp_path))
+    monkeypatch.setattr(DDCCIVCP, "SYSFS_ROOT", str(tmp_path))
+    connectors = [
+        ("card0-DP-1", 5, make_edid()),
+        ("card0-HDMI-A-1", 6, make_edid(serial="B", name="DELL U2720Q")),
+        ("card0-DP-2", 7, b""),
+    ]
+    for name, bus_number, edid in connectors:
+        adapter = tmp_path / "devices" / "pci0000:00" / f"i2c-{bus_number}"
+        adapter.mkdir(parents=True)
+        connector = tmp_path / "class" / "drm" / name
+        connector.mkdir(parents=True)
+        (connector / "ddc").symlink_to(adapter)
+        (connector / "edid").write_bytes(edid)
+    (tmp_path / "class" / "drm" / "card0").mkdir()
+    return tmp_path
+
+
+@pytest.mark.usefixtures("sysfs")
+def test_linux_read_edid_sysfs():
+    vcp = LinuxVCP(5)
+    assert vcp.connector == "card0-DP-1"
+    with mock.patch("os.open") as open_mock:
+        assert vcp.read_edid() == make_edid()
+    open_mock.assert_not_called()
+    assert LinuxVCP(8).connector is None
+
+
+def test_linux_read_edid_i2c(sysfs: pathlib.Path):
+    # a disconnected connector has an empty edid file
+    (sysfs / "class" / "drm" / "card0-DP-1" / "edid").write_bytes(b"")
+    with (
+        mock.patch("os.open", return_value=-1) as open_mock,
+        mock.patch("os.close"),
+        mock.patch("os.write") as write_mock,
+        mock.patch("os.read", return_value=make_edid()),
+        mock.patch("fcntl.ioctl") as ioctl_mock,
+    ):
+        assert LinuxVCP(5).read_edid() == make_edid()
+    open_mock.assert_called_once_with("/dev/i2c-5", mock.ANY)
+    ioctl_mock.assert_called_once_with(-1, 0x0703, 0x50)
+    write_mock.assert_called_once_with(-1, b"\x00")
+
+    with (
+        mock.patch("os.open", return_value=-1),
+        mock.patch("os.close"),
+        mock.patch("os.write"),
+        mock.patch("os.read", return_value=bytes(128)),
+        mock.patch("fcntl.ioctl"),
+        pytest.raises(vcp.VCPReplyError),
+    ):
+        LinuxVCP(5).read_edid()
+
+
+@pytest.mark.usefixtures("sysfs")
+@pytest.mark.parametrize(
+    "field, value, bus_numbers",
+    [
+        ("serial", "t5saa0012345", [5]),
+        ("serial", "B", [6]),
+        ("model", "dell u2720q", [6]),
+        ("manufacturer", "ACR", [5, 6]),
+        ("connector", "DP-2", [7]),
+        ("connector", "card0-hdmi-a-1", [6]),
+        ("serial", "missing", []),
+    ],
+)
+def test_find_vcps(field: str, value: str, bus_numbers: list):
+    with mock.patch("os.open") as open_mock:
+        vcps = find_vcps(field, value)
+    # no bus is opened to find the monitors
+    open_mock.assert_not_called()
+    assert [v.bus_number for v in vcps] == bus_numbers
+    assert all(isinstance(v, LinuxVCP) for v in vcps)
+
+
+def test_find_vcps_invalid(sysfs: pathlib.Path):
+    with pytest.raises(ValueError):
+        find_vcps("bus", "5")
+
+    (sysfs / "bus" / "ddcci" / "devices" / "ddcci6").mkdir(parents=True)
+    (vcp_6,) = find_vcps("serial", "B")
+    assert isinstance(vcp_6, DDCCIVCP)
+
+    # without connectors the buses have to be probed
+    with mock.patch.object(LinuxVCP, "SYSFS_ROOT", str(sysfs / "missing")):
+        assert find_vcps("serial", "B") is None
+
+
+def test_find_monitors_probe():
+    monitors = [
+        Monitor(EDIDTestVCP(make_edid(serial="A"))),
+        Monitor(EDIDTestVCP(make_edid(serial="B"))),
+    ]
+    with (
+        mock.patch.object(vcp, "find_vcps", return_value=None, create=True),
+        mock.patch("monitorcontrol.monitorcontrol.get_monitors", return_value=monitors),
+    ):
+        assert find_monitors("serial", " b ") == monitors[1:]
+        assert find_monitors("connector", "DP-1") == []
+        with pytest.raises(ValueError):
+            find_monitors("bus", "5")
+
+
+def test_monitor_get_edid():
+    test_vcp = EDIDTestVCP(make_edid())
+    monitor = Monitor(test_vcp)
+    # no context manager and no capabilities needed
+    assert monitor.get_edid().key == "ACR-0412-T5SAA0012345"
+    assert monitor.get_edid() is monitor.edid
+    assert test_vcp.edid_reads == 1
+    assert monitor.capabilities is None
+
+    with pytest.raises(vcp.VCPReplyError):
+        Monitor(EDIDTestVCP(bytes(128))).get_edid()
+    with pytest.raises(NotImplementedError):
+        Monitor(UnitTestVCP({})).get_edid()
+
+
+def test_scene_edid_match():
+    monitors = [
+        Monitor(EDIDTestVCP(make_edid(serial="A"), "card0-DP-1")),
+        Monitor(EDIDTestVCP(make_edid(serial="B"), "card0-HDMI-A-1")),
+        Monitor(UnitTestVCP({0x10: {"current": 50, "maximum": 100}})),
+    ]
+    scene = Scene(
+        "desk",
+        [
+            ({"serial": "b"}, {"image luminance": 20}),
+            ({"connector": "card0-DP-1", "name": "vg271u"}, {"image luminance": 30}),
+        ],
+    )
+    assert apply_scene(scene, monitors) == [{0x10: 30}, {0x10: 20}, {}]
+    # the capabilities are not read to match on the EDID
+    assert all(monitor.capabilities is None for monitor in monitors)
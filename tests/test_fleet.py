@@ -0,0 +1,131 @@
+from .test_edid import EDIDTestVCP, make_edid
+from .test_monitorcontrol import UnitTestVCP
+from monitorcontrol import Monitor
+from monitorcontrol.daemon import Daemon
+from monitorcontrol.fleet import Fleet
+from monitorcontrol.vcp import VCPIOError
+from typing import Iterable, List
+from unittest import mock
+import contextlib
+import pytest
+import threading
+import time
+
+
+def start_agent(serials: List[str]) -> Daemon:
+    """Starts a daemon on a free port serving emulated monitors."""
+    daemon = Daemon([Monitor(EDIDTestVCP(make_edid(serial=s))) for s in serials])
+    thread = threading.Thread(target=daemon.serve_tcp, args=("127.0.0.1", 0))
+    thread.daemon = True
+    thread.start()
+    while daemon.address is None or daemon._server is None:
+        time.sleep(0.001)
+    return daemon
+
+
+@pytest.fixture
+def agents() -> Iterable[List[Daemon]]:
+    agents = [start_agent([f"{host}-{i}" for i in range(3)]) for host in "ABC"]
+    try:
+        yield agents
+    finally:
+        # every shutdown waits for a poll of its server
+        threads = [
+            threading.Thread(target=agent.shutdown)
+            for agent in agents
+            if agent._server is not None
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+@pytest.fixture
+def fleet(agents: List[Daemon]) -> Iterable[Fleet]:
+    with Fleet([agent.address for agent in agents], ["image luminance"]) as fleet:
+        yield fleet
+
+
+def address(agent: Daemon) -> str:
+    return "{}:{}".format(*agent.address)
+
+
+def test_refresh(agents: List[Daemon], fleet: Fleet):
+    with mock.patch.object(
+        EDIDTestVCP,
+        "get_vcp_capabilities",
+        autospec=True,
+        side_effect=UnitTestVCP.get_vcp_capabilities,
+    ) as get_vcp_capabilities:
+        changed = fleet.refresh()
+    # the capabilities are downloaded once per monitor
+    assert get_vcp_capabilities.call_count == 9
+    assert len(changed) == len(fleet.inventory) == 9
+    (monitor,) = fleet.select({"serial": "b-1"})
+    assert monitor.key == f"{address(agents[1])}/1"
+    assert monitor.identity["host"] == address(agents[1])
+    assert monitor.identity["model"] == "ACER VG271U"
+    assert monitor.capabilities["model"] == "ACER VG271U"
+    assert monitor.values == {0x10: 50}
+    assert len(fleet.select({"host": address(agents[2])})) == 3
+    assert fleet.errors == {}
+
+    # known monitors only cost one round trip per host
+    agents[1].monitors[1].vcp.vcp[0x10]["current"] = 60
+    with contextlib.ExitStack() as stack:
+        pipelines = [
+            stack.enter_context(
+                mock.patch.object(connection, "pipeline", wraps=connection.pipeline)
+            )
+            for connection in fleet.connections.values()
+        ]
+        assert fleet.refresh() == [monitor]
+    assert [pipeline.call_count for pipeline in pipelines] == [1, 1, 1]
+    assert monitor.values == {0x10: 60}
+    assert all(m.edid_reads == 1 for a in agents for m in (x.vcp for x in a.monitors))
+
+
+def test_refresh_reordered(agents: List[Daemon], fleet: Fleet):
+    fleet.refresh()
+    # the daemon restarted and listed its monitors in another order
+    agents[0].monitors.reverse()
+    agents[0].monitors[0].vcp.vcp[0x10]["current"] = 10
+    changed = fleet.refresh()
+    assert sorted(m.identity["serial"] for m in changed) == ["A-0", "A-2"]
+    (monitor,) = fleet.select({"serial": "a-2"})
+    assert monitor.index == 0
+    assert monitor.values == {0x10: 10}
+    assert monitor.identity["model"] == "ACER VG271U"
+    assert fleet.select({"serial": "a-1"})[0].index == 1
+    assert len(fleet.inventory) == 9
+
+
+def test_refresh_unreachable(agents: List[Daemon], fleet: Fleet):
+    fleet.refresh()
+    agents[0].shutdown()
+    fleet.connections[address(agents[0])].close()
+    assert fleet.refresh() == []
+    assert isinstance(fleet.errors[address(agents[0])], VCPIOError)
+    # the monitors of an unreachable host are kept
+    assert len(fleet.inventory) == 9
+    assert list(fleet.errors) == [address(agents[0])]
+
+
+def test_dispatch(agents: List[Daemon], fleet: Fleet):
+    fleet.refresh()
+    results = fleet.dispatch(
+        [
+            ({"serial": "c-0"}, {"op": "set", "values": {"image luminance": 20}}),
+            ({"host": address(agents[0])}, {"op": "get", "codes": [0x10]}),
+            ({"serial": "a-2"}, {"op": "set", "values": {"image luminance": 101}}),
+            ({"serial": "missing"}, {"op": "get", "codes": [0x10]}),
+        ]
+    )
+    assert results[0] == {f"{address(agents[2])}/0": None}
+    assert agents[2].monitors[0].vcp.vcp[0x10]["current"] == 20
+    assert fleet.select({"serial": "c-0"})[0].values == {0x10: 20}
+    assert list(results[1].values()) == [{"16": 50}] * 3
+    (error,) = results[2].values()
+    assert isinstance(error, ValueError)
+    assert results[3] == {}
@@ -0,0 +1,150 @@
+from .test_daemon import daemon_test_monitors
+from monitorcontrol.__main__ import main
+from monitorcontrol.daemon import MAX_LINE, Daemon
+from typing import Any, Iterable, Optional, Tuple
+from unittest import mock
+import http.client
+import json
+import pytest
+import threading
+import time
+
+
+# shared by the tests of the module, a shutdown waits for a poll of the server
+@pytest.fixture(scope="module")
+def server() -> Iterable[Daemon]:
+    daemon = Daemon(daemon_test_monitors())
+    thread = threading.Thread(target=daemon.serve_http, args=("127.0.0.1", 0))
+    thread.start()
+    while daemon.address is None or daemon._server is None:
+        time.sleep(0.001)
+    try:
+        yield daemon
+    finally:
+        daemon.shutdown()
+        thread.join()
+
+
+@pytest.fixture
+def connection(server: Daemon) -> Iterable[http.client.HTTPConnection]:
+    connection = http.client.HTTPConnection(*server.address, timeout=10)
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def request(
+    connection: http.client.HTTPConnection,
+    method: str,
+    path: str,
+    body: Optional[Any] = None,
+) -> Tuple[int, dict]:
+    data = None if body is None else json.dumps(body)
+    connection.request(method, path, data)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_get(server: Daemon, connection: http.client.HTTPConnection):
+    assert request(connection, "GET", "/monitors") == (
+        200,
+        {"ok": True, "result": [{"index": 0}, {"index": 1}]},
+    )
+    status, response = request(connection, "GET", "/monitors/1?codes=16,image_contrast")
+    assert status == 200
+    assert response["result"] == {
+        "16": {"value": 50, "age": 0.0, "cached": False},
+        "18": {"value": 40, "age": 0.0, "cached": False},
+    }
+
+    # fresh values are answered from the cache, without reading the monitor
+    server.monitors[1].vcp.vcp[0x10]["current"] = 60
+    status, response = request(
+        connection, "GET", "/monitors/1?codes=16&codes=0xD6&max_age=60"
+    )
+    assert status == 200
+    value = response["result"]["16"]
+    assert (value["value"], value["cached"]) == (50, True)
+    assert 0 < value["age"] < 60
+    assert response["result"]["214"] == {"value": 1, "age": 0.0, "cached": False}
+    status, response = request(connection, "GET", "/monitors/1?codes=16&max_age=0")
+    assert response["result"]["16"]["value"] == 60
+
+
+def test_put(server: Daemon, connection: http.client.HTTPConnection):
+    body = {"image luminance": 80, "18": 30}
+    assert request(connection, "PUT", "/monitors/0", body) == (
+        200,
+        {"ok": True, "result": None},
+    )
+    assert server.monitors[0].vcp.vcp[0x10]["current"] == 80
+    assert server.monitors[0].vcp.vcp[0x12]["current"] == 30
+    status, response = request(connection, "GET", "/monitors/0?codes=16&max_age=60")
+    assert response["result"]["16"]["value"] == 80
+    assert response["result"]["16"]["cached"] is True
+
+
+@pytest.mark.parametrize(
+    "method, path, body, status, error_type",
+    [
+        ("GET", "/monitors/2?codes=16", None, 404, "IndexError"),
+        ("GET", "/scenes", None, 404, "IndexError"),
+        ("GET", "/monitors/0", None, 400, "ValueError"),
+        ("GET", "/monitors/0?codes=16&max_age=soon", None, 400, "ValueError"),
+        ("GET", "/monitors/0?codes=unknown", None, 400, "KeyError"),
+        ("PUT", "/monitors/0", [16, 50], 400, "TypeError"),
+        ("PUT", "/monitors/0", {"16": 101}, 400, "ValueError"),
+        ("GET", "/monitors/0?codes=20", None, 400, "VCPUnsupportedCodeError"),
+    ],
+)
+def test_errors(
+    connection: http.client.HTTPConnection,
+    method: str,
+    path: str,
+    body: Any,
+    status: int,
+    error_type: str,
+):
+    response_status, response = request(connection, method, path, body)
+    assert response_status == status
+    assert response["ok"] is False
+    assert response["type"] == error_type
+    # the connection stays open after errors
+    assert request(connection, "GET", "/monitors")[0] == 200
+
+
+def test_invalid_json(connection: http.client.HTTPConnection):
+    connection.request("PUT", "/monitors/0", b"{")
+    response = connection.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read())["ok"] is False
+
+
+@pytest.mark.parametrize(
+    "length, status",
+    [(str(MAX_LINE + 1), 413), ("1" * 40, 413), ("-1", 400), ("many", 400)],
+)
+def test_body_too_long(
+    server: Daemon, connection: http.client.HTTPConnection, length: str, status: int
+):
+    connection.putrequest("PUT", "/monitors/0")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == status
+    assert json.loads(response.read())["ok"] is False
+    # the body is never read, the daemon closes the connection
+    assert response.will_close
+    assert server.monitors[0].vcp.vcp[0x10]["current"] != 101
+
+
+def test_cli_http():
+    with mock.patch("monitorcontrol.daemon.Daemon", autospec=True) as daemon:
+        main(["--daemon", "--http", "127.0.0.1:8585"])
+    daemon.return_value.serve_http.assert_called_once_with("127.0.0.1", 8585)
+
+    with pytest.raises(SystemExit):
+        main(["--daemon", "--http", "8585"])
+    with pytest.raises(SystemExit):
+        main(["--daemon", "--http", "127.0.0.1:8585", "--listen", "127.0.0.1:8584"])
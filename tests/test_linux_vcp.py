@@ -1,5 +1,21 @@
-import pytest
+from monitorcontrol.vcp import (
+    vcp_frames,
+    RetryPolicy,
+    VCPChecksumError,
+    VCPIOError,
+    VCPTimeoutError,
+    VCPUnsupportedCodeError,
+)
 from monitorcontrol.vcp.vcp_linux import LinuxVCP
+from unittest import mock
+import array
+import fcntl
+import os
+import pathlib
+import pytest
+import struct
+import threading
+import time
 
 
 @pytest.mark.parametrize(
@@ -18,3 +34,533 @@ def test_get_checksum(data: bytearray, checksum: int):
         f"checksum=0x{checksum:02X} 0b{checksum:08b} "
         f"xor=0x{xor:02X} 0b{xor:08b}"
     )
+
+
+class FakeDDCCI:
+    """Byte level DDC/CI monitor answering the frames sent by LinuxVCP."""
+
+    def __init__(self, features: dict, caps: str = "", tables: dict = None):
+        self.features = features
+        self.caps = caps.encode("ASCII")
+        self.tables = {} if tables is None else tables
+        self.reply = b""
+        self.writes = []
+        self.saves = 0
+        # timing status, horizontal frequency, vertical frequency
+        self.timing = (0x03, 6750, 6000)
+        # number of following replies sent with a bad checksum
+        self.corrupt = 0
+        # adapter timeouts set by the VCP
+        self.adapter_timeouts = []
+
+    def attach(self, vcp: LinuxVCP):
+        vcp.fd = -1
+        vcp.GET_VCP_TIMEOUT = 0
+        vcp.CMD_RATE = 0
+        vcp.write_bytes = self.write
+        vcp.read_into = self.read_into
+        vcp._set_adapter_timeout = self.adapter_timeouts.append
+
+    def _set_reply(self, payload: bytes):
+        data = bytes([0x6E, 0x80 | len(payload)]) + payload
+        checksum = LinuxVCP.get_checksum(data)
+        if self.corrupt:
+            self.corrupt -= 1
+            checksum ^= 0xFF
+        self.reply = data + bytes([checksum])
+
+    def write(self, data: bytes):
+        data = bytes(data)
+        self.writes.append(data)
+        assert LinuxVCP.get_checksum(data[:-1]) ^ data[-1] in (0x00, 0x6E)
+        cmd = data[2]
+        if cmd == 0x01:
+            code = data[3]
+            if code in self.features:
+                current, maximum = self.features[code]
+                result = 0
+            else:
+                current, maximum, result = 0, 0, 1
+            self._set_reply(
+                struct.pack(">BBBBHH", 0x02, result, code, 0, maximum, current)
+            )
+        elif cmd == 0x03:
+            code, value = struct.unpack(">BH", data[3:6])
+            self.features[code][0] = value
+        elif cmd == 0xF3:
+            (offset,) = struct.unpack(">H", data[3:5])
+            fragment = self.caps[offset : offset + 32]
+            self._set_reply(struct.pack(">BH", 0xE3, offset) + fragment)
+        elif cmd == 0xE2:
+            code, offset = struct.unpack(">BH", data[3:6])
+            fragment = self.tables[code][offset : offset + 32]
+            self._set_reply(struct.pack(">BH", 0xE4, offset) + fragment)
+        elif cmd == 0xE7:
+            assert len(data) == (data[1] & 0x7F) + 3
+            code, offset = struct.unpack(">BH", data[3:6])
+            fragment = data[6:-1]
+            assert len(fragment) <= 32
+            table = self.tables.setdefault(code, bytearray())
+            table.extend(bytes(max(offset - len(table), 0)))
+            table[offset : offset + len(fragment)] = fragment
+        elif cmd == 0x0C:
+            self.saves += 1
+        elif cmd == 0x07:
+            self._set_reply(struct.pack(">BBHH", 0x4E, *self.timing))
+
+    def read_into(self, buffer: memoryview) -> int:
+        num_bytes = len(buffer)
+        buffer[:] = self.reply[:num_bytes]
+        self.reply = self.reply[num_bytes:]
+        return num_bytes
+
+
+def legacy_frame(data: bytearray, ddcci_checksum: bool = True) -> bytearray:
+    data = bytearray(data)
+    data.insert(0, (len(data) | LinuxVCP.PROTOCOL_FLAG))
+    data.insert(0, LinuxVCP.HOST_ADDRESS)
+    prefix = bytearray([LinuxVCP.DDCCI_ADDR << 1]) if ddcci_checksum else bytearray()
+    data.append(LinuxVCP.get_checksum(prefix + data))
+    return data
+
+
+@pytest.mark.parametrize("code", [0x00, 0x10, 0x60, 0xD6, 0xFF])
+@pytest.mark.parametrize("value", [0, 1, 100, 0x1234, 0xFFFF])
+def test_frame_templates(code: int, value: int):
+    codec = vcp_frames.FrameCodec()
+    assert codec.get_vcp_request(code) == legacy_frame(bytearray([0x01, code]))
+    expected = legacy_frame(bytearray([0x03, code, value >> 8, value & 0xFF]))
+    assert codec.set_vcp_request(code, value) == expected
+    expected = legacy_frame(bytearray([0xF3, value >> 8, value & 0xFF]), False)
+    assert codec.caps_request(value) == expected
+
+
+@pytest.mark.parametrize("offset", [0, 32, 0x1234])
+def test_table_frames(offset: int):
+    codec = vcp_frames.FrameCodec()
+    hi, lo = offset >> 8, offset & 0xFF
+    expected = legacy_frame(bytearray([0xE2, 0x73, hi, lo]))
+    assert codec.table_read_request(0x73, offset) == expected
+    for fragment in [b"", b"\x01", bytes(range(32))]:
+        expected = legacy_frame(bytearray([0xE7, 0x75, hi, lo]) + fragment)
+        assert codec.table_write_request(0x75, offset, fragment) == expected
+
+
+def test_command_frames():
+    assert vcp_frames.SAVE_SETTINGS_REQUEST == legacy_frame(bytearray([0x0C]))
+    assert vcp_frames.TIMING_REQUEST == legacy_frame(bytearray([0x07]))
+
+
+def test_get_set_vcp_feature():
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    assert vcp.get_vcp_feature(0x10) == (50, 100)
+    vcp.set_vcp_feature(0x10, 75)
+    assert vcp.get_vcp_feature(0x10) == (75, 100)
+
+
+def test_get_vcp_feature_unsupported():
+    fake = FakeDDCCI({})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    with pytest.raises(VCPIOError):
+        vcp.get_vcp_feature(0x10)
+
+
+def test_get_vcp_feature_bad_length():
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    vcp.write_bytes = lambda _: fake._set_reply(b"")
+    with pytest.raises(VCPIOError):
+        vcp.get_vcp_feature(0x10)
+
+
+def test_get_vcp_capabilities():
+    caps = "(prot(monitor)type(LCD)model(ACER VG271U)cmds(01 02 03 07 0C E3 F3))"
+    fake = FakeDDCCI({}, caps)
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    assert vcp.get_vcp_capabilities() == caps
+
+
+@pytest.mark.parametrize("length", [0, 1, 32, 100])
+def test_read_table(length: int):
+    table = bytes(range(length))
+    fake = FakeDDCCI({}, tables={0x73: table})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    assert vcp.read_table(0x73) == table
+    # one read per fragment and a final empty fragment
+    assert len(fake.writes) == -(-length // 32) + 1
+    assert vcp.read_table(0x73, offset=min(length, 10)) == table[10:]
+
+
+def test_read_table_too_long():
+    fake = FakeDDCCI({}, tables={0x73: bytes(100)})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    with pytest.raises(VCPIOError):
+        vcp.read_table(0x73, max_length=64)
+
+
+def test_read_table_retries_fragment():
+    policy = RetryPolicy(attempts=3, backoff=0)
+    fake = FakeDDCCI({}, tables={0x73: bytes(range(64))})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    vcp.CHECKSUM_ERRORS = "strict"
+    fake.attach(vcp)
+    write = fake.write
+
+    def write_corrupt_second_fragment(data: bytes):
+        write(data)
+        if data[2] == 0xE2 and data[5] == 32 and policy.retries == 0:
+            fake.corrupt = 1
+            fake._set_reply(fake.reply[2:-1])
+
+    vcp.write_bytes = write_corrupt_second_fragment
+    assert vcp.read_table(0x73) == bytes(range(64))
+    assert policy.retries == 1
+    # only the corrupted fragment is read again
+    offsets = [struct.unpack(">H", w[4:6])[0] for w in fake.writes]
+    assert offsets == [0, 32, 32, 64]
+
+
+def test_read_table_bad_offset():
+    fake = FakeDDCCI({}, tables={0x73: bytes(64)})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    write = fake.write
+
+    def write_wrong_offset(data: bytes):
+        write(data)
+        fake._set_reply(struct.pack(">BH", 0xE4, 7) + bytes(4))
+
+    vcp.write_bytes = write_wrong_offset
+    with pytest.raises(VCPIOError):
+        vcp.read_table(0x73)
+
+
+@pytest.mark.parametrize("length", [0, 1, 32, 100])
+def test_write_table(length: int):
+    table = bytes(range(length))
+    fake = FakeDDCCI({})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    # any buffer can be written
+    vcp.write_table(0x75, memoryview(bytearray(table)))
+    assert fake.tables.get(0x75, b"") == table
+    assert len(fake.writes) == -(-length // 32)
+    vcp.write_table(0x75, array.array("H", [0xFFFF]), offset=2)
+    assert fake.tables[0x75][2:4] == b"\xff\xff"
+
+
+def test_write_table_retries_fragment():
+    policy = RetryPolicy(attempts=3, backoff=0)
+    fake = FakeDDCCI({})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    fake.attach(vcp)
+    failures = [False, True]
+
+    def write_fail_once(data: bytes):
+        if failures and failures.pop():
+            raise VCPIOError("unable write to I2C bus")
+        fake.write(data)
+
+    vcp.write_bytes = write_fail_once
+    vcp.write_table(0x75, bytes(range(64)))
+    assert fake.tables[0x75] == bytes(range(64))
+    assert policy.retries == 1
+
+
+def test_write_table_too_long():
+    vcp = LinuxVCP(1)
+    with pytest.raises(ValueError):
+        vcp.write_table(0x75, bytes(32), offset=0xFFF0)
+
+
+def test_save_settings(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    vcp.CMD_RATE = 0.05
+    vcp.save_settings()
+    assert fake.saves == 1
+    # the next message waits for the monitor to store the settings
+    sleeps = []
+    monkeypatch.setattr(vcp, "_sleep", sleeps.append)
+    vcp.set_vcp_feature(0x10, 0)
+    assert sleeps and sleeps[0] > vcp.CMD_RATE
+
+
+def test_get_timing_report():
+    fake = FakeDDCCI({})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    report = vcp.get_timing_report()
+    assert report.horizontal_frequency == 67500
+    assert report.vertical_frequency == 60.0
+    assert report.horizontal_sync_positive and report.vertical_sync_positive
+    assert not report.out_of_range and not report.unstable
+
+    fake.timing = (0x80, 0, 0)
+    assert vcp.get_timing_report().out_of_range
+
+
+def test_get_timing_report_bad_reply():
+    fake = FakeDDCCI({})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    write = fake.write
+
+    def write_wrong_reply(data: bytes):
+        write(data)
+        fake._set_reply(struct.pack(">BBHH", 0x4F, 0, 0, 0))
+
+    vcp.write_bytes = write_wrong_reply
+    with pytest.raises(VCPIOError):
+        vcp.get_timing_report()
+
+
+def test_retry_checksum_error():
+    retries = []
+    policy = RetryPolicy(attempts=3, backoff=0, on_retry=lambda *a: retries.append(a))
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    vcp.CHECKSUM_ERRORS = "strict"
+    fake.attach(vcp)
+    fake.corrupt = 2
+    assert vcp.get_vcp_feature(0x10) == (50, 100)
+    assert policy.retries == 2
+    assert [attempt for attempt, _, _ in retries] == [1, 2]
+    assert all(isinstance(error, VCPChecksumError) for _, error, _ in retries)
+
+
+def test_retry_attempts_exhausted():
+    policy = RetryPolicy(attempts=2, backoff=0)
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    vcp.CHECKSUM_ERRORS = "strict"
+    fake.attach(vcp)
+    fake.corrupt = 2
+    with pytest.raises(VCPChecksumError):
+        vcp.get_vcp_feature(0x10)
+    assert policy.retries == 1
+    assert policy.failures == 1
+
+
+def test_retry_unsupported_code():
+    policy = RetryPolicy(attempts=3, backoff=0)
+    fake = FakeDDCCI({})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    fake.attach(vcp)
+    with pytest.raises(VCPUnsupportedCodeError):
+        vcp.get_vcp_feature(0x10)
+    assert len(fake.writes) == 1
+    assert policy.retries == 0
+
+
+def test_retry_timeout():
+    policy = RetryPolicy(attempts=10, backoff=1.0, jitter=0, timeout=0.5)
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    vcp.CHECKSUM_ERRORS = "strict"
+    fake.attach(vcp)
+    fake.corrupt = 1
+    with pytest.raises(VCPChecksumError):
+        vcp.get_vcp_feature(0x10)
+    assert len(fake.writes) == 1
+    # nothing was retried
+    assert policy.failures == 0
+
+
+def test_retry_timeout_after_retry():
+    policy = RetryPolicy(attempts=10, backoff=0.01, multiplier=100, timeout=0.5)
+
+    def fail():
+        raise VCPIOError("NAK")
+
+    with pytest.raises(VCPIOError):
+        policy.call(fail)
+    assert policy.retries == 1
+    assert policy.failures == 1
+
+
+def test_retry_counters_threads():
+    policy = RetryPolicy(attempts=2, backoff=0, jitter=0)
+    errors = iter(VCPIOError("NAK") for _ in range(8000))
+
+    def fail():
+        raise next(errors)
+
+    def run():
+        for _ in range(1000):
+            with pytest.raises(VCPIOError):
+                policy.call(fail)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert policy.retries == 4000
+    assert policy.failures == 4000
+
+
+def test_retry_delay():
+    policy = RetryPolicy(backoff=0.1, multiplier=2, max_backoff=0.3, jitter=0)
+    assert policy.get_delay(1) == pytest.approx(0.1)
+    assert policy.get_delay(2) == pytest.approx(0.2)
+    assert policy.get_delay(3) == pytest.approx(0.3)
+    assert policy.get_delay(1, min_delay=0.5) == pytest.approx(0.5)
+
+
+def test_deadline_exceeded():
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    vcp.GET_VCP_TIMEOUT = 0.04
+    with vcp.timeout(0.01), pytest.raises(VCPTimeoutError):
+        vcp.get_vcp_feature(0x10)
+    assert vcp.deadline is None
+    assert vcp.get_vcp_feature(0x10) == (50, 100)
+
+
+def test_deadline_adapter_timeout():
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    assert vcp.get_vcp_feature(0x10) == (50, 100)
+    assert fake.adapter_timeouts == []
+    # the kernel gives up on a hung read by the deadline
+    with vcp.timeout(0.5):
+        vcp.get_vcp_feature(0x10)
+    limit, restored = fake.adapter_timeouts
+    assert 0 < limit <= 0.5
+    assert restored == LinuxVCP.ADAPTER_TIMEOUT
+
+
+def test_set_adapter_timeout():
+    vcp = LinuxVCP(1)
+    vcp.fd = 3
+    with mock.patch("fcntl.ioctl") as ioctl_mock:
+        vcp._set_adapter_timeout(0.123)
+    ioctl_mock.assert_called_once_with(3, LinuxVCP.I2C_TIMEOUT, 13)
+
+
+def test_deadline_stops_retries():
+    policy = RetryPolicy(attempts=10, backoff=0.5, jitter=0)
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = LinuxVCP(1, retry_policy=policy)
+    vcp.CHECKSUM_ERRORS = "strict"
+    fake.attach(vcp)
+    fake.corrupt = 1
+    with vcp.timeout(0.1), pytest.raises(VCPChecksumError):
+        vcp.get_vcp_feature(0x10)
+    assert policy.retries == 0
+    assert policy.failures == 0
+
+
+@pytest.fixture
+def bus_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Regular file standing in for the bus device, it can be flocked."""
+    path = tmp_path / "i2c-1"
+    path.write_bytes(b"")
+    return path
+
+
+def locked_vcp(fake: FakeDDCCI, bus_file: pathlib.Path) -> LinuxVCP:
+    vcp = LinuxVCP(1)
+    fake.attach(vcp)
+    vcp.fp = str(bus_file)
+    vcp.BUS_LOCK = True
+    vcp.LOCK_DIR = str(bus_file.parent)
+    return vcp
+
+
+def test_bus_lock(bus_file: pathlib.Path):
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = locked_vcp(fake, bus_file)
+    other = os.open(bus_file, os.O_RDWR)
+
+    def write(data: bytes):
+        # other processes cannot take the lock during a transaction
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        FakeDDCCI.write(fake, data)
+
+    vcp.write_bytes = write
+    try:
+        with mock.patch("fcntl.ioctl"), vcp:
+            assert vcp.get_vcp_feature(0x10) == (50, 100)
+
+            # wait for a lock held by another process up to the deadline
+            fcntl.flock(other, fcntl.LOCK_EX)
+            with vcp.timeout(0.05), pytest.raises(VCPTimeoutError):
+                vcp.get_vcp_feature(0x10)
+            fcntl.flock(other, fcntl.LOCK_UN)
+            vcp.set_vcp_feature(0x10, 70)
+            assert vcp.get_vcp_feature(0x10) == (70, 100)
+    finally:
+        os.close(other)
+
+
+def test_bus_lock_shared_pacing(bus_file: pathlib.Path):
+    fake = FakeDDCCI({0x10: [50, 100]})
+    first = locked_vcp(fake, bus_file)
+    second = locked_vcp(fake, bus_file)
+    with mock.patch("fcntl.ioctl"), first, second:
+        first.set_vcp_feature(0x10, 70)
+        assert (bus_file.parent / "monitorcontrol-i2c-1").stat().st_size == 8
+
+        # the second process waits out the set of the first
+        second.CMD_RATE = 10
+        sleeps = []
+        with mock.patch.object(second, "_sleep", sleeps.append):
+            second.get_vcp_feature(0x10)
+        assert sleeps and 9 < sleeps[0] <= 10
+    assert first._pacing_fd is None
+
+
+def test_bus_lock_pacing_clamped(bus_file: pathlib.Path):
+    fake = FakeDDCCI({0x10: [50, 100]})
+    vcp = locked_vcp(fake, bus_file)
+    # another process of the user stored a time far in the future
+    pacing = bus_file.parent / "monitorcontrol-i2c-1"
+    pacing.write_bytes(LinuxVCP.PACING_STRUCT.pack(time.time() + 3600))
+    sleeps = []
+    with (
+        mock.patch("fcntl.ioctl"),
+        mock.patch.object(vcp, "_sleep", sleeps.append),
+        vcp,
+    ):
+        vcp.get_vcp_feature(0x10)
+    # at most the delay of a set after a save
+    delay = LinuxVCP.CMD_RATE + LinuxVCP.SAVE_SETTINGS_DELAY
+    assert sleeps and max(sleeps) <= delay
+
+
+def test_bus_lock_pacing_file(
+    bus_file: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.delenv("MONITORCONTROL_LOCK_DIR", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    vcp = LinuxVCP(1)
+    fd = vcp._open_pacing()
+    os.close(fd)
+    pacing = tmp_path / "monitorcontrol-i2c-1"
+    assert pacing.stat().st_mode & 0o777 == 0o600
+
+    # planted symlinks and other files are not written
+    pacing.unlink()
+    pacing.symlink_to(bus_file)
+    assert vcp._open_pacing() is None
+    pacing.unlink()
+    pacing.mkdir()
+    assert vcp._open_pacing() is None
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    with mock.patch("tempfile.gettempdir", return_value=str(tmp_path)):
+        os.close(vcp._open_pacing())
+    assert (tmp_path / f"monitorcontrol-{os.getuid()}-i2c-1").exists()
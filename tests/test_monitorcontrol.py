@@ -9,7 +9,10 @@ from monitorcontrol.monitorcontrol import (
 )
 from types import TracebackType
 from typing import Iterable, List, Optional, Tuple, Type, Union
+import json
 import pytest
+import threading
+import time
 from unittest import mock
 
 
@@ -25,6 +28,8 @@ class UnitTestVCP(vcp.VCP):
         self.vcp[code]["current"] = value
 
     def get_vcp_feature(self, code: int) -> Tuple[int, int]:
+        if code not in self.vcp:
+            raise vcp.VCPUnsupportedCodeError(f"unsupported code: {code}")
         return self.vcp[code]["current"], self.vcp[code]["maximum"]
 
     def get_vcp_capabilities(self):
@@ -97,6 +102,23 @@ def monitor(request) -> Iterable[Monitor]:
         yield monitor
 
 
+def test_timeout(monitor: Monitor):
+    with monitor.timeout(10):
+        outer = monitor.vcp.deadline
+        with monitor.timeout(20):
+            assert monitor.vcp.deadline == outer
+        with monitor.timeout(1):
+            assert monitor.vcp.deadline < outer
+        assert monitor.vcp.deadline == outer
+        monitor.get_luminance()
+    assert monitor.vcp.deadline is None
+
+
+def test_timeout_exceeded(monitor: Monitor):
+    with monitor.timeout(0), pytest.raises(vcp.VCPTimeoutError):
+        monitor.vcp.time_remaining()
+
+
 def test_get_code_maximum_type_error(monitor: Monitor):
     code = vcp_codes.image_factory_default
     with pytest.raises(TypeError):
@@ -299,6 +321,307 @@ def test_get_vcp_capabilities(monitor: Monitor):
     ]
 
 
+def test_get_set_generic(monitor: Monitor):
+    monitor.set("image luminance", 42)
+    assert monitor.get(0x10) == 42
+    assert monitor.get(vcp_codes.image_luminance) == 42
+    assert monitor.get("image_luminance") == 42
+
+
+def test_get_many(monitor: Monitor):
+    values = monitor.get_many(["image luminance", 0x12, vcp_codes.sound_volume])
+    assert values == {
+        0x10: monitor.get_luminance(),
+        0x12: monitor.get_contrast(),
+        0x62: monitor.get_volume(),
+    }
+
+
+def test_get_many_type_error(monitor: Monitor):
+    with pytest.raises(TypeError):
+        monitor.get_many([0x10, vcp_codes.image_factory_default])
+
+
+def test_get_unknown_code(monitor: Monitor):
+    with pytest.raises(KeyError):
+        monitor.get("not a code")
+
+
+def test_get_unsupported_code():
+    monitor = Monitor(get_test_vcps()[0])
+    with monitor:
+        monitor.get_vcp_capabilities()
+        assert monitor.get(0x10) == monitor.get_luminance()
+        with pytest.raises(vcp.VCPUnsupportedCodeError):
+            monitor.get(vcp_codes.display_audio_mute_mode)
+        with pytest.raises(vcp.VCPUnsupportedCodeError):
+            monitor.set(vcp_codes.display_audio_mute_mode, 1)
+
+
+def test_get_many_ignore_unsupported():
+    monitor = Monitor(get_test_vcps()[0])
+    codes = [0x10, vcp_codes.image_sharpness]
+    with monitor:
+        # unsupported according to the monitor
+        assert monitor.get_many(codes, ignore_unsupported=True) == {
+            0x10: monitor.get_luminance()
+        }
+        # unsupported according to the capabilities
+        monitor.get_vcp_capabilities()
+        assert monitor.get_many(codes, ignore_unsupported=True) == {
+            0x10: monitor.get_luminance()
+        }
+        with pytest.raises(vcp.VCPUnsupportedCodeError):
+            monitor.get_many(codes)
+
+
+class TableTestVCP(UnitTestVCP):
+    def __init__(self):
+        super().__init__({})
+        self.tables = {0x73: b"\x01\x02"}
+
+    def read_table(self, code: int) -> bytes:
+        return self.tables[code]
+
+    def write_table(self, code: int, data, offset: int = 0):
+        assert offset == 0
+        self.tables[code] = bytes(data)
+
+
+def test_tables():
+    monitor = Monitor(TableTestVCP())
+    with monitor:
+        assert monitor.read_table("lut size") == b"\x01\x02"
+        monitor.write_table(vcp_codes.block_lut_operation, bytearray(b"\x03"))
+        assert monitor.vcp.tables[0x75] == b"\x03"
+        with pytest.raises(TypeError):
+            monitor.read_table(vcp_codes.image_luminance)
+        with pytest.raises(TypeError):
+            monitor.write_table("lut size", b"")
+        with pytest.raises(TypeError):
+            monitor.read_table("remote procedure call")
+
+
+def test_tables_not_implemented():
+    with Monitor(UnitTestVCP({})) as monitor, pytest.raises(NotImplementedError):
+        monitor.read_table("lut size")
+
+
+class SaveTestVCP(UnitTestVCP):
+    def __init__(self, vcp_dict: dict):
+        super().__init__(vcp_dict)
+        self.calls = []
+
+    def set_vcp_feature(self, code: int, value: int):
+        self.calls.append(("set", code, value))
+        super().set_vcp_feature(code, value)
+
+    def save_settings(self):
+        self.calls.append(("save",))
+
+    def get_timing_report(self) -> vcp.TimingReport:
+        return vcp.TimingReport(0x03, 67500, 60.0)
+
+
+def test_set_many_save():
+    test_vcp = SaveTestVCP(
+        {
+            0x10: {"current": 50, "maximum": 100},
+            0x12: {"current": 50, "maximum": 100},
+        }
+    )
+    with Monitor(test_vcp) as monitor:
+        monitor.set_many({"image luminance": 10, 0x12: 20}, save=True)
+        # saved once after every write
+        assert test_vcp.calls == [("set", 0x10, 10), ("set", 0x12, 20), ("save",)]
+        assert monitor.get_cached(0x12) == 20
+
+        test_vcp.calls.clear()
+        monitor.set_many({0x10: 30})
+        assert test_vcp.calls == [("set", 0x10, 30)]
+
+
+@pytest.mark.parametrize(
+    "values, error",
+    [
+        ({0x10: 10, 0x12: 101}, ValueError),
+        ({0x10: 10, "active control": 1}, TypeError),
+        ({0x10: 10, "not a code": 1}, KeyError),
+    ],
+)
+def test_set_many_validates_first(values: dict, error: type):
+    test_vcp = SaveTestVCP(
+        {
+            0x10: {"current": 50, "maximum": 100},
+            0x12: {"current": 50, "maximum": 100},
+        }
+    )
+    with Monitor(test_vcp) as monitor, pytest.raises(error):
+        monitor.set_many(values, save=True)
+    assert test_vcp.calls == []
+
+
+def test_set_many_non_continuous():
+    # the maximum of a non-continuous code is not an upper limit
+    test_vcp = SaveTestVCP({0x60: {"current": 0x0F, "maximum": 3}})
+    with Monitor(test_vcp) as monitor:
+        with mock.patch.object(
+            Monitor, "validate", autospec=True, side_effect=Monitor.validate
+        ) as validate_mock:
+            monitor.set_many({"input select": 0x11})
+        validate_mock.assert_called_once_with(monitor, "input select", 0x11)
+    assert test_vcp.calls == [("set", 0x60, 0x11)]
+
+
+def test_timing_report():
+    with Monitor(SaveTestVCP({})) as monitor:
+        assert monitor.get_timing_report().vertical_frequency == 60.0
+    with Monitor(UnitTestVCP({})) as monitor:
+        with pytest.raises(NotImplementedError):
+            monitor.get_timing_report()
+        with pytest.raises(NotImplementedError):
+            monitor.save_settings()
+
+
+def snapshot_test_vcp() -> UnitTestVCP:
+    return UnitTestVCP(
+        {
+            0x10: {"current": 50, "maximum": 100},
+            0x12: {"current": 60, "maximum": 100},
+            0x14: {"current": 0x05, "maximum": 0x0B},
+            0x60: {"current": 0x1111, "maximum": 0x12},
+            0x62: {"current": 30, "maximum": 100},
+            0xD6: {"current": 0x01, "maximum": 0x05},
+            0xE0: {"current": 1, "maximum": 2},
+        }
+    )
+
+
+class CountingVCP(UnitTestVCP):
+    def __init__(self, vcp_dict: dict):
+        super().__init__(vcp_dict)
+        self.opens = 0
+        self.closes = 0
+
+    def __enter__(self):
+        self.opens += 1
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        self.closes += 1
+        return False
+
+
+def test_context_reference_count():
+    counting_vcp = CountingVCP({0x10: {"current": 50, "maximum": 100}})
+    monitor = Monitor(counting_vcp)
+    entered = threading.Barrier(4)
+
+    def worker():
+        with monitor:
+            entered.wait()
+            assert monitor.get_luminance() == 50
+            with monitor:
+                assert monitor.get_luminance() == 50
+            entered.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # opened by the first thread and closed by the last
+    assert (counting_vcp.opens, counting_vcp.closes) == (1, 1)
+    with pytest.raises(AssertionError):
+        monitor.get_luminance()
+
+
+def test_thread_limits():
+    test_vcp = UnitTestVCP({})
+    limits = []
+
+    def worker():
+        limits.append((test_vcp.deadline, test_vcp.priority))
+
+    with test_vcp.timeout(1.0), test_vcp.prioritize(vcp.Priority.INTERACTIVE):
+        assert test_vcp.deadline is not None
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    # the limits of one thread do not apply to others
+    assert limits == [(None, vcp.Priority.NORMAL)]
+    assert test_vcp.deadline is None
+
+
+def test_snapshot():
+    monitor = Monitor(snapshot_test_vcp())
+    with monitor:
+        snapshot = monitor.snapshot()
+    assert snapshot == {
+        0x10: 50,
+        0x12: 60,
+        0x14: 0x05,
+        0x60: 0x11,
+        0x62: 30,
+        0xD6: 0x01,
+    }
+
+
+def test_snapshot_codes():
+    monitor = Monitor(snapshot_test_vcp())
+    with monitor:
+        assert monitor.snapshot(["image luminance", 0x60]) == {0x10: 50, 0x60: 0x11}
+
+
+def test_restore():
+    test_vcp = snapshot_test_vcp()
+    monitor = Monitor(test_vcp)
+    with monitor:
+        snapshot = json.loads(json.dumps(monitor.snapshot()))
+        monitor.set_luminance(10)
+        monitor.set_color_preset(0x08)
+        with mock.patch.object(
+            test_vcp, "set_vcp_feature", wraps=test_vcp.set_vcp_feature
+        ) as set_mock:
+            written = monitor.restore(snapshot)
+        assert written == {0x14: 0x05, 0x10: 50}
+        assert set_mock.call_args_list == [mock.call(0x14, 0x05), mock.call(0x10, 50)]
+        assert monitor.restore(snapshot) == {}
+
+
+@pytest.mark.parametrize(
+    "power, expected",
+    [(0x01, [0xD6, 0x60, 0x14, 0x10]), (0x04, [0x60, 0x14, 0x10, 0xD6])],
+)
+def test_restore_order(power: int, expected: List[int]):
+    test_vcp = snapshot_test_vcp()
+    monitor = Monitor(test_vcp)
+    with monitor:
+        test_vcp.vcp[0xD6]["current"] = 0x02
+        written = monitor.restore({0x10: 0, 0x14: 0x04, 0xD6: power, 0x60: 0x0F})
+    assert list(written) == expected
+
+
+def test_get_cached():
+    monitor = Monitor(snapshot_test_vcp())
+    assert monitor.get_cached(0x10) is None
+    with monitor:
+        monitor.get_luminance()
+        monitor.set_contrast(20)
+    assert monitor.get_cached("image luminance") == 50
+    assert monitor.get_cached(0x12, max_age=60) == 20
+    with mock.patch("time.monotonic", return_value=time.monotonic() + 120):
+        assert monitor.get_cached(0x12, max_age=60) is None
+        value, age = monitor.get_cached_with_age(0x12)
+        assert value == 20 and 120 <= age < 180
+    assert monitor.get_cached_with_age(0x14) is None
+
+
 def test_convert_to_dict():
     # https://github.com/newAM/monitorcontrol/issues/110
     caps_str = (
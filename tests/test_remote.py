@@ -0,0 +1,182 @@
+from .test_daemon import daemon_test_monitors
+from monitorcontrol import RemoteConnection, get_remote_monitors
+from monitorcontrol.__main__ import main
+from monitorcontrol.daemon import MAX_LINE, Daemon
+from monitorcontrol.remote import RemoteVCP
+from monitorcontrol.vcp import VCPIOError, VCPTimeoutError, VCPUnsupportedCodeError
+from typing import Iterable
+from unittest import mock
+import pytest
+import socket
+import threading
+import time
+
+
+@pytest.fixture
+def server() -> Iterable[Daemon]:
+    daemon = Daemon(daemon_test_monitors())
+    thread = threading.Thread(target=daemon.serve_tcp, args=("127.0.0.1", 0))
+    thread.start()
+    while daemon.address is None or daemon._server is None:
+        time.sleep(0.001)
+    try:
+        yield daemon
+    finally:
+        daemon.shutdown()
+        thread.join()
+
+
+@pytest.fixture
+def connection(server: Daemon) -> Iterable[RemoteConnection]:
+    with RemoteConnection(*server.address) as connection:
+        yield connection
+
+
+def test_remote_monitors(server: Daemon, connection: RemoteConnection):
+    monitors = get_remote_monitors(connection)
+    assert len(monitors) == 2
+    with monitors[1] as monitor:
+        assert monitor.get_luminance() == 50
+        monitor.set_many({"image luminance": 70, 0x12: 10}, save=False)
+        assert monitor.get_many([0x10, 0x12, 0x14], ignore_unsupported=True) == {
+            0x10: 70,
+            0x12: 10,
+        }
+        with pytest.raises(VCPUnsupportedCodeError):
+            monitor.get(0x14)
+        with pytest.raises(ValueError):
+            monitor.set_luminance(101)
+        assert monitor.get_vcp_capabilities()["model"] == "ACER VG271U"
+    assert server.monitors[1].vcp.vcp[0x12]["current"] == 10
+    assert server.monitors[0].vcp.vcp[0x12]["current"] == 40
+
+
+def test_get_many_one_round_trip(connection: RemoteConnection):
+    (monitor,) = get_remote_monitors(connection)[:1]
+    with (
+        mock.patch.object(
+            connection, "pipeline", wraps=connection.pipeline
+        ) as pipeline,
+        monitor,
+    ):
+        monitor.get_many([0x10, 0x12, 0xD6])
+    assert pipeline.call_count == 1
+
+
+def test_pipeline(connection: RemoteConnection):
+    requests = [
+        {"op": "vcp", "monitor": i % 2, "method": "set_vcp_feature", "args": [0x10, i]}
+        for i in range(100)
+    ]
+    requests.append({"op": "call", "monitor": None, "method": "get_luminance"})
+    requests.append({"op": "vcp", "monitor": 0, "method": "read_table"})
+    results = connection.pipeline(requests)
+    assert results[:100] == [None] * 100
+    assert results[100] == [98, 99]
+    assert isinstance(results[101], ValueError)
+
+
+def test_reconnect(connection: RemoteConnection):
+    assert connection.request({"op": "list"}) == [{"index": 0}, {"index": 1}]
+    # the connection is dropped, for example by a restart of the daemon
+    ((sock, _),) = connection._idle
+    sock.shutdown(socket.SHUT_RDWR)
+    with pytest.raises(VCPIOError):
+        connection.request({"op": "list"})
+    assert len(connection.request({"op": "list"})) == 2
+
+
+def test_concurrent_requests(server: Daemon, connection: RemoteConnection):
+    entered = threading.Barrier(2, timeout=5)
+
+    def get_vcp_feature(code: int):
+        # both requests are in the daemon at the same time
+        entered.wait()
+        return code, 100
+
+    for monitor in server.monitors:
+        monitor.vcp.get_vcp_feature = get_vcp_feature
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda i=i: results.append(
+                connection.request(
+                    {
+                        "op": "vcp",
+                        "monitor": i,
+                        "method": "get_vcp_feature",
+                        "args": [16],
+                    }
+                )
+            )
+        )
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [[16, 100], [16, 100]]
+    # the sockets are kept for reuse
+    assert len(connection._idle) == 2
+    connection.close()
+    assert connection._idle == []
+
+
+def test_line_too_long(server: Daemon):
+    with socket.create_connection(server.address, timeout=5) as sock:
+        try:
+            sock.sendall(b" " * (MAX_LINE + (1 << 17)))
+            # closed by the daemon without a response
+            assert sock.recv(65536) == b""
+        except ConnectionError:
+            pass
+    # other connections are still served
+    with RemoteConnection(*server.address) as connection:
+        assert len(connection.request({"op": "list"})) == 2
+
+
+def test_deadline(server: Daemon, connection: RemoteConnection):
+    vcp = RemoteVCP(connection, 0)
+    assert vcp.get_vcp_feature(0x10) == (50, 100)
+    # a slow monitor answers past the deadline of the caller
+    get_vcp_feature = server.monitors[0].vcp.get_vcp_feature
+
+    def slow(code: int):
+        time.sleep(0.5)
+        return get_vcp_feature(code)
+
+    start = time.monotonic()
+    with (
+        mock.patch.object(server.monitors[0].vcp, "get_vcp_feature", slow),
+        vcp.timeout(0.1),
+        pytest.raises(VCPTimeoutError),
+    ):
+        vcp.get_vcp_feature(0x10)
+    assert time.monotonic() - start < 0.4
+    # the late response is not read by the next request
+    assert vcp.get_vcp_feature(0x12) == (40, 100)
+    (sock, _), *_ = connection._idle
+    assert sock.gettimeout() == connection.timeout
+
+
+def test_connection_refused():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(VCPIOError), RemoteConnection("127.0.0.1", port) as connection:
+        get_remote_monitors(connection)
+
+
+@pytest.mark.parametrize(
+    "listen, address", [("0.0.0.0:8584", ("0.0.0.0", 8584)), ("[::1]:1", ("::1", 1))]
+)
+def test_cli_listen(listen: str, address: tuple):
+    with mock.patch("monitorcontrol.daemon.Daemon", autospec=True) as daemon:
+        main(["--daemon", "--listen", listen])
+    daemon.return_value.serve_tcp.assert_called_once_with(*address)
+
+
+def test_cli_listen_invalid():
+    with pytest.raises(SystemExit):
+        main(["--daemon", "--listen", "8584"])
@@ -0,0 +1,105 @@
+from .test_monitorcontrol import UnitTestVCP
+from monitorcontrol import Monitor, Scene, apply_scene, vcp
+from unittest import mock
+import json
+import pytest
+
+
+def scene_test_monitor() -> Monitor:
+    return Monitor(
+        UnitTestVCP(
+            {
+                0x10: {"current": 80, "maximum": 100},
+                0x12: {"current": 50, "maximum": 100},
+                0x60: {"current": 0x0F, "maximum": 0x12},
+                0xD6: {"current": 0x01, "maximum": 0x05},
+            }
+        )
+    )
+
+
+NIGHT = Scene(
+    "night",
+    [
+        ({}, {"image luminance": 20, "image contrast": 50}),
+        ({"model": "acer vg271u"}, {"image luminance": 10, 0x60: 0x11}),
+        ({"model": "OTHER"}, {"image contrast": 0}),
+    ],
+)
+
+
+def test_state_for():
+    assert NIGHT.state_for({}) == {0x10: 20, 0x12: 50}
+    assert NIGHT.state_for({"model": "ACER VG271U"}) == {
+        0x10: 10,
+        0x12: 50,
+        0x60: 0x11,
+    }
+
+
+def test_state_for_code_forms():
+    # later rules win whichever form of the code they use
+    scene = Scene(
+        "mixed",
+        [
+            ({}, {16: 20, "image contrast": 50}),
+            ({"model": "ACER VG271U"}, {"image luminance": 30, "0x12": 40}),
+            ({"serial": "A"}, {0x10: 40, "18": 60}),
+        ],
+    )
+    assert scene.state_for({"model": "ACER VG271U"}) == {0x10: 30, 0x12: 40}
+    assert scene.state_for({"model": "ACER VG271U", "serial": "A"}) == {
+        0x10: 40,
+        0x12: 60,
+    }
+    # the test monitor is an ACER VG271U
+    monitor = scene_test_monitor()
+    with monitor:
+        written = scene.apply(monitor, dry_run=True)
+    assert written == {0x10: 30, 0x12: 40}
+
+
+def test_dict_round_trip():
+    data = json.loads(json.dumps(NIGHT.to_dict()))
+    scene = Scene.from_dict(data)
+    assert scene.name == "night"
+    assert scene.state_for({"model": "OTHER"}) == {0x10: 20, 0x12: 0}
+
+
+def test_apply_scene():
+    monitors = [scene_test_monitor(), scene_test_monitor()]
+    assert apply_scene(NIGHT, monitors) == [{0x60: 0x11, 0x10: 10}] * 2
+    assert apply_scene(NIGHT, monitors) == [{}, {}]
+    assert apply_scene(Scene("empty", []), monitors) == [{}, {}]
+    assert apply_scene(NIGHT, []) == []
+
+
+def test_apply_scene_dry_run():
+    monitor = scene_test_monitor()
+    assert apply_scene(NIGHT, [monitor], dry_run=True) == [{0x60: 0x11, 0x10: 10}]
+    with monitor:
+        assert monitor.get_luminance() == 80
+
+
+def test_apply_scene_cached():
+    monitor = scene_test_monitor()
+    scene = Scene("day", [({}, {"image luminance": 90})])
+    apply_scene(scene, [monitor])
+    with mock.patch.object(monitor.vcp, "get_vcp_feature") as get_mock:
+        assert apply_scene(scene, [monitor], max_age=60) == [{}]
+        get_mock.assert_not_called()
+
+
+def test_apply_scene_error():
+    failing = scene_test_monitor()
+    working = scene_test_monitor()
+    scene = Scene("day", [({}, {"image luminance": 90})])
+    with (
+        mock.patch.object(
+            failing.vcp, "get_vcp_feature", side_effect=vcp.VCPIOError("nak")
+        ),
+        pytest.raises(vcp.VCPIOError),
+    ):
+        apply_scene(scene, [failing, working])
+    with working:
+        assert working.get_luminance() == 90
@@ -1,6 +1,7 @@
 import pytest
 from monitorcontrol.vcp import vcp_codes
-from monitorcontrol.vcp.vcp_codes import VCPCode
+from monitorcontrol.vcp.vcp_codes import CodeFunction, CodeType, VCPCode
+import pickle
 
 
 VCP_CODES = [
@@ -15,12 +16,12 @@ VCP_CODES = [
 ]
 
 
-@pytest.mark.parametrize("vcp_code", VCP_CODES)
+@pytest.mark.parametrize("vcp_code", VCP_CODES + list(vcp_codes.CODES.values()))
 def test_type(vcp_code: VCPCode):
     assert vcp_code.type in ("rw", "ro", "wo")
 
 
-@pytest.mark.parametrize("vcp_code", VCP_CODES)
+@pytest.mark.parametrize("vcp_code", VCP_CODES + list(vcp_codes.CODES.values()))
 def test_function(vcp_code: VCPCode):
     assert vcp_code.function in ("c", "nc", "t")
 
@@ -35,12 +36,49 @@ def test_str(vcp_code: VCPCode):
     repr(vcp_code)
 
 
+def test_registry():
+    assert len(vcp_codes.CODES) == len({code.name for code in vcp_codes.CODES.values()})
+    for value, code in vcp_codes.CODES.items():
+        assert code.value == value
+        assert vcp_codes.get_vcp_code(value) is code
+        assert vcp_codes.get_vcp_code(code.name) is code
+        assert vcp_codes.get_vcp_code(code) is code
+    for code in VCP_CODES:
+        assert vcp_codes.CODES[code.value] is code
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("image_luminance", vcp_codes.image_luminance),
+        ("Image Luminance", vcp_codes.image_luminance),
+        ("0x87", vcp_codes.image_sharpness),
+        (0xCC, vcp_codes.display_osd_language),
+    ],
+)
+def test_get_vcp_code(code, expected: VCPCode):
+    assert vcp_codes.get_vcp_code(code) is expected
+
+
+@pytest.mark.parametrize(
+    "code, error",
+    [("not a code", KeyError), (0x100, KeyError), (-1, KeyError), (0x00, KeyError)],
+)
+def test_get_vcp_code_error(code, error):
+    with pytest.raises(error):
+        vcp_codes.get_vcp_code(code)
+
+
+def test_get_vcp_code_type_error():
+    with pytest.raises(TypeError):
+        vcp_codes.get_vcp_code(1.0)
+
+
 @pytest.mark.parametrize(
     "test_type, readable", [("ro", True), ("wo", False), ("rw", True)]
 )
 def test_readable(test_type: str, readable: bool):
-    code = vcp_codes.image_luminance
-    code.type = test_type
+    code = VCPCode("test", 0x10, test_type, "c")
     assert code.readable == readable
 
 
@@ -48,6 +86,38 @@ def test_readable(test_type: str, readable: bool):
     "test_type, writeable", [("ro", False), ("wo", True), ("rw", True)]
 )
 def test_writeable(test_type: str, writeable: bool):
-    code = vcp_codes.image_luminance
-    code.type = test_type
+    code = VCPCode("test", 0x10, test_type, "c")
     assert code.writeable == writeable
+
+
+@pytest.mark.parametrize(
+    "function, continuous", [("c", True), ("nc", False), ("t", False)]
+)
+def test_continuous(function: str, continuous: bool):
+    code = VCPCode("test", 0x10, "rw", function)
+    assert code.continuous == continuous
+
+
+def test_immutable():
+    code = vcp_codes.image_luminance
+    with pytest.raises(AttributeError):
+        code.type = "ro"
+    with pytest.raises(AttributeError):
+        del code.value
+    with pytest.raises(AttributeError):
+        code.extra = None
+    assert code.type == "rw"
+    assert code.type is CodeType.rw
+    assert code.function is CodeFunction.c
+
+
+def test_pickle():
+    code = pickle.loads(pickle.dumps(vcp_codes.image_luminance))
+    assert code.name == vcp_codes.image_luminance.name
+    assert code.value == vcp_codes.image_luminance.value
+    assert code.type is vcp_codes.image_luminance.type
+
+
+def test_invalid_type():
+    with pytest.raises(ValueError):
+        VCPCode("test", 0x10, "xx", "c")
@@ -0,0 +1,183 @@
+from .test_linux_vcp import FakeDDCCI
+from monitorcontrol import Monitor
+from monitorcontrol.vcp import Priority, VCPTimeoutError
+from monitorcontrol.vcp.vcp_linux import LinuxVCP
+from monitorcontrol.vcp.vcp_scheduler import BusScheduler, get_scheduler
+from types import TracebackType
+from typing import List, Optional, Type
+import pytest
+import threading
+import time
+
+
+def start_turn(
+    scheduler: BusScheduler, priority: Priority, order: List[str], name: str
+) -> threading.Thread:
+    """Waits for a turn in a thread and records when it was granted."""
+
+    def run():
+        with scheduler.turn(priority):
+            order.append(name)
+
+    waiting = scheduler.waiting
+    thread = threading.Thread(target=run)
+    thread.start()
+    while scheduler.waiting == waiting:
+        time.sleep(0.001)
+    return thread
+
+
+def test_priority_order():
+    scheduler = BusScheduler()
+    order = []
+    with scheduler.turn():
+        threads = [
+            start_turn(scheduler, Priority.BACKGROUND, order, "background"),
+            start_turn(scheduler, Priority.NORMAL, order, "normal"),
+            start_turn(scheduler, Priority.INTERACTIVE, order, "interactive 1"),
+            start_turn(scheduler, Priority.INTERACTIVE, order, "interactive 2"),
+        ]
+    for thread in threads:
+        thread.join()
+    assert order == ["interactive 1", "interactive 2", "normal", "background"]
+
+
+def test_aging():
+    scheduler = BusScheduler(aging=0.02)
+    order = []
+    with scheduler.turn():
+        threads = [start_turn(scheduler, Priority.BACKGROUND, order, "background")]
+        # waited long enough to go before new interactive turns
+        time.sleep(0.06)
+        threads.append(
+            start_turn(scheduler, Priority.INTERACTIVE, order, "interactive")
+        )
+    for thread in threads:
+        thread.join()
+    assert order == ["background", "interactive"]
+
+
+def test_deadline():
+    scheduler = BusScheduler()
+    with scheduler.turn():
+        with pytest.raises(VCPTimeoutError):
+            with scheduler.turn(deadline=time.monotonic() + 0.01):
+                pass
+    assert scheduler.waiting == 0
+    with scheduler.turn(deadline=time.monotonic() + 0.01):
+        pass
+
+
+def test_shared_scheduler():
+    assert LinuxVCP(3).scheduler is LinuxVCP(3).scheduler
+    assert LinuxVCP(3).scheduler is get_scheduler("/dev/i2c-3")
+    assert LinuxVCP(3).scheduler is not LinuxVCP(4).scheduler
+
+
+def test_preempt_capabilities():
+    fake = FakeDDCCI({0x10: [50, 100]}, "(" + "vcp(10 12 14) " * 20 + ")")
+    background = LinuxVCP(90)
+    interactive = LinuxVCP(90)
+    fake.attach(background)
+    fake.attach(interactive)
+    background.priority = Priority.BACKGROUND
+    downloading = threading.Event()
+
+    def write(data: bytes):
+        if data[2] == 0xF3:
+            downloading.set()
+            time.sleep(0.005)
+        FakeDDCCI.write(fake, data)
+
+    background.write_bytes = write
+    interactive.write_bytes = write
+    thread = threading.Thread(target=background.get_vcp_capabilities)
+    thread.start()
+    downloading.wait()
+    with interactive.prioritize(Priority.INTERACTIVE):
+        assert interactive.get_vcp_feature(0x10) == (50, 100)
+    thread.join()
+
+    # the get waited for at most the fragments in progress
+    commands = [data[2] for data in fake.writes]
+    assert commands.index(0x01) <= 2
+    assert commands.count(0xF3) > 4
+
+
+class EmulatedVCP(LinuxVCP):
+    """Linux VCP on an emulated monitor, opened without a bus device."""
+
+    def __init__(self, bus_number: int, fake: FakeDDCCI):
+        super().__init__(bus_number)
+        fake.attach(self)
+        self.fd = None
+        self.CHECKSUM_ERRORS = "strict"
+
+    def __enter__(self):
+        assert self.fd is None, "opened twice"
+        self.fd = -1
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        assert self.fd == -1, "closed twice"
+        self.fd = None
+        return False
+
+
+def test_stress():
+    active = {}
+    max_active = {}
+    overall = []
+    lock = threading.Lock()
+
+    def emulate(bus_number: int) -> FakeDDCCI:
+        fake = FakeDDCCI({0x10: [50, 100], 0x12: [40, 100]})
+        active[bus_number] = 0
+        max_active[bus_number] = 0
+
+        def write(data: bytes):
+            with lock:
+                active[bus_number] += 1
+                max_active[bus_number] = max(max_active[bus_number], active[bus_number])
+                overall.append(sum(active.values()))
+            time.sleep(0.0002)
+            FakeDDCCI.write(fake, data)
+            with lock:
+                active[bus_number] -= 1
+
+        fake.write = write
+        return fake
+
+    # two monitor objects for each of two buses, shared by every thread
+    monitors = []
+    for bus_number in (91, 92):
+        fake = emulate(bus_number)
+        monitors += [Monitor(EmulatedVCP(bus_number, fake)) for _ in range(2)]
+
+    errors = []
+
+    def worker(index: int):
+        try:
+            for i in range(20):
+                monitor = monitors[(index + i) % len(monitors)]
+                with monitor:
+                    monitor.set_luminance((index + i) % 100)
+                    assert 0 <= monitor.get_luminance() < 100
+                    assert monitor.get_contrast() == 40
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    # frames are exchanged one at a time on each bus, buses run in parallel
+    assert max_active == {91: 1, 92: 1}
+    assert max(overall) == 2
@@ -0,0 +1,137 @@
+from .test_linux_vcp import FakeDDCCI
+from monitorcontrol import Monitor
+from monitorcontrol.vcp import RetryPolicy, VCPChecksumError, VCPIOError, vcp_trace
+from monitorcontrol.vcp.vcp_linux import LinuxVCP
+from monitorcontrol.vcp.vcp_trace import (
+    RecordingVCP,
+    ReplayVCP,
+    TraceMismatchError,
+    read_trace,
+)
+from typing import Iterator
+from unittest import mock
+import contextlib
+import io
+import pytest
+
+CAPS = "(prot(monitor)type(LCD)model(ACER VG271U)cmds(01 02 03)vcp(10 12))"
+
+
+@contextlib.contextmanager
+def fake_bus(fake: FakeDDCCI) -> Iterator[None]:
+    """Routes the file operations of LinuxVCP to a fake monitor."""
+
+    def readv(_fd: int, buffers: list) -> int:
+        return fake.read_into(buffers[0])
+
+    with (
+        mock.patch("os.open", return_value=-1),
+        mock.patch("os.close"),
+        mock.patch("os.read", return_value=b"\x00"),
+        mock.patch("os.readv", side_effect=readv),
+        mock.patch("os.write", side_effect=lambda _fd, data: fake.write(data)),
+        mock.patch("fcntl.ioctl"),
+    ):
+        yield
+
+
+def no_delays(vcp: LinuxVCP) -> LinuxVCP:
+    vcp.GET_VCP_TIMEOUT = 0
+    vcp.CMD_RATE = 0
+    return vcp
+
+
+def session(vcp: LinuxVCP):
+    with Monitor(vcp) as monitor:
+        caps = monitor.get_vcp_capabilities()
+        monitor.set_luminance(80)
+        return caps["model"], monitor.get_luminance(), monitor.get_contrast()
+
+
+def record(fake: FakeDDCCI, policy: RetryPolicy = None) -> bytes:
+    trace = io.BytesIO()
+    vcp = no_delays(RecordingVCP(4, trace, retry_policy=policy))
+    vcp.CHECKSUM_ERRORS = "strict"
+    with fake_bus(fake):
+        assert session(vcp) == ("ACER VG271U", 80, 40)
+    return trace.getvalue()
+
+
+def test_record_replay():
+    trace = record(FakeDDCCI({0x10: [50, 100], 0x12: [40, 100]}, CAPS))
+    bus_number, records = read_trace(io.BytesIO(trace))
+    assert bus_number == 4
+    # open, three caps fragments and an empty one, the maximum read before
+    # the set, the set, and two gets
+    kinds = [record.kind for record in records]
+    assert kinds[0] == vcp_trace.READ
+    assert kinds.count(vcp_trace.WRITE) == 4 + 1 + 1 + 2
+
+    vcp = no_delays(ReplayVCP(io.BytesIO(trace)))
+    assert session(vcp) == ("ACER VG271U", 80, 40)
+    assert vcp.finished
+
+
+def test_replay_retries():
+    fake = FakeDDCCI({0x10: [50, 100], 0x12: [40, 100]}, CAPS)
+    fake.corrupt = 1
+    policy = RetryPolicy(attempts=2, backoff=0)
+    trace = record(fake, policy)
+    assert policy.retries == 1
+
+    policy = RetryPolicy(attempts=2, backoff=0)
+    vcp = no_delays(ReplayVCP(io.BytesIO(trace), retry_policy=policy))
+    vcp.CHECKSUM_ERRORS = "strict"
+    assert session(vcp) == ("ACER VG271U", 80, 40)
+    assert policy.retries == 1
+
+    # without retries the recorded checksum error is fatal
+    vcp = no_delays(ReplayVCP(io.BytesIO(trace)))
+    vcp.CHECKSUM_ERRORS = "strict"
+    with pytest.raises(VCPChecksumError):
+        session(vcp)
+
+
+def test_replay_recorded_error():
+    fake = FakeDDCCI({0x10: [50, 100]})
+    trace = io.BytesIO()
+    vcp = no_delays(RecordingVCP(4, trace))
+    with fake_bus(fake), mock.patch("os.write", side_effect=OSError(5, "EIO")):
+        with pytest.raises(VCPIOError), vcp:
+            vcp.get_vcp_feature(0x10)
+
+    vcp = no_delays(ReplayVCP(io.BytesIO(trace.getvalue())))
+    with pytest.raises(VCPIOError, match="unable write to I2C bus"), vcp:
+        vcp.get_vcp_feature(0x10)
+    assert vcp.finished
+
+
+def test_replay_mismatch():
+    trace = record(FakeDDCCI({0x10: [50, 100], 0x12: [40, 100]}, CAPS))
+    vcp = no_delays(ReplayVCP(io.BytesIO(trace)))
+    with pytest.raises(TraceMismatchError), vcp:
+        vcp.get_vcp_feature(0x12)
+
+
+def test_replay_realtime():
+    trace = io.BytesIO()
+    trace.write(vcp_trace.HEADER_STRUCT.pack(b"MCTRACE", 1, 4))
+    trace.write(vcp_trace.RECORD_STRUCT.pack(vcp_trace.READ, 0, 1) + b"\x00")
+    trace.write(vcp_trace.RECORD_STRUCT.pack(vcp_trace.READ, 250_000, 1) + b"\x01")
+    trace.seek(0)
+    vcp = ReplayVCP(trace, realtime=True)
+    with (
+        mock.patch("time.monotonic", return_value=10.0),
+        mock.patch("time.sleep") as sleep,
+        vcp,
+    ):
+        assert vcp.read_bytes(1) == b"\x01"
+    sleep.assert_called_once_with(pytest.approx(0.25))
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"MCTRACE\x02\x00\x00", b"MCTRACE\x01\x00\x00\x01"]
+)
+def test_read_trace_invalid(data: bytes):
+    with pytest.raises(ValueError):
+        read_trace(io.BytesIO(data))
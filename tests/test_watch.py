@@ -0,0 +1,257 @@
+from .test_monitorcontrol import UnitTestVCP
+from monitorcontrol import ChangeDetector, Monitor, Watcher
+from monitorcontrol.__main__ import main
+from monitorcontrol.vcp import VCPIOError, vcp_codes
+from monitorcontrol.watch import ChangeEvent
+from typing import List, Optional
+from unittest import mock
+import asyncio
+import itertools
+import json
+import monitorcontrol.__main__
+import pytest
+
+
+class WatchTestVCP(UnitTestVCP):
+    """
+    Test VCP with physical buttons, optionally reporting changes with the
+    new control value (0x02) and active control (0x52) codes.
+    """
+
+    def __init__(self, fifo: bool = True, bus_number: Optional[int] = None):
+        super().__init__(
+            {
+                0x10: {"current": 50, "maximum": 100},
+                0x12: {"current": 50, "maximum": 100},
+                0x60: {"current": 0x0F, "maximum": 0x12},
+            }
+        )
+        if fifo:
+            self.vcp[0x02] = {"current": 1, "maximum": 0xFF}
+            self.vcp[0x52] = {"current": 0, "maximum": 0xFF}
+        self.bus_number = bus_number
+        self.fifo: List[int] = []
+        self.reads: List[int] = []
+
+    def press(self, code: int, value: int):
+        """Changes a value like a button press on the monitor."""
+        self.vcp[code]["current"] = value
+        if 0x02 in self.vcp:
+            self.fifo.append(code)
+            self.vcp[0x02]["current"] = 2
+
+    def get_vcp_feature(self, code: int):
+        self.reads.append(code)
+        if code == 0x52 and 0x52 in self.vcp:
+            return (self.fifo.pop(0) if self.fifo else 0), 0xFF
+        return super().get_vcp_feature(code)
+
+
+def test_poll_fallback():
+    test_vcp = WatchTestVCP(fifo=False)
+    with Watcher([Monitor(test_vcp)], min_interval=0) as watcher:
+        # the first poll reads the initial values
+        assert watcher.poll() == []
+        test_vcp.reads.clear()
+        assert watcher.poll() == []
+        # every supported code is read, unsupported codes are dropped
+        assert test_vcp.reads == [0x10, 0x12, 0x60]
+        test_vcp.press(0x10, 80)
+        (event,) = watcher.poll()
+    assert event.index == 0
+    assert event.code is vcp_codes.image_luminance
+    assert (event.value, event.previous) == (80, 50)
+
+
+def test_poll_active_control():
+    test_vcp = WatchTestVCP()
+    test_vcp.press(0x12, 10)
+    with Watcher([Monitor(test_vcp)], min_interval=0) as watcher:
+        # changes before the watch started are cleared
+        assert watcher.poll() == []
+        assert test_vcp.vcp[0x02]["current"] == 1
+        test_vcp.reads.clear()
+        assert watcher.poll() == []
+        # only the new control value is read when idle
+        assert test_vcp.reads == [0x02]
+
+        test_vcp.reads.clear()
+        test_vcp.press(0x60, 0x11)
+        (event,) = watcher.poll()
+        assert event.code is vcp_codes.input_select
+        assert event.value == 0x11
+        # only the changed code is read
+        assert test_vcp.reads == [0x02, 0x52, 0x52, 0x60]
+        assert test_vcp.vcp[0x02]["current"] == 1
+
+
+def test_start_error():
+    test_vcp = WatchTestVCP()
+    test_vcp.press(0x12, 10)
+    with Monitor(test_vcp) as monitor:
+        detector = ChangeDetector(monitor, ["image luminance", 0x12])
+        with (
+            mock.patch.object(
+                test_vcp, "set_vcp_feature", side_effect=VCPIOError("NAK")
+            ),
+            pytest.raises(VCPIOError),
+        ):
+            detector.poll()
+        assert detector.active_control is None
+        # the next poll starts again instead of reporting every code
+        assert detector.poll() == []
+        assert detector.active_control is True
+        assert detector.values == {0x10: 50, 0x12: 10}
+        assert detector.poll() == []
+
+
+@pytest.mark.parametrize("fifo, idle, change", [(False, 3, 3), (True, 1, 5)])
+def test_transactions(fifo: bool, idle: int, change: int):
+    test_vcp = WatchTestVCP(fifo=fifo)
+    monitor = Monitor(test_vcp)
+    with monitor:
+        detector = ChangeDetector(monitor)
+        detector.start()
+        assert detector.active_control is fifo
+        assert (detector.transactions, detector.polls) == (0, 0)
+        detector.poll()
+        assert detector.transactions == idle
+        test_vcp.press(0x10, 0)
+        assert len(detector.poll()) == 1
+        # new control value, two FIFO reads, reset, read the changed value
+        assert detector.transactions == idle + change
+        assert detector.polls == 2
+
+
+def test_detector_no_user_controls():
+    test_vcp = WatchTestVCP()
+    test_vcp.vcp[0x02]["current"] = 0xFF
+    monitor = Monitor(test_vcp)
+    with monitor:
+        detector = ChangeDetector(monitor, codes=[0x10])
+        assert detector.poll() == []
+        assert detector.active_control is False
+        test_vcp.vcp[0x10]["current"] = 0
+        assert len(detector.poll()) == 1
+
+
+def test_poll_unwatched_change():
+    test_vcp = WatchTestVCP()
+    with Watcher([Monitor(test_vcp)], codes=[0x10], min_interval=0) as watcher:
+        watcher.poll()
+        test_vcp.press(0x12, 0)
+        assert watcher.poll() == []
+
+
+def test_adaptive_interval():
+    test_vcp = WatchTestVCP()
+    watcher = Watcher([Monitor(test_vcp)], min_interval=0.1, max_interval=0.4)
+    with watcher, mock.patch("time.monotonic", return_value=100.0):
+        watcher.poll()
+        assert watcher.time_until_poll() == pytest.approx(0.15)
+        # not due
+        test_vcp.reads.clear()
+        watcher.poll()
+        assert test_vcp.reads == []
+        for _ in range(10):
+            watcher._buses[0].next_poll = 0
+            watcher.poll()
+        assert watcher.time_until_poll() == pytest.approx(0.4)
+        test_vcp.press(0x10, 0)
+        watcher._buses[0].next_poll = 0
+        assert len(watcher.poll()) == 1
+        assert watcher.time_until_poll() == pytest.approx(0.1)
+
+
+def test_bus_coalescing():
+    monitors = [
+        Monitor(WatchTestVCP(bus_number=1)),
+        Monitor(WatchTestVCP(bus_number=1)),
+        Monitor(WatchTestVCP(bus_number=2)),
+        Monitor(WatchTestVCP()),
+    ]
+    watcher = Watcher(monitors)
+    assert [len(bus.detectors) for bus in watcher._buses] == [2, 1, 1]
+
+
+def test_write_only_code():
+    with pytest.raises(TypeError):
+        Watcher([], codes=[vcp_codes.image_factory_default])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with (
+        mock.patch("time.monotonic", side_effect=clock.monotonic),
+        mock.patch("time.sleep", side_effect=clock.sleep),
+    ):
+        yield clock
+
+
+def test_iter(clock: FakeClock):
+    test_vcp = WatchTestVCP()
+    presses = iter([(0x10, 1), (0x12, 2)])
+
+    def sleep(seconds: float):
+        clock.sleep(seconds)
+        test_vcp.press(*next(presses))
+
+    with (
+        Watcher([Monitor(test_vcp)]) as watcher,
+        mock.patch("time.sleep", side_effect=sleep),
+    ):
+        events = list(itertools.islice(watcher, 2))
+    assert [(e.code.value, e.value) for e in events] == [(0x10, 1), (0x12, 2)]
+
+
+def test_async_iter():
+    test_vcp = WatchTestVCP()
+
+    async def sleep(_):
+        test_vcp.press(0x10, 3)
+
+    async def watch() -> ChangeEvent:
+        async with Watcher([Monitor(test_vcp)], min_interval=0) as watcher:
+            async for event in watcher:
+                return event
+
+    with mock.patch("asyncio.sleep", side_effect=sleep):
+        event = asyncio.run(watch())
+    assert event.to_dict()["value"] == 3
+
+
+def test_cli_watch(clock: FakeClock):
+    test_vcps = [WatchTestVCP(), WatchTestVCP()]
+    print_mock = mock.Mock()
+
+    def sleep(seconds: float):
+        clock.sleep(seconds)
+        if print_mock.called:
+            raise KeyboardInterrupt
+        test_vcps[1].press(0x10, 90)
+
+    with (
+        mock.patch.object(
+            monitorcontrol.__main__,
+            "get_monitors",
+            return_value=[Monitor(v) for v in test_vcps],
+        ),
+        mock.patch("time.sleep", side_effect=sleep),
+        mock.patch("builtins.print", print_mock),
+    ):
+        main(["--watch", "--monitor", "2", "--watch-code", "image_luminance"])
+    line = json.loads(print_mock.call_args.args[0])
+    assert line["monitor"] == 2
+    assert (line["code"], line["value"], line["previous"]) == (0x10, 90, 50)